@@ -1,12 +1,10 @@
-import requests
-from clientcode import variable
+from clientcode.client import get_client
 
 if __name__ == '__main__':
-    url = variable.baseurl + '/account/info'
-    headers = variable.headers
+    client = get_client()
     data = {}
 
-    response = requests.post(url, headers=headers, json=data)
+    response = client.post('/account/info', data)
 
     print(response.status_code)
     print(response.json())
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Access token lifecycle for the DeyeCloud API
+Caches the token and its expiry on disk, refreshes it from the credentials in
+variable.py before it expires (optionally on a background thread) and lets the
+client swap in a fresh token when a request is rejected as unauthorized
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+import requests
+
+from clientcode import variable
+from clientcode.api_codes import AUTH_FAILURE_CODES
+from clientcode.config import get_baseurl
+
+# Token cache (token + expiry); keep it out of version control
+TOKEN_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.token_cache.json')
+
+# Refresh this many seconds before the token expires
+REFRESH_MARGIN = 24 * 3600
+
+# ...but never earlier than this fraction of the token's lifetime before expiry, so a
+# short-lived token is not refreshed on every request
+MAX_MARGIN_FRACTION = 0.1
+
+# How often the background thread checks the expiry (seconds)
+CHECK_INTERVAL = 3600
+
+# Lifetime assumed when the API does not report expiresIn (seconds)
+DEFAULT_EXPIRES_IN = 24 * 3600
+
+TOKEN_TIMEOUT = 30
+
+# Complete error messages (lower case) that mean the token expired or is invalid when the
+# code is not in AUTH_FAILURE_CODES
+AUTH_FAILURE_MESSAGES = {'auth invalid token', 'invalid token', 'token expired', 'token is expired', 'unauthorized'}
+
+CREDENTIALS = ('app_id', 'app_secret', 'email', 'password')
+
+
+def has_credentials():
+    """True if variable.py holds everything needed to request a token"""
+    return all(getattr(variable, name, None) for name in CREDENTIALS)
+
+
+def request_token(baseurl=None):
+    """POST /account/token with the credentials from variable.py and return the decoded JSON"""
+    url = (baseurl or get_baseurl()).rstrip('/') + '/account/token?appId=' + variable.app_id
+
+    # Hash the password
+    sha256_hash = hashlib.sha256()
+    sha256_hash.update(variable.password.encode('utf-8'))
+
+    data = {
+        "appSecret": variable.app_secret,
+        "email": variable.email,
+        "companyId": getattr(variable, 'company_id', '0'),
+        "password": sha256_hash.hexdigest()
+    }
+    response = requests.post(url, headers={'Content-Type': 'application/json'}, json=data, timeout=TOKEN_TIMEOUT)
+    response.raise_for_status()
+    return response.json()
+
+
+def is_auth_failure(response, result=None):
+    """True if an API response rejects the access token (HTTP 401 or a DeyeCloud token code)"""
+    if response.status_code == 401:
+        return True
+    if response.status_code != 200:
+        return False
+    if result is None:
+        try:
+            result = response.json()
+        except ValueError:
+            return False
+    if not isinstance(result, dict) or result.get('success', True):
+        return False
+    if str(result.get('code')) in AUTH_FAILURE_CODES:
+        return True
+    return str(result.get('msg') or '').strip().lower() in AUTH_FAILURE_MESSAGES
+
+
+class TokenManager:
+    """Thread-safe holder of the current access token, backed by an on-disk cache"""
+
+    def __init__(self, cache_path=TOKEN_CACHE_PATH, baseurl=None, margin=REFRESH_MARGIN):
+        self.cache_path = cache_path
+        self.baseurl = (baseurl or get_baseurl()).rstrip('/')
+        self.margin = margin
+        self.access_token = None
+        self.expires_at = 0
+        self.lifetime = None  # seconds the current token was issued for
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.load()
+
+    def load(self):
+        """Read the cached token, if any; returns True if one was found"""
+        try:
+            with open(self.cache_path) as f:
+                cached = json.load(f)
+            # A token issued by another API (e.g. the mock server) is not valid here
+            if cached.get('baseurl', self.baseurl) != self.baseurl:
+                return False
+            self.access_token = cached['accessToken']
+            self.expires_at = float(cached['expiresAt'])
+            self.lifetime = float(cached['lifetime']) if cached.get('lifetime') else None
+            return True
+        except (OSError, ValueError, KeyError):
+            return False
+
+    def save(self):
+        """Write the token cache atomically (temp file + rename), readable only by the owner"""
+        directory = os.path.dirname(self.cache_path) or '.'
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.token_cache.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'accessToken': self.access_token, 'expiresAt': self.expires_at, 'lifetime': self.lifetime,
+                           'baseurl': self.baseurl}, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, self.cache_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def store(self, result):
+        """Keep the token from an /account/token response and cache it"""
+        if not result.get('accessToken'):
+            raise RuntimeError(f"No access token in response: {result.get('msg')}")
+        expires_in = float(result.get('expiresIn') or DEFAULT_EXPIRES_IN)
+        self.access_token = result['accessToken']
+        self.expires_at = time.time() + expires_in
+        self.lifetime = expires_in
+        self.save()
+        # A fresh token that already needs a refresh would be replaced on every request
+        if self.needs_refresh():
+            print(f"⚠ New access token expires in {expires_in:.0f}s, within the refresh margin")
+
+    def refresh_margin(self):
+        """Seconds before expiry to refresh: the margin, capped at MAX_MARGIN_FRACTION of the lifetime"""
+        if self.lifetime:
+            return min(self.margin, self.lifetime * MAX_MARGIN_FRACTION)
+        return self.margin
+
+    def needs_refresh(self):
+        """True if there is no token or it expires within the refresh margin"""
+        return not self.access_token or time.time() >= self.expires_at - self.refresh_margin()
+
+    def refresh(self):
+        """Request a new token and cache it"""
+        with self.lock:
+            self._refresh()
+        return self.access_token
+
+    def _refresh(self):
+        self.store(request_token(self.baseurl))
+        print(f"✓ Access token refreshed (valid until {time.strftime('%Y-%m-%d %H:%M', time.localtime(self.expires_at))})")
+
+    def token(self):
+        """Current access token, refreshed first if it is missing or about to expire"""
+        with self.lock:
+            if self.needs_refresh():
+                # Another process (e.g. a parallel cron run) may have refreshed already
+                self.load()
+                if self.needs_refresh():
+                    self._refresh()
+            return self.access_token
+
+    def invalidate(self, rejected_token):
+        """Replace a token the API rejected; no-op if another thread already replaced it"""
+        with self.lock:
+            if self.access_token == rejected_token:
+                self._refresh()
+            return self.access_token
+
+    def headers(self):
+        """Request headers carrying the current token"""
+        headers = dict(getattr(variable, 'headers', {'Content-Type': 'application/json'}))
+        headers['Authorization'] = 'bearer ' + self.token()
+        return headers
+
+    def start(self, interval=CHECK_INTERVAL):
+        """Refresh ahead of expiry on a daemon thread, so long runs never hit an expired token"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, args=(interval,), name='token-refresh', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background refresh thread"""
+        self._stop.set()
+
+    def _run(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                self.token()
+            except Exception as e:
+                print(f"⚠ Background token refresh failed: {e}")
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_token_manager():
+    """Return the process-wide token manager, or None if variable.py has no credentials"""
+    global _manager
+    with _manager_lock:
+        if _manager is None and has_credentials():
+            _manager = TokenManager()
+        return _manager
@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+"""
+DeyeCloud business error codes
+Codes returned with HTTP 200 and success=false that the client acts on. The
+mock server answers with the same constants, so it exercises the detection
+code instead of a separate guess
+"""
+
+# Request throttled ("Request too frequently, please try again later")
+RATE_LIMITED_CODE = '2101007'
+
+# Access token expired or invalid ("auth invalid token")
+INVALID_TOKEN_CODE = '2101019'
+
+# Codes that mean "slow down"; extend this set when the API reports new throttling codes
+RATE_LIMIT_CODES = frozenset({RATE_LIMITED_CODE})
+
+# Codes that mean the access token must be replaced. Permission errors ("no authority for
+# this station") are not listed: a new token cannot fix them, so they reach the caller
+AUTH_FAILURE_CODES = frozenset({INVALID_TOKEN_CODE})
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Asyncio front-end for the shared DeyeCloud client
+Runs many API calls concurrently with a bounded number in flight, reusing the
+pooled session and process-wide rate limiter from clientcode.client
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from clientcode.client import get_client
+
+# Default number of API calls in flight at once
+DEFAULT_CONCURRENCY = 4
+
+
+class AsyncDeyeCloudClient:
+    """Runs blocking client calls on worker threads under a semaphore and rate limit"""
+
+    def __init__(self, client=None, concurrency=DEFAULT_CONCURRENCY):
+        self.client = client or get_client()
+        self.concurrency = max(1, int(concurrency))
+        self._semaphore = None
+
+    @property
+    def semaphore(self):
+        # Created lazily so it binds to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    async def run(self, func, *args, **kwargs):
+        """Call a blocking client method once a slot and a rate token are free"""
+        # The client takes its rate token (and backs off) on the worker thread
+        async with self.semaphore:
+            return await asyncio.to_thread(func, *args, **kwargs)
+
+    async def station_history(self, station_id, granularity, start_at, end_at=None):
+        """Async POST /station/history"""
+        return await self.run(self.client.station_history, station_id, granularity, start_at, end_at)
+
+    async def station_history_day(self, station_id, date):
+        """Fetch frame-level data for one YYYY-MM-DD day; returns (date, items or None on error)"""
+        end_date = (datetime.strptime(date, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+        try:
+            result = await self.station_history(station_id, 1, date, end_date)
+        except Exception as e:
+            print(f"Exception getting station history for {date}: {e}")
+            return date, None
+
+        if result.get('success'):
+            return date, result.get('stationDataItems', [])
+        print(f"Error getting station history for {date}: {result.get('msg')}")
+        return date, None
+
+    async def iter_station_history_days(self, station_id, dates):
+        """Yield (date, items) for each day as soon as its request completes"""
+        tasks = [asyncio.ensure_future(self.station_history_day(station_id, date)) for date in dates]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
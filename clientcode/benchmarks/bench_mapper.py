@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for the station history frame mapper
+Compares the original per-frame dict mapper (map_api_to_db) with the shared
+columnar mapper in clientcode/database/ingest.py, with and without NumPy
+"""
+
+import sys
+import os
+import argparse
+import random
+import timeit
+from datetime import datetime
+
+# Add project root to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../'))
+from clientcode.database import ingest
+
+
+def convert_timestamp(timestamp):
+    """Original timestamp conversion (kept here as the benchmark baseline)"""
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def map_api_to_db(station_data):
+    """Original per-frame mapper from daily_update.py / backfill_daily_logs.py"""
+    return {
+        'timestamp': convert_timestamp(station_data.get('timeStamp')),
+        'production_kw': (station_data.get('generationPower') or 0) / 1000 if station_data.get('generationPower') is not None else None,
+        'consumption_kw': (station_data.get('consumptionPower') or 0) / 1000 if station_data.get('consumptionPower') is not None else None,
+        'grid_kw': (station_data.get('gridPower') or 0) / 1000 if station_data.get('gridPower') is not None else None,
+        'battery_kw': (station_data.get('batteryPower') or 0) / 1000 if station_data.get('batteryPower') is not None else None,
+        'soc_percent': station_data.get('batterySOC'),
+        'pv_kw': (station_data.get('generationPower') or 0) / 1000 if station_data.get('generationPower') is not None else None,
+        'generator_kw': None,
+        'grid_tied_inverter_power_kw': (station_data.get('wirePower') or 0) / 1000 if station_data.get('wirePower') is not None else None
+    }
+
+
+def legacy_rows(station_id, station_data):
+    """Rows as the original insert loop built them (plus the epoch ts column)"""
+    rows = []
+    for data_point in station_data:
+        mapped = map_api_to_db(data_point)
+        if mapped['timestamp']:
+            rows.append((
+                mapped['timestamp'], int(data_point['timeStamp']), station_id,
+                mapped['production_kw'], mapped['consumption_kw'], mapped['grid_kw'],
+                mapped['battery_kw'], mapped['soc_percent'], mapped['pv_kw'],
+                mapped['generator_kw'], mapped['grid_tied_inverter_power_kw']
+            ))
+    return rows
+
+
+def synthetic_frames(count, start=1735689600, interval=300, missing_wire=True):
+    """Generate API-shaped frames at a fixed interval"""
+    rng = random.Random(42)
+    return [{
+        'timeStamp': start + i * interval,
+        'generationPower': rng.uniform(0, 8000),
+        'consumptionPower': rng.uniform(200, 5000),
+        'gridPower': rng.uniform(-3000, 3000),
+        'batteryPower': rng.uniform(-4000, 4000),
+        'batterySOC': rng.randint(10, 100),
+        'wirePower': None if missing_wire else rng.uniform(0, 1000),
+    } for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Frame mapper microbenchmark')
+    parser.add_argument('--frames', type=int, default=288, help='Frames per batch (288 = one day at 5 minutes)')
+    parser.add_argument('--repeat', type=int, default=200, help='Batches mapped per timing run')
+    args = parser.parse_args()
+
+    for label, missing_wire in (('wirePower missing', True), ('all fields present', False)):
+        frames = synthetic_frames(args.frames, missing_wire=missing_wire)
+
+        # Both mappers must produce identical rows
+        if ingest.frames_to_rows(1, frames) != legacy_rows(1, frames):
+            print(f"✗ Mapper output differs from map_api_to_db ({label})")
+            return 1
+
+        legacy = min(timeit.repeat(lambda: legacy_rows(1, frames), number=args.repeat, repeat=3))
+        columnar = min(timeit.repeat(lambda: ingest.frames_to_rows(1, frames), number=args.repeat, repeat=3))
+
+        numpy_module, ingest.np = ingest.np, None
+        try:
+            pure = min(timeit.repeat(lambda: ingest.frames_to_rows(1, frames), number=args.repeat, repeat=3))
+        finally:
+            ingest.np = numpy_module
+
+        total = args.frames * args.repeat
+        print(f"\n{args.frames} frames x {args.repeat} batches ({label})")
+        print("-" * 60)
+        print(f"{'map_api_to_db (original)':<32} {total / legacy:>12,.0f} frames/s")
+        print(f"{'columnar (pure Python)':<32} {total / pure:>12,.0f} frames/s  x{legacy / pure:.2f}")
+        if numpy_module is not None:
+            print(f"{'columnar (NumPy)':<32} {total / columnar:>12,.0f} frames/s  x{legacy / columnar:.2f}")
+        else:
+            print(f"{'columnar (NumPy)':<32} {'n/a (NumPy not installed)':>12}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for the Modbus frame codec
+Checks clientcode/commission/modbus_codec.py against the original
+customControll.py builder and parser on a spread of frames, then compares
+their speed on large FC16 writes and full 125-register read replies
+"""
+
+import sys
+import os
+import argparse
+import random
+import timeit
+from binascii import unhexlify
+
+# Add project root to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../'))
+from clientcode.commission import modbus_codec
+
+try:
+    import crcmod
+except ImportError:  # Bit-by-bit baseline below
+    crcmod = None
+
+# FC16 writes at most 123 registers, FC3 reads at most 125
+MAX_WRITE_REGISTERS = 123
+MAX_READ_REGISTERS = 125
+
+# Modbus CRC16 check value of b'123456789'
+CRC16_CHECK = 0x4B37
+
+
+def legacy_crc16(data):
+    """Bit-by-bit Modbus CRC16, equivalent to crcmod.mkCrcFun(0x18005, rev=True, initCrc=0xFFFF, xorOut=0)"""
+    crc = 0xFFFF
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+    return crc
+
+
+if crcmod is not None:
+    # The original CRC function, when it is installed
+    legacy_crc16 = crcmod.mkCrcFun(0x18005, rev=True, initCrc=0xFFFF, xorOut=0x0000)
+
+
+def legacy_build_modbus_message(slave_id, fc, reg, count, data_values=None):
+    """Original builder from customControll.py (kept here as the benchmark baseline)"""
+    if fc == 3:
+        message = bytes([slave_id, fc, (reg >> 8) & 0xFF, reg & 0xFF, (count >> 8) & 0xFF, count & 0xFF])
+    elif fc == 6:
+        message = bytes([slave_id, fc, (reg >> 8) & 0xFF, reg & 0xFF,
+                         (data_values[0] >> 8) & 0xFF, data_values[0] & 0xFF])
+    elif fc == 16:
+        byte_count = count * 2
+        message = bytes([slave_id, fc, (reg >> 8) & 0xFF, reg & 0xFF,
+                         (count >> 8) & 0xFF, count & 0xFF, byte_count])
+        for value in data_values:
+            message += bytes([(value >> 8) & 0xFF, value & 0xFF])
+
+    crc = legacy_crc16(message)
+    message += bytes([crc & 0xFF, (crc >> 8) & 0xFF])
+    return ' '.join(f"{b:02X}" for b in message)
+
+
+def legacy_parse_response(hex_str):
+    """Original parser from customControll.py"""
+    try:
+        data = unhexlify(hex_str.replace(' ', ''))
+        if len(data) < 3:
+            return "Invalid response (too short)"
+        slave = data[0]
+        func = data[1]
+        if func & 0x80:
+            error_code = data[2]
+            errors = {1: "Illegal Function", 2: "Illegal Data Address", 3: "Illegal Data Value", 4: "Server Failure"}
+            return f"ERROR: {errors.get(error_code, f'Unknown ({error_code})')}"
+        if func == 3:
+            byte_count = data[2]
+            values = []
+            for i in range(3, 3 + byte_count, 2):
+                if i + 1 < len(data):
+                    values.append((data[i] << 8) | data[i + 1])
+            return {'Slave': slave, 'Function': 'Read', 'Values': values}
+        elif func in [6, 16]:
+            return {'Slave': slave, 'Function': 'Write', 'Address': (data[2] << 8) | data[3], 'Count': (data[4] << 8) | data[5]}
+        else:
+            return f"Unknown function code: {func}"
+    except Exception as e:
+        return f"Parse error: {str(e)}"
+
+
+def read_reply(rng, count, slave_id=1):
+    """FC3 reply frame (hex) carrying `count` random registers"""
+    payload = bytes([slave_id, 3, count * 2]) + bytes(rng.randrange(256) for _ in range(count * 2))
+    crc = legacy_crc16(payload)
+    return (payload + bytes([crc & 0xFF, crc >> 8])).hex(' ').upper()
+
+
+def request_cases(rng):
+    """(slave_id, fc, reg, count, values) requests covering every function code and size"""
+    cases = []
+    for _ in range(200):
+        slave_id, reg = rng.randrange(1, 248), rng.randrange(0x10000)
+        count = rng.randint(1, MAX_WRITE_REGISTERS)
+        cases.append((slave_id, 3, reg, rng.randint(1, MAX_READ_REGISTERS), None))
+        cases.append((slave_id, 6, reg, 1, [rng.randrange(0x10000)]))
+        cases.append((slave_id, 16, reg, count, [rng.randrange(0x10000) for _ in range(count)]))
+    return cases
+
+
+def reply_cases(rng):
+    """Reply hex strings: reads of every size, writes, exceptions and malformed frames"""
+    replies = [read_reply(rng, count) for count in range(0, MAX_READ_REGISTERS + 1)]
+    full = read_reply(rng, 10)
+    replies += [
+        full[:len(full) - 9],       # truncated payload
+        '01 03 05 00 01 00 02 00 03 4C 2B',  # odd byte count
+        '01 10 02 61 00 02 10 64', '01 06 02 61 00 0A 59 A3',
+        '01 83 02 C0 F1', '01 83 07 00 00', '01 10 02', '01 07 00 00 00',
+        '01', '', 'ZZ 01 02', '01 0',
+    ]
+    return replies
+
+
+def check(rng):
+    """Names of the checks where the codec output differs from the original functions"""
+    failures = []
+    if modbus_codec.crc16(b'123456789') != CRC16_CHECK:
+        failures.append('crc16 check value')
+    for case in request_cases(rng):
+        if modbus_codec.build_modbus_message(*case) != legacy_build_modbus_message(*case):
+            failures.append(f"build_modbus_message{case[:4]}")
+    for reply in reply_cases(rng):
+        if modbus_codec.parse_response(reply) != legacy_parse_response(reply):
+            failures.append(f"parse_response({reply[:20]!r})")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Modbus codec microbenchmark')
+    parser.add_argument('--registers', type=int, default=MAX_WRITE_REGISTERS,
+                        help=f'Registers per FC16 write (default: {MAX_WRITE_REGISTERS})')
+    parser.add_argument('--repeat', type=int, default=2000, help='Frames per timing run')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    failures = check(rng)
+    if failures:
+        print(f"✗ Codec output differs from the original functions ({len(failures)} cases):")
+        for failure in failures[:10]:
+            print(f"  {failure}")
+        return 1
+    print("✓ Codec output matches the original builder and parser")
+    print(f"Original CRC16: {'crcmod' if crcmod is not None else 'bit-by-bit (crcmod not installed)'}")
+
+    values = [rng.randrange(0x10000) for _ in range(args.registers)]
+    reply = read_reply(rng, MAX_READ_REGISTERS)
+    payload = unhexlify(reply.replace(' ', ''))
+    cases = (
+        (f'FC16 write, {args.registers} registers (hex)',
+         lambda: legacy_build_modbus_message(1, 16, 0x100, args.registers, values),
+         lambda: modbus_codec.build_modbus_message(1, 16, 0x100, args.registers, values)),
+        (f'FC16 write, {args.registers} registers (bytes)',
+         None,
+         lambda: modbus_codec.build_frame(1, 16, 0x100, args.registers, values)),
+        (f'FC3 reply, {MAX_READ_REGISTERS} registers (hex)',
+         lambda: legacy_parse_response(reply),
+         lambda: modbus_codec.parse_response(reply)),
+        (f'FC3 reply, {MAX_READ_REGISTERS} registers (bytes)',
+         None,
+         lambda: modbus_codec.parse_frame(payload)),
+    )
+
+    print(f"\n{'Operation':<40} {'original':>14} {'codec':>14} {'speed-up':>9}")
+    print("-" * 80)
+    legacy = None
+    for name, original, codec in cases:
+        if original is not None:
+            legacy = min(timeit.repeat(original, number=args.repeat, repeat=3))
+        current = min(timeit.repeat(codec, number=args.repeat, repeat=3))
+        print(f"{name:<40} {args.repeat / legacy:>10,.0f} f/s {args.repeat / current:>10,.0f} f/s"
+              f" {'x' + format(legacy / current, '.2f'):>9}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the ingest, storage and report hot paths
+Builds a synthetic multi-station, multi-year daily_logs/daily_data dataset in
+a temporary database, then times frame mapping and ingest throughput, the
+query latency of every summary_data.py and frame_summary.py report command,
+and the peak Python memory of each step. Results are written as JSON so runs
+from different commits can be compared with --compare.
+"""
+
+import sys
+import os
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import sqlite3
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+# Add project root to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../'))
+from clientcode.benchmarks.bench_mapper import legacy_rows
+from clientcode.database import ingest
+from clientcode.database.connection import get_connection
+from clientcode.database.manage.db_setup import create_database
+from clientcode.database.records import DailyTotals
+from clientcode.reports import frame_summary, summary_data
+
+FRAME_INTERVAL = 300  # 5-minute frames
+FRAMES_PER_DAY = 86400 // FRAME_INTERVAL
+
+# Days per daily_data upsert, as backfill_data.py chunks them
+CHUNK_DAYS = 31
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def day_frames(rng, day_start):
+    """One day of API-shaped frames"""
+    frames = []
+    for i in range(FRAMES_PER_DAY):
+        hour = i * FRAME_INTERVAL / 3600
+        solar = max(0.0, 1 - abs(hour - 12) / 6)
+        frames.append({
+            'timeStamp': day_start + i * FRAME_INTERVAL,
+            'generationPower': round(8000 * solar * rng.uniform(0.4, 1.0), 1),
+            'consumptionPower': round(rng.uniform(200, 5000), 1),
+            'gridPower': round(rng.uniform(-3000, 3000), 1),
+            'batteryPower': round(rng.uniform(-4000, 4000), 1),
+            'batterySOC': rng.randint(10, 100),
+            'wirePower': None,
+        })
+    return frames
+
+
+def day_totals(frames):
+    """daily_data values (kWh) integrated from a day of frames"""
+    to_kwh = FRAME_INTERVAL / 3600 / 1000
+    generation = sum(frame['generationPower'] for frame in frames) * to_kwh
+    return (
+        round(generation, 2),
+        round(sum(max(0.0, frame['gridPower']) for frame in frames) * to_kwh, 2),
+        round(sum(max(0.0, -frame['gridPower']) for frame in frames) * to_kwh, 2),
+        round(sum(max(0.0, -frame['batteryPower']) for frame in frames) * to_kwh, 2),
+        round(sum(max(0.0, frame['batteryPower']) for frame in frames) * to_kwh, 2),
+        round(sum(frame['consumptionPower'] for frame in frames) * to_kwh, 2),
+        round(generation / 8, 2),
+    )
+
+
+def iter_dataset(stations, start, days, seed=7):
+    """Yield (station_id, date, frames) for every station and day"""
+    for station_id in range(1, stations + 1):
+        rng = random.Random(f"{seed}:{station_id}")
+        for day in range(days):
+            date = start + timedelta(days=day)
+            yield station_id, date.strftime('%Y-%m-%d'), day_frames(rng, int(date.timestamp()))
+
+
+class Recorder:
+    """Collects metrics as {name: {'value', 'unit', 'higher_is_better'}}"""
+
+    def __init__(self):
+        self.metrics = {}
+
+    def add(self, name, value, unit, higher_is_better=False):
+        self.metrics[name] = {'value': round(value, 3), 'unit': unit, 'higher_is_better': higher_is_better}
+        print(f"  {name:<44} {value:>14,.2f} {unit}")
+
+
+def traced_peak(func):
+    """Peak traced Python allocation (MiB) while running func once"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 2 ** 20
+    finally:
+        tracemalloc.stop()
+
+
+def best_time(func, repeat):
+    """Best wall time (seconds) of `repeat` calls"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def clear_daily_logs(conn):
+    with conn:
+        conn.execute('DELETE FROM daily_logs')
+        conn.execute('DELETE FROM daily_logs_hourly')
+        conn.execute('DELETE FROM daily_logs_daily')
+
+
+def insert_per_row(conn, dataset):
+    """One execute per frame and a commit per day, as the original ingest loops did"""
+    cursor = conn.cursor()
+    for station_id, _, day in dataset:
+        for row in legacy_rows(station_id, day):
+            cursor.execute(ingest.INSERT_DAILY_LOGS_SQL, row)
+        conn.commit()
+
+
+def insert_batched(conn, dataset):
+    """One save_frames batch per day (executemany plus rollup refresh)"""
+    for station_id, _, day in dataset:
+        ingest.save_frames(conn, station_id, day)
+
+
+def upsert_daily_data(conn, totals):
+    """DailyTotals upserts in 31-day chunks with the billing refresh, as backfill_data.py writes them"""
+    for i in range(0, len(totals), CHUNK_DAYS):
+        ingest.save_daily_totals(conn, totals[i:i + CHUNK_DAYS])
+
+
+def bench_mapping(recorder, dataset, repeat):
+    """Frames per second of the original and the columnar mapper over the dataset"""
+    frames = sum(len(day) for _, _, day in dataset)
+    for name, mapper in (('map_api_to_db', legacy_rows), ('frames_to_rows', ingest.frames_to_rows)):
+        elapsed = best_time(lambda: [mapper(station_id, day) for station_id, _, day in dataset], repeat)
+        recorder.add(f"ingest.{name}", frames / elapsed, 'frames/s', True)
+
+
+def bench_ingest(recorder, db_path, dataset):
+    """Ingest throughput over the whole dataset; peak memory on a separate traced pass over one chunk"""
+    frames = sum(len(day) for _, _, day in dataset)
+    sample = dataset[:CHUNK_DAYS]
+    conn = get_connection(db_path)
+
+    for name, insert in (('daily_logs_per_row', insert_per_row), ('save_frames', insert_batched)):
+        clear_daily_logs(conn)
+        recorder.add(f"ingest.{name}.peak_memory", traced_peak(lambda: insert(conn, sample)), 'MiB')
+        clear_daily_logs(conn)
+        elapsed = best_time(lambda: insert(conn, dataset), 1)
+        recorder.add(f"ingest.{name}", frames / elapsed, 'frames/s', True)
+
+    totals = [DailyTotals(date, station_id, *day_totals(day)) for station_id, date, day in dataset]
+    recorder.add('ingest.daily_data.peak_memory', traced_peak(lambda: upsert_daily_data(conn, totals[:CHUNK_DAYS])), 'MiB')
+    elapsed = best_time(lambda: upsert_daily_data(conn, totals), 1)
+    recorder.add('ingest.daily_data', len(totals) / elapsed, 'days/s', True)
+
+    conn.execute('ANALYZE')
+    conn.close()
+
+
+def report_cases(start, days):
+    """(name, callable) for each summary_data.py and frame_summary.py report command"""
+    middle = start + timedelta(days=days // 2)
+    day = middle.strftime('%Y-%m-%d')
+    month_start = middle.replace(day=1)
+    month_end = (month_start + timedelta(days=31)).replace(day=1) - timedelta(days=1)
+    year_start = middle - timedelta(days=182)
+    month_range = (month_start.strftime('%Y-%m-%d'), month_end.strftime('%Y-%m-%d'))
+    year_range = (year_start.strftime('%Y-%m-%d'), day)
+
+    return [
+        ('summary_data.recent_7', lambda: summary_data.get_recent_data(7)),
+        ('summary_data.recent_30', lambda: summary_data.get_recent_data(30)),
+        ('summary_data.month', lambda: summary_data.get_monthly_summary(middle.year, middle.month)),
+        ('summary_data.range', lambda: summary_data.get_date_range_data(*month_range)),
+        ('summary_data.summary', lambda: summary_data.get_date_range_summary(*year_range)),
+        ('summary_data.all', lambda: (summary_data.get_summary_by_roi(), summary_data.get_summary_by_year(),
+                                      summary_data.get_summary_by_month())),
+        ('frame_summary.dates', frame_summary.get_available_dates),
+        ('frame_summary.date', lambda: (frame_summary.get_date_range_summary(day, day),
+                                        frame_summary.get_frame_data(date=day))),
+        ('frame_summary.date_station', lambda: (frame_summary.get_date_range_summary(day, day, 1),
+                                                frame_summary.get_frame_data(date=day, station_id=1))),
+        ('frame_summary.hourly', lambda: frame_summary.get_hourly_summary(day)),
+        ('frame_summary.range_month', lambda: (frame_summary.get_date_range_summary(*month_range),
+                                               frame_summary.get_frame_data(date=month_range[0], limit=20))),
+        ('frame_summary.range_year', lambda: (frame_summary.get_date_range_summary(*year_range),
+                                              frame_summary.get_frame_data(date=year_range[0], limit=20))),
+    ]
+
+
+def bench_reports(recorder, db_path, start, days, repeat):
+    """Best latency (ms) and peak memory of each report command, with its printed output discarded"""
+    summary_data.DB_PATH = db_path
+    frame_summary.DB_PATH = db_path
+    for name, report in report_cases(start, days):
+        with contextlib.redirect_stdout(io.StringIO()):
+            elapsed = best_time(report, repeat)
+            peak = traced_peak(report)
+        recorder.add(f"report.{name}", elapsed * 1000, 'ms')
+        recorder.add(f"report.{name}.peak_memory", peak, 'MiB')
+
+
+def git_commit():
+    """Short hash of the checked-out commit, or None outside a git checkout"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline_path, meta, metrics, threshold):
+    """Print the change of every metric against a baseline run; returns the regressed metric names"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    print(f"\nCompared with {baseline_path} (commit {baseline['meta'].get('commit')})")
+    for key in ('stations', 'days', 'repeat'):
+        if baseline['meta'].get(key) != meta.get(key):
+            print(f"! Baseline used {key}={baseline['meta'].get(key)}, this run {meta.get(key)}")
+    print(f"{'Metric':<46} {'baseline':>12} {'current':>12} {'change':>9}")
+    print("-" * 82)
+    regressions = []
+    for name, metric in metrics.items():
+        previous = baseline['metrics'].get(name)
+        if not previous or not previous['value']:
+            continue
+        change = metric['value'] / previous['value'] - 1
+        worse = -change if metric['higher_is_better'] else change
+        flag = ''
+        if worse > threshold:
+            regressions.append(name)
+            flag = '  ✗'
+        print(f"{name:<46} {previous['value']:>12,.2f} {metric['value']:>12,.2f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ingest, storage and report benchmark suite')
+    parser.add_argument('--stations', type=int, default=2, help='Number of synthetic stations (default: 2)')
+    parser.add_argument('--years', type=float, default=1, help='Years of synthetic data per station (default: 1)')
+    parser.add_argument('--repeat', type=int, default=10, help='Runs per report (best is reported; mappers run half as often)')
+    parser.add_argument('--output', help=f'JSON result file (default: {RESULTS_DIR}/<date>-<commit>.json)')
+    parser.add_argument('--compare', help='Earlier JSON result to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Relative slowdown that counts as a regression with --compare (default: 0.2)')
+    args = parser.parse_args()
+
+    start = datetime(2024, 6, 1)
+    days = max(1, int(365 * args.years))
+    recorder = Recorder()
+    commit = git_commit()
+
+    print(f"Dataset: {args.stations} stations x {days} days = {args.stations * days * FRAMES_PER_DAY:,} frames")
+    started = time.perf_counter()
+    dataset = list(iter_dataset(args.stations, start, days))
+    print(f"Generated in {time.perf_counter() - started:.1f}s\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        with contextlib.redirect_stdout(io.StringIO()):
+            create_database(db_path)
+
+        print("Ingest")
+        bench_mapping(recorder, dataset, max(1, args.repeat // 2))
+        bench_ingest(recorder, db_path, dataset)
+        recorder.add('storage.database_size', os.path.getsize(db_path) / 2 ** 20, 'MiB')
+        del dataset
+
+        print("\nReports")
+        bench_reports(recorder, db_path, start, days, args.repeat)
+
+    result = {
+        'meta': {
+            'commit': commit,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'numpy': ingest.np is not None,
+            'platform': platform.platform(),
+            'stations': args.stations,
+            'days': days,
+            'repeat': args.repeat,
+        },
+        'metrics': recorder.metrics,
+    }
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{commit or 'nogit'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(result, f, indent=2)
+    print(f"\n✓ Results written to {output}")
+
+    if args.compare:
+        regressions = compare(args.compare, result['meta'], recorder.metrics, args.threshold)
+        if regressions:
+            print(f"\n✗ {len(regressions)} metric(s) regressed by more than {args.threshold:.0%}")
+            return 1
+        print(f"\n✓ No regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark for daily_logs timestamp predicates
+Builds a multi-year synthetic daily_logs table in a temporary database and
+compares the original DATE(timestamp) filters with the epoch `ts` range
+predicates used by frame_summary.py
+"""
+
+import sys
+import os
+import argparse
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add project root to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../'))
+from clientcode.database.connection import get_connection
+from clientcode.database.ingest import save_frames
+from clientcode.database.manage.db_setup import create_database
+
+FRAME_INTERVAL = 300  # 5-minute frames
+
+SUMMARY_COLUMNS = '''
+    COUNT(*), MIN(timestamp), MAX(timestamp), AVG(production_kw), MAX(production_kw),
+    AVG(consumption_kw), MAX(consumption_kw), AVG(grid_kw), AVG(battery_kw),
+    AVG(soc_percent), MAX(soc_percent)
+'''
+
+
+def populate(conn, stations, start, days):
+    """Insert `days` days of synthetic frames per station; returns the frame count"""
+    rng = random.Random(7)
+    total = 0
+    for station_id in range(1, stations + 1):
+        for day in range(days):
+            day_start = int((start + timedelta(days=day)).timestamp())
+            frames = [{
+                'timeStamp': day_start + i * FRAME_INTERVAL,
+                'generationPower': rng.uniform(0, 8000),
+                'consumptionPower': rng.uniform(200, 5000),
+                'gridPower': rng.uniform(-3000, 3000),
+                'batteryPower': rng.uniform(-4000, 4000),
+                'batterySOC': rng.randint(10, 100),
+            } for i in range(86400 // FRAME_INTERVAL)]
+            inserted, _ = save_frames(conn, station_id, frames)
+            total += inserted
+    return total
+
+
+def epoch_range(start_date, end_date):
+    """Half-open epoch range for an inclusive date range"""
+    start = datetime.strptime(start_date, '%Y-%m-%d')
+    end = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
+    return int(start.timestamp()), int(end.timestamp())
+
+
+def timed(conn, query, params, repeat):
+    """Best wall time (ms) of `repeat` executions and the rows returned"""
+    best = None
+    rows = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = conn.execute(query, params).fetchall()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='daily_logs timestamp predicate benchmark')
+    parser.add_argument('--years', type=int, default=3, help='Years of synthetic frames per station')
+    parser.add_argument('--stations', type=int, default=2, help='Number of synthetic stations')
+    parser.add_argument('--repeat', type=int, default=5, help='Executions per query (best is reported)')
+    args = parser.parse_args()
+
+    start = datetime(2022, 1, 1)
+    days = 365 * args.years
+    day = (start + timedelta(days=days // 2)).strftime('%Y-%m-%d')
+    month_start = day[:8] + '01'
+    month_end = (datetime.strptime(month_start, '%Y-%m-%d') + timedelta(days=31)).replace(day=1) - timedelta(days=1)
+    month_end = month_end.strftime('%Y-%m-%d')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        create_database(db_path)
+        conn = get_connection(db_path)
+
+        started = time.perf_counter()
+        frames = populate(conn, args.stations, start, days)
+        print(f"Inserted {frames:,} frames ({args.stations} stations x {args.years} years) "
+              f"in {time.perf_counter() - started:.1f}s")
+        conn.execute('ANALYZE')
+
+        day_range = epoch_range(day, day)
+        month_range = epoch_range(month_start, month_end)
+        cases = [
+            (f"frames for one day ({day}, station 1)",
+             "SELECT * FROM daily_logs WHERE DATE(timestamp) = ? AND station_id = ? ORDER BY timestamp DESC", (day, 1),
+             "SELECT * FROM daily_logs WHERE station_id = ? AND ts >= ? AND ts < ? ORDER BY ts DESC", (1, *day_range)),
+            (f"summary for one day ({day})",
+             f"SELECT {SUMMARY_COLUMNS} FROM daily_logs WHERE DATE(timestamp) BETWEEN ? AND ?", (day, day),
+             f"SELECT {SUMMARY_COLUMNS} FROM daily_logs WHERE ts >= ? AND ts < ?", day_range),
+            (f"summary for one month ({month_start}..{month_end}, station 1)",
+             f"SELECT {SUMMARY_COLUMNS} FROM daily_logs WHERE DATE(timestamp) BETWEEN ? AND ? AND station_id = ?",
+             (month_start, month_end, 1),
+             f"SELECT {SUMMARY_COLUMNS} FROM daily_logs WHERE ts >= ? AND ts < ? AND station_id = ?", (*month_range, 1)),
+        ]
+
+        print(f"\n{'Query':<60} {'DATE()':>10} {'ts range':>10} {'speedup':>9}")
+        print("-" * 93)
+        for label, legacy_sql, legacy_params, range_sql, range_params in cases:
+            legacy_ms, legacy_rows = timed(conn, legacy_sql, legacy_params, args.repeat)
+            range_ms, range_rows = timed(conn, range_sql, range_params, args.repeat)
+            if len(legacy_rows) != len(range_rows) or legacy_rows[0][:3] != range_rows[0][:3]:
+                print(f"✗ Result mismatch for: {label}")
+                return 1
+            print(f"{label:<60} {legacy_ms:>8.1f}ms {range_ms:>8.1f}ms {legacy_ms / range_ms:>8.1f}x")
+
+        conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
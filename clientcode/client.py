@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Shared DeyeCloud API client
+Keeps a single pooled HTTP session (keep-alive, per-endpoint timeouts) that
+every script reuses instead of calling requests.post for each request
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from clientcode import variable
+from clientcode.config import get_baseurl
+from clientcode.ratelimit import get_limiter, is_rate_limited, get_retry_after
+from clientcode.account.token_manager import get_token_manager, is_auth_failure
+
+# Default timeout (seconds) for endpoints not listed below
+DEFAULT_TIMEOUT = 30
+
+# Per-endpoint timeouts (seconds); history and order endpoints are the slowest
+ENDPOINT_TIMEOUTS = {
+    '/account/info': 15,
+    '/station/list': 15,
+    '/station/listWithDevice': 30,
+    '/station/device': 30,
+    '/station/latest': 15,
+    '/station/history': 60,
+    '/device/list': 30,
+    '/device/latest': 30,
+    '/device/history': 60,
+    '/device/measurePoints': 30,
+    '/order/': 30,
+    '/order/customControl': 60,
+    '/strategy/dynamicControl': 60,
+}
+
+# Size of the connection pool shared by all requests
+POOL_SIZE = 10
+
+# Retries of a throttled request before the throttled response is returned
+MAX_RATE_LIMIT_RETRIES = 5
+
+# Page sizes used when enumerating the paged list endpoints
+PAGE_SIZES = {
+    '/station/list': 100,
+    '/station/listWithDevice': 10,
+    '/station/device': 10,
+    '/device/list': 20,
+}
+
+
+def paginate(fetch_page, items_key, size, prefetch=True):
+    """Yield items from a paged endpoint, fetching pages lazily
+
+    fetch_page(page, size) returns the decoded JSON of one page. With
+    prefetch, the next page is requested on a background thread while the
+    items of the current one are being consumed. Stops at the reported
+    total, or at the first short or empty page; raises RuntimeError if the
+    API reports a failure so a fleet is never silently truncated.
+    """
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    try:
+        page = 1
+        seen = 0
+        pending = executor.submit(fetch_page, page, size) if executor else None
+        while True:
+            data = pending.result() if executor else fetch_page(page, size)
+            if not data.get('success', True):
+                raise RuntimeError(f"{items_key} page {page}: {data.get('msg')}")
+
+            items = data.get(items_key) or []
+            seen += len(items)
+            total = data.get('total')
+            if total is not None:
+                more = len(items) > 0 and seen < total
+            else:
+                more = len(items) >= size
+            if not more:
+                yield from items
+                return
+
+            # Ask for the next page before handing out this one
+            page += 1
+            if executor:
+                pending = executor.submit(fetch_page, page, size)
+            yield from items
+    finally:
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def decode_json(response):
+    """Decoded JSON body of an HTTP 200 response, or None if there is none"""
+    if response.status_code != 200:
+        return None
+    try:
+        return response.json()
+    except ValueError:
+        return None
+
+
+class DeyeCloudClient:
+    """Pooled DeyeCloud API client with typed helpers for each endpoint"""
+
+    def __init__(self, baseurl=None, headers=None, pool_size=POOL_SIZE, timeouts=None, limiter=None, token_manager=None):
+        self.baseurl = (baseurl or get_baseurl()).rstrip('/')
+        self.headers = dict(headers if headers is not None else variable.headers)
+        # Explicit headers pin the token; otherwise use the managed token when credentials exist
+        self.token_manager = token_manager or (get_token_manager() if headers is None else None)
+        self.timeouts = dict(ENDPOINT_TIMEOUTS)
+        if timeouts:
+            self.timeouts.update(timeouts)
+        self.limiter = limiter or get_limiter()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """Close the pooled connections"""
+        self.session.close()
+
+    def get_timeout(self, path):
+        """Timeout for an endpoint path, falling back to DEFAULT_TIMEOUT"""
+        if path.startswith('/order/') and path not in self.timeouts:
+            return self.timeouts['/order/']
+        return self.timeouts.get(path, DEFAULT_TIMEOUT)
+
+    def get_headers(self):
+        """Request headers, with the current managed token if there is one"""
+        if self.token_manager:
+            return self.token_manager.headers()
+        return self.headers
+
+    def request(self, method, path, data=None, timeout=None):
+        """Send a rate-limited request through the pooled session and return the raw response
+
+        A response rejecting the access token is retried once with a fresh token.
+        """
+        return self.send(method, path, data, timeout)[0]
+
+    def send(self, method, path, data=None, timeout=None):
+        """Like request(), but returns (response, decoded JSON body or None); the body is parsed once"""
+        reauthenticated = False
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            headers = self.get_headers()
+            response = self.session.request(
+                method,
+                self.baseurl + path,
+                headers=headers,
+                json=data,
+                timeout=timeout or self.get_timeout(path)
+            )
+            result = decode_json(response)
+            if is_rate_limited(response, result):
+                if attempt >= MAX_RATE_LIMIT_RETRIES:
+                    return response, result
+                attempt += 1
+                delay = self.limiter.throttled(get_retry_after(response))
+                print(f"Rate limited on {path}, backing off {delay:.1f}s")
+                continue
+
+            self.limiter.succeeded()
+            if self.token_manager and not reauthenticated and is_auth_failure(response, result):
+                reauthenticated = True
+                print(f"Access token rejected on {path}, refreshing and retrying")
+                self.token_manager.invalidate(headers['Authorization'].split(' ', 1)[-1])
+                continue
+            return response, result
+
+    def post(self, path, data=None, timeout=None):
+        """POST a JSON body to an endpoint and return the raw response"""
+        return self.request('POST', path, data if data is not None else {}, timeout)
+
+    def get(self, path, timeout=None):
+        """GET an endpoint and return the raw response"""
+        return self.request('GET', path, None, timeout)
+
+    def call(self, path, data=None):
+        """POST to an endpoint, raise on HTTP errors and return the decoded JSON"""
+        response, result = self.send('POST', path, data if data is not None else {})
+        response.raise_for_status()
+        return result if result is not None else response.json()
+
+    # Account
+
+    def account_info(self):
+        """POST /account/info"""
+        return self.call('/account/info')
+
+    # Station
+
+    def station_list(self, page=1, size=100):
+        """POST /station/list"""
+        return self.call('/station/list', {"page": page, "size": size})
+
+    def iter_stations(self, size=None, prefetch=True):
+        """Yield every station from /station/list, page by page"""
+        return paginate(
+            lambda page, size: self.station_list(page, size),
+            'stationList', size or PAGE_SIZES['/station/list'], prefetch
+        )
+
+    def station_list_with_device(self, page=1, size=10, device_type="INVERTER"):
+        """POST /station/listWithDevice"""
+        return self.call('/station/listWithDevice', {
+            "page": page,
+            "size": size,
+            "deviceType": device_type
+        })
+
+    def iter_stations_with_device(self, device_type="INVERTER", size=None, prefetch=True):
+        """Yield every station (with its devices) from /station/listWithDevice"""
+        return paginate(
+            lambda page, size: self.station_list_with_device(page, size, device_type),
+            'stationList', size or PAGE_SIZES['/station/listWithDevice'], prefetch
+        )
+
+    def station_device(self, station_ids, page=1, size=10):
+        """POST /station/device"""
+        return self.call('/station/device', {
+            "page": page,
+            "size": size,
+            "stationIds": list(station_ids)
+        })
+
+    def iter_station_devices(self, station_ids, size=None, prefetch=True):
+        """Yield every device of the given stations from /station/device"""
+        station_ids = list(station_ids)
+        return paginate(
+            lambda page, size: self.station_device(station_ids, page, size),
+            'deviceListItems', size or PAGE_SIZES['/station/device'], prefetch
+        )
+
+    def station_latest(self, station_id):
+        """POST /station/latest"""
+        return self.call('/station/latest', {"stationId": station_id})
+
+    def station_history(self, station_id, granularity, start_at, end_at=None):
+        """POST /station/history (granularity 1=frame, 2=day, 3=month, 4=year)"""
+        data = {
+            "stationId": station_id,
+            "granularity": granularity,
+            "startAt": start_at
+        }
+        if end_at is not None:
+            data["endAt"] = end_at
+        return self.call('/station/history', data)
+
+    # Device
+
+    def device_list(self, page=1, size=20):
+        """POST /device/list"""
+        return self.call('/device/list', {"page": page, "size": size})
+
+    def iter_devices(self, size=None, prefetch=True):
+        """Yield every device from /device/list, page by page"""
+        return paginate(
+            lambda page, size: self.device_list(page, size),
+            'deviceList', size or PAGE_SIZES['/device/list'], prefetch
+        )
+
+    def device_latest(self, device_sns):
+        """POST /device/latest (up to 10 devices per call)"""
+        return self.call('/device/latest', {"deviceList": list(device_sns)})
+
+    def device_history(self, device_sn, granularity, start_at, end_at=None, measure_points=None):
+        """POST /device/history"""
+        data = {
+            "deviceSn": device_sn,
+            "granularity": granularity,
+            "startAt": start_at
+        }
+        if end_at is not None:
+            data["endAt"] = end_at
+        if measure_points is not None:
+            data["measurePoints"] = list(measure_points)
+        return self.call('/device/history', data)
+
+    def device_measure_points(self, device_sn):
+        """POST /device/measurePoints"""
+        return self.call('/device/measurePoints', {"deviceSn": device_sn})
+
+    # Commission / strategy
+
+    def order(self, path, data):
+        """POST an /order/* command and return the decoded JSON (contains orderId)"""
+        return self.call('/order/' + path.lstrip('/'), data)
+
+    def order_status(self, order_id):
+        """GET /order/{orderId}"""
+        response, result = self.send('GET', f'/order/{order_id}')
+        response.raise_for_status()
+        return result if result is not None else response.json()
+
+    def custom_control(self, device_sn, content, timeout_seconds=600):
+        """POST /order/customControl with a Modbus frame as hex string"""
+        return self.call('/order/customControl', {
+            "deviceSn": device_sn,
+            "content": content,
+            "timeoutSeconds": timeout_seconds
+        })
+
+    def dynamic_control(self, data):
+        """POST /strategy/dynamicControl"""
+        return self.call('/strategy/dynamicControl', data)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Return the process-wide shared client, creating it on first use"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = DeyeCloudClient()
+            if _client.token_manager:
+                _client.token_manager.start()
+        return _client
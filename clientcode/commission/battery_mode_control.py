@@ -1,10 +1,8 @@
-import requests
-from clientcode import variable
+from clientcode.client import get_client
 
 # Set the value of battery-related parameter
 if __name__ == '__main__':
-    url = variable.baseurl + '/order/battery/modeControl'
-    headers = variable.headers
+    client = get_client()
 
     """
     Enable or disable the chargeMode
@@ -15,7 +13,7 @@ if __name__ == '__main__':
             "action": "on"
     }
 
-    response = requests.post(url, headers=headers, json=data)
+    response = client.post('/order/battery/modeControl', data)
 
     print(response.status_code)
     print(response.json())
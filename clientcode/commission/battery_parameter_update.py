@@ -1,10 +1,8 @@
-import requests
-from clientcode import variable
+from clientcode.client import get_client
 
 # Set the value of battery-related parameter
 if __name__ == '__main__':
-    url = variable.baseurl + '/order/battery/parameter/update'
-    headers = variable.headers
+    client = get_client()
 
     """
     Set the value for MAX_CHARGE_CURRENT and MAX_DISCHARGE_CURRENT
@@ -16,7 +14,7 @@ if __name__ == '__main__':
         "value": 0
     }
 
-    response = requests.post(url, headers=headers, json=data)
+    response = client.post('/order/battery/parameter/update', data)
 
     print(response.status_code)
     print(response.json())
@@ -1,10 +1,8 @@
-import requests
-from clientcode import variable
+from clientcode.client import get_client
 
 # Set battery type
 if __name__ == '__main__':
-    url = variable.baseurl + '/order/battery/type/update'
-    headers = variable.headers
+    client = get_client()
 
     """
     If the inverter type is Three phase LV Hybrid or Single phase LV Hybrid, 4 battery types supported: BATT_V;
@@ -17,7 +15,7 @@ if __name__ == '__main__':
         "batteryType": "LI"
     }
 
-    response = requests.post(url, headers=headers, json=data)
+    response = client.post('/order/battery/type/update', data)
 
     print(response.status_code)
     print(response.json())
@@ -1,13 +1,11 @@
-import requests
-from clientcode import variable
+from clientcode.client import get_client
 
 # Get the status of command execution
 if __name__ == '__main__':
     orderId = '000000'   # Replace with orderId you sent
-    url = variable.baseurl + '/order/' + orderId
-    headers = variable.headers
+    client = get_client()
 
-    response = requests.get(url, headers=headers)
+    response = client.get('/order/' + orderId)
 
     print(response.status_code)
     print(response.json())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Modbus RTU frame codec for /order/customControl
+Builds request frames into one preallocated bytearray with struct, appends a
+table-driven CRC16 (no crcmod needed) and decodes register payloads in bulk
+with array. Output matches the original customControll.py functions.
+"""
+
+import struct
+import sys
+from array import array
+from binascii import unhexlify
+
+# Modbus CRC16: reflected polynomial 0x8005, initial value 0xFFFF, no final XOR
+CRC16_POLY = 0xA001
+CRC16_INIT = 0xFFFF
+
+
+def make_crc16_table(poly=CRC16_POLY):
+    """CRC of every byte value, so the CRC advances a byte per lookup instead of a bit per step"""
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ poly if crc & 1 else crc >> 1
+        table.append(crc)
+    return tuple(table)
+
+
+CRC16_TABLE = make_crc16_table()
+
+# Function codes
+READ_HOLDING_REGISTERS = 3
+WRITE_SINGLE_REGISTER = 6
+WRITE_MULTIPLE_REGISTERS = 16
+
+# Request header: slave id, function code, register address, count (or value)
+REQUEST_HEADER = struct.Struct('>BBHH')
+CRC = struct.Struct('<H')
+
+MODBUS_ERRORS = {
+    1: "Illegal Function",
+    2: "Illegal Data Address",
+    3: "Illegal Data Value",
+    4: "Server Failure"
+}
+
+
+def crc16(data, crc=CRC16_INIT):
+    """Modbus CRC16 of bytes, a bytearray or a memoryview"""
+    table = CRC16_TABLE
+    for byte in data:
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+    return crc
+
+
+def build_frame(slave_id, fc, reg, count, data_values=None):
+    """Request frame with CRC as a bytearray (FC3 read, FC6 single write or FC16 multiple write)"""
+    if fc == READ_HOLDING_REGISTERS:
+        frame = bytearray(REQUEST_HEADER.size + CRC.size)
+        REQUEST_HEADER.pack_into(frame, 0, slave_id, fc, reg & 0xFFFF, count & 0xFFFF)
+    elif fc == WRITE_SINGLE_REGISTER:
+        frame = bytearray(REQUEST_HEADER.size + CRC.size)
+        REQUEST_HEADER.pack_into(frame, 0, slave_id, fc, reg & 0xFFFF, data_values[0] & 0xFFFF)
+    elif fc == WRITE_MULTIPLE_REGISTERS:
+        values = array('H', [value & 0xFFFF for value in data_values])
+        if sys.byteorder == 'little':
+            values.byteswap()
+        payload = values.tobytes()
+        frame = bytearray(REQUEST_HEADER.size + 1 + len(payload) + CRC.size)
+        REQUEST_HEADER.pack_into(frame, 0, slave_id, fc, reg & 0xFFFF, count & 0xFFFF)
+        frame[REQUEST_HEADER.size] = count * 2
+        frame[REQUEST_HEADER.size + 1:REQUEST_HEADER.size + 1 + len(payload)] = payload
+    else:
+        raise ValueError(f"Unsupported function code: {fc}")
+
+    body = len(frame) - CRC.size
+    CRC.pack_into(frame, body, crc16(memoryview(frame)[:body]))
+    return frame
+
+
+def to_hex(frame):
+    """Spaced upper-case hex string, the format customControl expects"""
+    return frame.hex(' ').upper()
+
+
+def build_modbus_message(slave_id, fc, reg, count, data_values=None):
+    """Construct Modbus message with CRC as a spaced hex string"""
+    return to_hex(build_frame(slave_id, fc, reg, count, data_values))
+
+
+def decode_registers(payload):
+    """Big-endian 16-bit registers of a payload as a list of ints"""
+    values = array('H')
+    values.frombytes(payload[:len(payload) // 2 * 2])
+    if sys.byteorder == 'little':
+        values.byteswap()
+    return values.tolist()
+
+
+def parse_frame(data):
+    """Parse a Modbus response frame (bytes) into human-readable format"""
+    try:
+        if len(data) < 3:
+            return "Invalid response (too short)"
+
+        slave = data[0]
+        func = data[1]
+
+        if func & 0x80:  # Error response
+            error_code = data[2]
+            return f"ERROR: {MODBUS_ERRORS.get(error_code, f'Unknown ({error_code})')}"
+
+        if func == READ_HOLDING_REGISTERS:
+            # Registers announced by the byte count that are present in the frame
+            registers = min((data[2] + 1) // 2, (len(data) - 3) // 2)
+            return {
+                'Slave': slave,
+                'Function': 'Read',
+                'Values': decode_registers(memoryview(data)[3:3 + registers * 2])
+            }
+        elif func in (WRITE_SINGLE_REGISTER, WRITE_MULTIPLE_REGISTERS):
+            return {
+                'Slave': slave,
+                'Function': 'Write',
+                'Address': (data[2] << 8) | data[3],
+                'Count': (data[4] << 8) | data[5]
+            }
+        else:
+            return f"Unknown function code: {func}"
+    except Exception as e:
+        return f"Parse error: {str(e)}"
+
+
+def parse_response(hex_str):
+    """Parse a Modbus response hex string (analysisResult) into human-readable format"""
+    try:
+        data = unhexlify(hex_str.replace(' ', ''))
+    except Exception as e:
+        return f"Parse error: {str(e)}"
+    return parse_frame(data)
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Batch Modbus register reader
+Plans the fewest FC3 (read holding registers) requests covering a list of
+registers, merging adjacent and nearby addresses within the 125-register
+limit, sends them as parallel /order/customControl orders and decodes the
+replies into {address: value}.
+"""
+
+import sys
+import os
+import argparse
+from concurrent.futures import as_completed
+
+# Add project root to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../'))
+from clientcode.commission.modbus_codec import READ_HOLDING_REGISTERS, build_modbus_message, parse_response
+from clientcode.commission.order_tracker import ORDER_SUCCESS, OrderTracker
+
+# Holding registers a single FC3 request may read (Modbus limit)
+MAX_READ_REGISTERS = 125
+
+# Unrequested registers a read may span to merge two requested ranges; one
+# order costs far more than a few extra registers in the reply
+DEFAULT_MAX_GAP = 16
+
+# timeoutSeconds sent with each customControl order
+ORDER_TIMEOUT_SECONDS = 600
+
+DEFAULT_SLAVE_ID = 1
+
+
+def register_ranges(registers):
+    """Sorted, merged (start, count) ranges of register addresses and (address, count) pairs"""
+    spans = sorted(
+        (register, 1) if isinstance(register, int) else (int(register[0]), int(register[1]))
+        for register in registers
+    )
+    ranges = []
+    for start, count in spans:
+        if count < 1:
+            continue
+        if ranges and start <= ranges[-1][0] + ranges[-1][1]:
+            previous_start, previous_count = ranges[-1]
+            ranges[-1] = (previous_start, max(previous_count, start + count - previous_start))
+        else:
+            ranges.append((start, count))
+    return ranges
+
+
+def plan_reads(registers, max_gap=DEFAULT_MAX_GAP, max_count=MAX_READ_REGISTERS):
+    """Fewest (start, count) FC3 reads covering the registers
+
+    Ranges separated by at most `max_gap` unrequested registers share a read as
+    long as it stays within `max_count` registers; longer ranges are split.
+    """
+    reads = []
+    for start, count in register_ranges(registers):
+        if reads:
+            read_start, read_count = reads[-1]
+            gap = start - (read_start + read_count)
+            if gap <= max_gap and start + count - read_start <= max_count:
+                reads[-1] = (read_start, start + count - read_start)
+                continue
+            if gap <= max_gap and read_count < max_count:
+                # Fill the previous read up to the limit before starting a new one
+                taken = min(max_count - read_count - gap, count)
+                if taken > 0:
+                    reads[-1] = (read_start, read_count + gap + taken)
+                    start, count = start + taken, count - taken
+        while count > 0:
+            reads.append((start, min(count, max_count)))
+            start, count = start + max_count, count - max_count
+    return reads
+
+
+def decode_read(analysis, start, count):
+    """{address: value} of one FC3 reply; raises RuntimeError for an error or short reply"""
+    parsed = parse_response(analysis or '')
+    if not isinstance(parsed, dict):
+        raise RuntimeError(parsed)
+    values = parsed.get('Values') or []
+    if len(values) < count:
+        raise RuntimeError(f"Short reply: {len(values)} of {count} registers")
+    return {start + i: value for i, value in enumerate(values[:count])}
+
+
+def read_registers(device_sn, registers, slave_id=DEFAULT_SLAVE_ID, tracker=None, max_gap=DEFAULT_MAX_GAP):
+    """Read holding registers of one device with parallel planned orders
+
+    Returns ({address: value} of the requested registers, {(start, count): error} of failed reads).
+    """
+    if tracker is None:
+        with OrderTracker() as tracker:
+            return read_registers(device_sn, registers, slave_id, tracker, max_gap)
+
+    requested = {address for start, count in register_ranges(registers) for address in range(start, start + count)}
+    futures = {
+        tracker.submit('/order/customControl', {
+            "deviceSn": device_sn,
+            "content": build_modbus_message(slave_id, READ_HOLDING_REGISTERS, start, count),
+            "timeoutSeconds": ORDER_TIMEOUT_SECONDS
+        }): (start, count)
+        for start, count in plan_reads(registers, max_gap)
+    }
+
+    values = {}
+    errors = {}
+    for future in as_completed(futures):
+        start, count = futures[future]
+        try:
+            data = future.result()
+            if data.get('status') != ORDER_SUCCESS:
+                raise RuntimeError(f"Order ended with status {data.get('status')}: {data.get('error', 'Unknown error')}")
+            values.update(decode_read(data.get('analysisResult'), start, count))
+        except Exception as e:
+            errors[(start, count)] = str(e)
+    return {address: values[address] for address in sorted(requested) if address in values}, errors
+
+
+def parse_register_spec(spec):
+    """'600' -> (600, 1), '600-640' -> (600, 41)"""
+    first, _, last = spec.partition('-')
+    first = int(first)
+    last = int(last) if last else first
+    if last < first:
+        raise argparse.ArgumentTypeError(f"Invalid register range: {spec}")
+    return first, last - first + 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Read holding registers with the fewest parallel Modbus orders')
+    parser.add_argument('--device', required=True, help='Device serial number')
+    parser.add_argument('--registers', nargs='+', type=parse_register_spec, required=True,
+                        help='Register addresses or inclusive ranges (decimal), e.g. 0-20 60 600-640')
+    parser.add_argument('--slave', type=int, default=DEFAULT_SLAVE_ID, help=f'Modbus slave id (default: {DEFAULT_SLAVE_ID})')
+    parser.add_argument('--max-gap', type=int, default=DEFAULT_MAX_GAP,
+                        help=f'Unrequested registers a read may span to merge ranges (default: {DEFAULT_MAX_GAP})')
+    parser.add_argument('--plan', action='store_true', help='Only print the planned reads')
+    args = parser.parse_args()
+
+    reads = plan_reads(args.registers, args.max_gap)
+    requested = sum(count for _, count in register_ranges(args.registers))
+    print(f"{requested} registers in {len(reads)} reads:")
+    for start, count in reads:
+        print(f"  FC3 {start}-{start + count - 1} ({count} registers)")
+    if args.plan:
+        return 0
+
+    values, errors = read_registers(args.device, args.registers, args.slave, max_gap=args.max_gap)
+    print(f"\n{'Register':<10} {'Value':<8} {'Hex':<6}")
+    print("-" * 26)
+    for address, value in values.items():
+        print(f"{address:<10} {value:<8} {value:04X}")
+    for (start, count), error in sorted(errors.items()):
+        print(f"✗ Read {start}-{start + count - 1} failed: {error}")
+
+    print(f"\n{len(values)}/{requested} registers read")
+    return 0 if not errors else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Concurrent order tracker for /order/* commands
+Submits commands for many devices at once and polls every pending orderId
+from one scheduler thread, checking each order soon after it is created and
+then less and less often. Each command returns a Future that resolves to its
+final GET /order/{orderId} response.
+"""
+
+import sys
+import os
+import argparse
+import heapq
+import itertools
+import json
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor, as_completed
+
+# Add project root to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../'))
+from clientcode.client import get_client
+
+# Order status codes returned by GET /order/{orderId}
+ORDER_CREATED = 0
+ORDER_SENDING = 100
+ORDER_SUCCESS = 666
+PENDING_STATUSES = (ORDER_CREATED, ORDER_SENDING)
+
+# Status polling: first check after FIRST_POLL_INTERVAL seconds, then each
+# interval is POLL_BACKOFF times longer, up to MAX_POLL_INTERVAL
+FIRST_POLL_INTERVAL = 1.0
+POLL_BACKOFF = 1.5
+MAX_POLL_INTERVAL = 10.0
+
+# Seconds an order may stay pending before its future fails with TimeoutError
+DEFAULT_ORDER_TIMEOUT = 120
+
+# Submissions and status checks in flight at once (the shared rate limiter still applies)
+DEFAULT_WORKERS = 8
+
+
+class PendingOrder:
+    """Polling state of one submitted order"""
+
+    def __init__(self, order_id, future, deadline, interval):
+        self.order_id = order_id
+        self.future = future
+        self.deadline = deadline
+        self.interval = interval
+        self.polls = 0
+
+
+class OrderTracker:
+    """Submits orders and polls all pending ones concurrently with backing-off intervals"""
+
+    def __init__(self, client=None, workers=DEFAULT_WORKERS, timeout=DEFAULT_ORDER_TIMEOUT,
+                 first_interval=FIRST_POLL_INTERVAL, backoff=POLL_BACKOFF, max_interval=MAX_POLL_INTERVAL):
+        self.client = client or get_client()
+        self.timeout = timeout
+        self.first_interval = first_interval
+        self.backoff = backoff
+        self.max_interval = max_interval
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.condition = threading.Condition()
+        self.schedule = []  # heap of (due, sequence, PendingOrder)
+        self.sequence = itertools.count()
+        self.futures = set()  # unresolved order futures; each removes itself when it resolves
+        self.closed = False
+        self.poller = threading.Thread(target=self.poll_loop, name='order-poller', daemon=True)
+        self.poller.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(wait=exc_type is None)
+
+    def close(self, wait=True):
+        """Stop polling; with wait, first let every tracked order finish or time out"""
+        if wait:
+            for future in self.pending():
+                try:
+                    future.exception()
+                except Exception:
+                    pass
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        self.poller.join()
+        self.executor.shutdown(wait=wait, cancel_futures=True)
+        for future in self.pending():
+            try:
+                future.set_exception(RuntimeError('Order tracker closed before the order finished'))
+            except InvalidStateError:  # Already resolved
+                pass
+
+    def pending(self):
+        """Snapshot of the order futures that have not resolved yet"""
+        with self.condition:
+            return list(self.futures)
+
+    def new_future(self):
+        """A running Future that stays in self.futures until it resolves"""
+        future = Future()
+        future.set_running_or_notify_cancel()
+        with self.condition:
+            self.futures.add(future)
+        future.add_done_callback(self.forget)
+        return future
+
+    def forget(self, future):
+        with self.condition:
+            self.futures.discard(future)
+
+    def submit(self, path, data):
+        """POST an /order/* (or /strategy/dynamicControl) command; returns a Future of its final status"""
+        future = self.new_future()
+        self.executor.submit(self.send, path, data, future)
+        return future
+
+    def submit_devices(self, path, device_sns, data):
+        """Send the same command body to every device; returns {device_sn: Future}"""
+        return {
+            device_sn: self.submit(path, dict(data, deviceSn=device_sn))
+            for device_sn in device_sns
+        }
+
+    def track(self, order_id):
+        """Poll an order that was already submitted; returns a Future of its final status"""
+        future = self.new_future()
+        self.watch(order_id, future)
+        return future
+
+    def send(self, path, data, future):
+        try:
+            result = self.client.call(path, data)
+        except Exception as e:
+            future.set_exception(e)
+            return
+        order_id = result.get('orderId')
+        if not result.get('success', True) or not order_id:
+            future.set_exception(RuntimeError(f"{path}: {result.get('msg') or 'no orderId returned'}"))
+            return
+        self.watch(order_id, future)
+
+    def watch(self, order_id, future):
+        now = time.monotonic()
+        order = PendingOrder(order_id, future, now + self.timeout, self.first_interval)
+        self.schedule_check(order, now + order.interval)
+
+    def schedule_check(self, order, due):
+        with self.condition:
+            heapq.heappush(self.schedule, (min(due, order.deadline), next(self.sequence), order))
+            self.condition.notify()
+
+    def poll_loop(self):
+        """Hand each order to a worker for a status check when it falls due"""
+        while True:
+            with self.condition:
+                while not self.closed:
+                    if self.schedule:
+                        delay = self.schedule[0][0] - time.monotonic()
+                        if delay <= 0:
+                            break
+                        self.condition.wait(delay)
+                    else:
+                        self.condition.wait()
+                if self.closed:
+                    return
+                _, _, order = heapq.heappop(self.schedule)
+            try:
+                self.executor.submit(self.check, order)
+            except RuntimeError:  # Executor shut down
+                return
+
+    def check(self, order):
+        """One status request; resolves the future or reschedules the order"""
+        order.polls += 1
+        try:
+            data = self.client.order_status(order.order_id)
+        except Exception as e:
+            # Transient HTTP or network error: keep polling until the deadline
+            print(f"Error fetching order {order.order_id}: {e}")
+            data = None
+
+        if data is not None:
+            if not data.get('success', True):
+                order.future.set_exception(RuntimeError(f"Order {order.order_id}: {data.get('msg')}"))
+                return
+            if data.get('status') not in PENDING_STATUSES:
+                order.future.set_result(data)
+                return
+
+        now = time.monotonic()
+        if now >= order.deadline:
+            order.future.set_exception(
+                TimeoutError(f"Order {order.order_id} still pending after {self.timeout}s ({order.polls} checks)"))
+            return
+        order.interval = min(order.interval * self.backoff, self.max_interval)
+        self.schedule_check(order, now + order.interval)
+
+
+def describe_result(future):
+    """One-line outcome of a finished order future"""
+    try:
+        data = future.result()
+    except Exception as e:
+        return False, f"✗ {e}"
+    if data.get('status') == ORDER_SUCCESS:
+        analysis = data.get('analysisResult')
+        return True, f"✓ Order {data.get('orderId')} succeeded" + (f": {analysis}" if analysis else '')
+    return False, f"✗ Order {data.get('orderId')} ended with status {data.get('status')}: {data.get('error', 'Unknown error')}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Send one /order/* command to many devices and track every order concurrently')
+    parser.add_argument('path', help='Order endpoint, e.g. /order/battery/modeControl or /order/sys/tou/update')
+    parser.add_argument('--devices', nargs='+', required=True, help='Device serial numbers')
+    parser.add_argument('--body', default='{}', help='JSON request body without deviceSn, or @file.json')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Requests in flight at once (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_ORDER_TIMEOUT,
+                        help=f'Seconds to wait for each order (default: {DEFAULT_ORDER_TIMEOUT})')
+    args = parser.parse_args()
+
+    try:
+        if args.body.startswith('@'):
+            with open(args.body[1:]) as f:
+                body = json.load(f)
+        else:
+            body = json.loads(args.body)
+    except (OSError, ValueError) as e:
+        print(f"Invalid request body: {e}")
+        return 1
+
+    path = args.path if args.path.startswith('/') else '/' + args.path
+    started = time.monotonic()
+    succeeded = 0
+    with OrderTracker(workers=args.workers, timeout=args.timeout) as tracker:
+        futures = tracker.submit_devices(path, args.devices, body)
+        devices = {future: device_sn for device_sn, future in futures.items()}
+        print(f"Sent {path} to {len(futures)} devices, tracking orders...")
+        for future in as_completed(futures.values()):
+            ok, message = describe_result(future)
+            succeeded += ok
+            print(f"[{devices[future]}] {message}")
+
+    print(f"\n{succeeded}/{len(args.devices)} orders succeeded in {time.monotonic() - started:.1f}s")
+    return 0 if succeeded == len(args.devices) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,16 +1,14 @@
-import requests
-from clientcode import variable
+from clientcode.client import get_client
 
 # Set energy pattern as BATTERY_FIRST or LOAD_FIRST
 if __name__ == '__main__':
-    url = variable.baseurl + '/order/sys/energyPattern/update'
-    headers = variable.headers
+    client = get_client()
     data = {
         "deviceSn": "000000",
         "energyPattern": "BATTERY_FIRST"        # options:BATTERY_FIRST;LOAD_FIRST
     }
 
-    response = requests.post(url, headers=headers, json=data)
+    response = client.post('/order/sys/energyPattern/update', data)
 
     print(response.status_code)
     print(response.json())
@@ -1,10 +1,8 @@
-import requests
-from clientcode import variable
+from clientcode.client import get_client
 
 # Set the value for MAX_SELL_POWER or MAX_SOLAR_POWER
 if __name__ == '__main__':
-    url = variable.baseurl + '/order/sys/power/update'
-    headers = variable.headers
+    client = get_client()
 
     """
     powerType= MAX_SELL_POWER or MAX_SOLAR_POWER; value=the value you want to set
@@ -15,7 +13,7 @@ if __name__ == '__main__':
         "value": 0
     }
 
-    response = requests.post(url, headers=headers, json=data)
+    response = client.post('/order/sys/power/update', data)
 
     print(response.status_code)
     print(response.json())
@@ -1,15 +1,13 @@
-import requests
-from clientcode import variable
+from clientcode.client import get_client
 
 # Enable or disable solar sell
 if __name__ == '__main__':
-    url = variable.baseurl + '/order/sys/solarSell/control'
-    headers = variable.headers
+    client = get_client()
     data = {
         "action": "off",            # Enable: action=on; Disable: action=off
         "deviceSn": "000000"
     }
 
-    response = requests.post(url, headers=headers, json=data)
+    response = client.post('/order/sys/solarSell/control', data)
     print(response.status_code)
     print(response.json())
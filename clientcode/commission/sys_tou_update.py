@@ -1,10 +1,8 @@
-import requests
-from clientcode import variable
+from clientcode.client import get_client
 
 # Set time of use for the device
 if __name__ == '__main__':
-    url = variable.baseurl + '/order/sys/tou/update'
-    headers = variable.headers
+    client = get_client()
 
     # request body
     data = {
@@ -57,7 +55,7 @@ if __name__ == '__main__':
     }
 
     # request post
-    response = requests.post(url, headers=headers, json=data)
+    response = client.post('/order/sys/tou/update', data)
 
     print(response.status_code)
     print(response.json())
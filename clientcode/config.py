@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Environment overrides for the DeyeCloud API settings in variable.py
+Lets the same scripts run against the local mock server (clientcode/mock)
+or a test deployment without editing variable.py
+"""
+
+import os
+
+from clientcode import variable
+
+# API base URL, e.g. DEYE_BASEURL=http://127.0.0.1:8765/v1.0
+BASEURL_ENV = 'DEYE_BASEURL'
+
+# Client-side rate limit (requests per second) and burst size
+API_RATE_ENV = 'DEYE_API_RATE'
+API_BURST_ENV = 'DEYE_API_BURST'
+
+
+def get_baseurl():
+    """API base URL without trailing slash: $DEYE_BASEURL, else variable.baseurl"""
+    return (os.environ.get(BASEURL_ENV) or variable.baseurl).rstrip('/')
+
+
+def get_api_rate(default_rate, default_burst):
+    """(rate, burst) for the shared limiter: environment, else variable.py, else the defaults"""
+    rate = os.environ.get(API_RATE_ENV) or getattr(variable, 'api_rate', default_rate)
+    burst = os.environ.get(API_BURST_ENV) or getattr(variable, 'api_burst', default_burst)
+    return float(rate), int(burst)
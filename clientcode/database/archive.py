@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Cold archive of daily_logs frames
+Frames older than a cutoff are moved out of SQLite into one fixed-width binary
+file per station and month (int64 epoch ts + float32 columns, NaN for NULL).
+Files are read back through mmap; with NumPy they are exposed as zero-copy
+structured views and sliced by binary search on ts, otherwise records are
+unpacked one at a time with struct.
+The hourly/daily rollups are kept, so summaries still cover archived months.
+"""
+
+import heapq
+import math
+import mmap
+import os
+import struct
+from datetime import datetime, timedelta
+
+from clientcode.database.connection import DB_PATH
+from clientcode.database.ingest import format_timestamps
+from clientcode.database.records import Frame
+
+try:
+    import numpy as np
+except ImportError:  # Pure-Python fallback
+    np = None
+
+ARCHIVE_DIR = os.path.join(os.path.dirname(os.path.abspath(DB_PATH)), 'archive')
+
+# daily_logs columns stored as float32, in record order after ts
+ARCHIVE_COLUMNS = (
+    'production_kw', 'consumption_kw', 'grid_kw', 'battery_kw',
+    'soc_percent', 'pv_kw', 'generator_kw', 'grid_tied_inverter_power_kw'
+)
+
+# 16-byte header: magic, format version, record size, reserved
+HEADER = struct.Struct('<4sHH8x')
+MAGIC = b'DYFA'
+VERSION = 1
+
+RECORD = struct.Struct('<q' + 'f' * len(ARCHIVE_COLUMNS))
+
+if np is not None:
+    RECORD_DTYPE = np.dtype([('ts', '<i8')] + [(name, '<f4') for name in ARCHIVE_COLUMNS])
+
+# The API reports watts with at most one decimal, so kW values never need more
+# than 4 decimals; rounding drops the float32 representation noise
+DECIMALS = 4
+
+FILE_SUFFIX = '.frames'
+
+
+def month_path(station_id, month, archive_dir=None):
+    """Archive file of one station and YYYY-MM month"""
+    return os.path.join(archive_dir or ARCHIVE_DIR, str(station_id), month + FILE_SUFFIX)
+
+
+def month_bounds(month):
+    """Half-open local-time epoch range of a YYYY-MM month"""
+    start = datetime.strptime(month, '%Y-%m')
+    end = (start + timedelta(days=32)).replace(day=1)
+    return int(start.timestamp()), int(end.timestamp())
+
+
+def archived_months(archive_dir=None):
+    """{station_id: sorted [YYYY-MM, ...]} of every archive file"""
+    archive_dir = archive_dir or ARCHIVE_DIR
+    months = {}
+    if not os.path.isdir(archive_dir):
+        return months
+    for name in os.listdir(archive_dir):
+        station_dir = os.path.join(archive_dir, name)
+        if not name.isdigit() or not os.path.isdir(station_dir):
+            continue
+        months[int(name)] = sorted(
+            entry[:-len(FILE_SUFFIX)] for entry in os.listdir(station_dir) if entry.endswith(FILE_SUFFIX)
+        )
+    return months
+
+
+class ArchiveMonth:
+    """Read-only memory map of one archive file"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size > HEADER.size else None
+        if self.mm is None:
+            self.count = 0
+            self.records = None
+            return
+
+        magic, version, record_size = HEADER.unpack_from(self.mm)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            raise ValueError(f"Not a version {VERSION} frame archive: {path}")
+        self.count = (len(self.mm) - HEADER.size) // RECORD.size
+        # Zero-copy view of the records; slicing it reads only the pages touched
+        self.records = np.frombuffer(self.mm, RECORD_DTYPE, self.count, HEADER.size) if np is not None else None
+
+    def ts_at(self, index):
+        return struct.unpack_from('<q', self.mm, HEADER.size + index * RECORD.size)[0]
+
+    def bisect(self, ts):
+        """Index of the first record with ts >= the given ts"""
+        if self.records is not None:
+            return int(np.searchsorted(self.records['ts'], ts, 'left'))
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.ts_at(middle) < ts:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def slice(self, start_ts=None, end_ts=None):
+        """(first, last) record indexes with start_ts <= ts < end_ts"""
+        first = self.bisect(start_ts) if start_ts is not None else 0
+        last = self.bisect(end_ts) if end_ts is not None else self.count
+        return first, max(first, last)
+
+    def columns(self, first, last):
+        """{'ts': [...], column: [...]} of records first..last-1 (NaN as None)"""
+        if first >= last:
+            return {name: [] for name in ('ts',) + ARCHIVE_COLUMNS}
+        if self.records is not None:
+            view = self.records[first:last]
+            columns = {'ts': view['ts'].tolist()}
+            for name in ARCHIVE_COLUMNS:
+                values = np.round(view[name].astype(np.float64), DECIMALS)
+                columns[name] = [None if value != value else value for value in values.tolist()]
+            return columns
+
+        rows = [RECORD.unpack_from(self.mm, HEADER.size + i * RECORD.size) for i in range(first, last)]
+        columns = {'ts': [row[0] for row in rows]}
+        for i, name in enumerate(ARCHIVE_COLUMNS, 1):
+            columns[name] = [None if math.isnan(row[i]) else round(row[i], DECIMALS) for row in rows]
+        return columns
+
+
+def read_month(station_id, month, start_ts=None, end_ts=None, archive_dir=None):
+    """daily_logs-shaped columns (timestamp, ts and ARCHIVE_COLUMNS) of one archive file within [start_ts, end_ts)"""
+    path = month_path(station_id, month, archive_dir)
+    if not os.path.exists(path):
+        return None
+    archive = ArchiveMonth(path)
+    columns = archive.columns(*archive.slice(start_ts, end_ts))
+    columns['timestamp'] = format_timestamps(columns['ts'])
+    return columns
+
+
+def iter_station_frames(station_id, months, start_ts=None, end_ts=None, descending=False,
+                        batch_size=500, archive_dir=None):
+    """Yield Frame records of one station in ts order
+
+    Reads at most `batch_size` records into Python objects at a time.
+    """
+    for month in (reversed(months) if descending else months):
+        month_start, month_end = month_bounds(month)
+        if (start_ts is not None and month_end <= start_ts) or (end_ts is not None and month_start >= end_ts):
+            continue
+        path = month_path(station_id, month, archive_dir)
+        if not os.path.exists(path):
+            continue
+        archive = ArchiveMonth(path)
+        first, last = archive.slice(start_ts, end_ts)
+        bounds = range(first, last, batch_size)
+        for batch_start in (reversed(bounds) if descending else bounds):
+            columns = archive.columns(batch_start, min(batch_start + batch_size, last))
+            timestamps = format_timestamps(columns['ts'])
+            frames = [
+                Frame(timestamps[i], station_id, *(columns[name][i] for name in ARCHIVE_COLUMNS), columns['ts'][i])
+                for i in range(len(timestamps))
+            ]
+            yield from (reversed(frames) if descending else frames)
+
+
+def frame_key(frame):
+    """Sort key of a Frame: (ts, station_id)"""
+    return frame.key
+
+
+def iter_archived_frames(station_id=None, start_ts=None, end_ts=None, descending=False, archive_dir=None):
+    """Yield archived Frame records of one or every station, ordered by (ts, station_id)"""
+    months = archived_months(archive_dir)
+    stations = [int(station_id)] if station_id else sorted(months)
+    return heapq.merge(
+        *(iter_station_frames(station, months.get(station, []), start_ts, end_ts, descending, archive_dir=archive_dir)
+          for station in stations),
+        key=frame_key, reverse=descending
+    )
+
+
+def write_month(path, records):
+    """Write sorted (ts, *ARCHIVE_COLUMNS) tuples to an archive file atomically"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    nan = float('nan')
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+        f.write(b''.join(
+            RECORD.pack(ts, *(nan if value is None else value for value in values)) for ts, *values in records
+        ))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def archive_month(conn, station_id, month, archive_dir=None):
+    """Move one station-month of daily_logs into its archive file; returns the frames moved
+
+    Frames already in the file are kept; the file is written and synced before
+    the rows are deleted, so an interruption can only leave duplicates, which a
+    rerun merges away.
+    """
+    start_ts, end_ts = month_bounds(month)
+    rows = conn.execute(f'''
+        SELECT ts, {', '.join(ARCHIVE_COLUMNS)}
+        FROM daily_logs
+        WHERE station_id = ? AND ts >= ? AND ts < ?
+        ORDER BY ts
+    ''', (station_id, start_ts, end_ts)).fetchall()
+    if not rows:
+        return 0
+
+    path = month_path(station_id, month, archive_dir)
+    merged = {}
+    if os.path.exists(path):
+        archive = ArchiveMonth(path)
+        existing = archive.columns(0, archive.count)
+        for i, ts in enumerate(existing['ts']):
+            merged[ts] = (ts, *(existing[name][i] for name in ARCHIVE_COLUMNS))
+    merged.update((row[0], row) for row in rows)
+    write_month(path, [merged[ts] for ts in sorted(merged)])
+
+    with conn:
+        conn.execute('DELETE FROM daily_logs WHERE station_id = ? AND ts >= ? AND ts < ?',
+                     (station_id, start_ts, end_ts))
+    return len(rows)
+
+
+def months_to_archive(conn, cutoff):
+    """(station_id, YYYY-MM) of the daily_logs months that end before the cutoff datetime"""
+    cutoff = cutoff.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    return conn.execute('''
+        SELECT DISTINCT station_id, substr(timestamp, 1, 7)
+        FROM daily_logs
+        WHERE ts < ?
+        ORDER BY station_id, 2
+    ''', (int(cutoff.timestamp()),)).fetchall()
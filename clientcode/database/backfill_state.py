@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Backfill planning and checkpoints
+Works out which days of a requested range still need fetching (missing from
+daily_data, or with fewer daily_logs frames than the expected cadence) and
+records the outcome of every fetched day in backfill_state, so an interrupted
+backfill resumes where it stopped and days the API has no data for are not
+re-requested on every run.
+"""
+
+from datetime import datetime, timedelta
+
+# Backfill jobs tracked in backfill_state
+DAILY_LOGS_JOB = 'daily_logs'
+DAILY_DATA_JOB = 'daily_data'
+
+# Station history frames arrive every 5 minutes
+FRAME_INTERVAL = 300
+EXPECTED_FRAMES_PER_DAY = 86400 // FRAME_INTERVAL
+
+# A day with at least this share of the expected frames counts as complete
+COMPLETE_RATIO = 0.9
+
+# Incomplete or empty days are re-requested at most this many times
+MAX_ATTEMPTS = 3
+
+# Day outcomes
+COMPLETE = 'complete'
+INCOMPLETE = 'incomplete'
+FAILED = 'failed'
+
+
+def create_backfill_state_table(cursor):
+    """Create the backfill_state table if missing"""
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS backfill_state (
+        job TEXT NOT NULL,
+        station_id INTEGER NOT NULL,
+        day TEXT NOT NULL,
+        status TEXT NOT NULL,
+        frames INTEGER,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (job, station_id, day)
+    )
+    ''')
+
+
+def days_between(start_date, end_date):
+    """List of YYYY-MM-DD strings from start_date to end_date inclusive"""
+    start_dt = datetime.strptime(start_date, '%Y-%m-%d')
+    end_dt = datetime.strptime(end_date, '%Y-%m-%d')
+    return [(start_dt + timedelta(days=i)).strftime('%Y-%m-%d')
+            for i in range((end_dt - start_dt).days + 1)]
+
+
+def get_checkpoints(conn, job, station_id, start_date, end_date):
+    """{day: (status, attempts)} recorded for a station within a date range"""
+    cursor = conn.execute('''
+        SELECT day, status, attempts FROM backfill_state
+        WHERE job = ? AND station_id = ? AND day BETWEEN ? AND ?
+    ''', (job, station_id, start_date, end_date))
+    return {day: (status, attempts) for day, status, attempts in cursor.fetchall()}
+
+
+def is_settled(checkpoint):
+    """True if a checkpointed day needs no further fetching"""
+    if checkpoint is None:
+        return False
+    status, attempts = checkpoint
+    return status == COMPLETE or (status == INCOMPLETE and attempts >= MAX_ATTEMPTS)
+
+
+def plan_daily_logs_days(conn, station_id, start_date, end_date, expected_frames=EXPECTED_FRAMES_PER_DAY):
+    """Days whose daily_logs frames are missing or below the expected cadence"""
+    cursor = conn.execute('''
+        SELECT day, frame_count FROM daily_logs_daily
+        WHERE station_id = ? AND day BETWEEN ? AND ?
+    ''', (station_id, start_date, end_date))
+    frames = dict(cursor.fetchall())
+    checkpoints = get_checkpoints(conn, DAILY_LOGS_JOB, station_id, start_date, end_date)
+
+    threshold = expected_frames * COMPLETE_RATIO
+    return [day for day in days_between(start_date, end_date)
+            if frames.get(day, 0) < threshold and not is_settled(checkpoints.get(day))]
+
+
+def plan_daily_data_days(conn, station_id, start_date, end_date):
+    """Days with no daily_data row for the station"""
+    cursor = conn.execute('''
+        SELECT date FROM daily_data
+        WHERE station_id = ? AND date BETWEEN ? AND ?
+    ''', (station_id, start_date, end_date))
+    stored = {row[0] for row in cursor.fetchall()}
+    checkpoints = get_checkpoints(conn, DAILY_DATA_JOB, station_id, start_date, end_date)
+
+    return [day for day in days_between(start_date, end_date)
+            if day not in stored and not is_settled(checkpoints.get(day))]
+
+
+def pack_chunks(days, max_days, until=None):
+    """Pack sorted YYYY-MM-DD days into (start, end_exclusive, days) windows of at most max_days
+
+    Each window starts at the first day not yet covered and spans max_days (but
+    never past `until`, exclusive), so small gaps between missing days are
+    fetched in the same request.
+    """
+    chunks = []
+    for day in days:
+        if chunks and day < chunks[-1][1]:
+            chunks[-1][2].append(day)
+            continue
+        end = (datetime.strptime(day, '%Y-%m-%d') + timedelta(days=max_days)).strftime('%Y-%m-%d')
+        if until is not None:
+            end = min(end, until)
+        chunks.append((day, end, [day]))
+    return chunks
+
+
+def record_days(conn, job, station_id, outcomes):
+    """Checkpoint fetched days; outcomes is an iterable of (day, status, frames)"""
+    with conn:
+        conn.executemany('''
+            INSERT INTO backfill_state (job, station_id, day, status, frames, attempts, updated_at)
+            VALUES (?, ?, ?, ?, ?, 1, CURRENT_TIMESTAMP)
+            ON CONFLICT (job, station_id, day) DO UPDATE SET
+                status = excluded.status,
+                frames = excluded.frames,
+                attempts = backfill_state.attempts + 1,
+                updated_at = CURRENT_TIMESTAMP
+        ''', [(job, station_id, day, status, frames) for day, status, frames in outcomes])
+
+
+def frames_status(frames, expected_frames=EXPECTED_FRAMES_PER_DAY):
+    """Checkpoint status for a day that returned `frames` frames"""
+    return COMPLETE if frames >= expected_frames * COMPLETE_RATIO else INCOMPLETE
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Materialized billing periods
+billing_period holds daily_data summed per station and billing month (the
+month of `date - 25 days`), with that month's grid rates already joined.
+Only the billing months touched by new daily_data rows or rate changes are
+recomputed, so the summary reports never rescan daily_data.
+"""
+
+from datetime import datetime, timedelta
+
+# A billing month starts on this day of the following calendar month
+BILLING_OFFSET_DAYS = 25
+
+
+def create_billing_table(cursor):
+    """Create the billing_period table if missing"""
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS billing_period (
+        station_id INTEGER NOT NULL,
+        billing_month TEXT NOT NULL,
+        days INTEGER NOT NULL,
+        generation_kwh REAL,
+        grid_feedin_kwh REAL,
+        grid_purchase_kwh REAL,
+        battery_charge_kwh REAL,
+        battery_discharge_kwh REAL,
+        consumption_kwh REAL,
+        generated_kwh REAL,
+        sell_rate_kwh REAL,
+        buy_rate_kwh REAL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (station_id, billing_month)
+    )
+    ''')
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_billing_period_month ON billing_period(billing_month)
+    ''')
+
+
+def billing_month(date):
+    """Billing month (YYYY-MM) of a YYYY-MM-DD date"""
+    return (datetime.strptime(date, '%Y-%m-%d') - timedelta(days=BILLING_OFFSET_DAYS)).strftime('%Y-%m')
+
+
+def billing_month_dates(month):
+    """Half-open [first, next) range of daily_data dates that belong to a billing month"""
+    first = datetime.strptime(month + '-01', '%Y-%m-%d')
+    following = (first + timedelta(days=31)).replace(day=1)
+    offset = timedelta(days=BILLING_OFFSET_DAYS)
+    return (first + offset).strftime('%Y-%m-%d'), (following + offset).strftime('%Y-%m-%d')
+
+
+def refresh_billing_periods(conn, months=None):
+    """Recompute billing_period for the given billing months (all months when None)"""
+    cursor = conn.cursor()
+
+    # A database that has not been migrated yet gets the table built in full
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'billing_period'")
+    if cursor.fetchone() is None:
+        create_billing_table(cursor)
+        months = None
+
+    if months is None:
+        cursor.execute('DELETE FROM billing_period')
+        targets = [('', ())]
+    else:
+        targets = []
+        for month in sorted(set(months)):
+            cursor.execute('DELETE FROM billing_period WHERE billing_month = ?', (month,))
+            targets.append(('WHERE date >= ? AND date < ?', billing_month_dates(month)))
+
+    for where, params in targets:
+        # The latest rate row wins if a month was entered more than once
+        cursor.execute(f'''
+        INSERT INTO billing_period
+        (station_id, billing_month, days, generation_kwh, grid_feedin_kwh, grid_purchase_kwh,
+         battery_charge_kwh, battery_discharge_kwh, consumption_kwh, generated_kwh,
+         sell_rate_kwh, buy_rate_kwh, updated_at)
+        SELECT
+            t.station_id,
+            t.billing_month,
+            COUNT(*),
+            SUM(t.generation_kwh),
+            SUM(t.grid_feedin_kwh),
+            SUM(t.grid_purchase_kwh),
+            SUM(t.battery_charge_kwh),
+            SUM(t.battery_discharge_kwh),
+            SUM(t.consumption_kwh),
+            SUM(t.generation_kwh + t.battery_charge_kwh + t.battery_discharge_kwh),
+            (SELECT sell_rate_kwh FROM grid_rates gr
+             WHERE gr.year = CAST(substr(t.billing_month, 1, 4) AS INTEGER)
+               AND gr.month = CAST(substr(t.billing_month, 6, 2) AS INTEGER)
+             ORDER BY gr.id DESC LIMIT 1),
+            (SELECT buy_rate_kwh FROM grid_rates gr
+             WHERE gr.year = CAST(substr(t.billing_month, 1, 4) AS INTEGER)
+               AND gr.month = CAST(substr(t.billing_month, 6, 2) AS INTEGER)
+             ORDER BY gr.id DESC LIMIT 1),
+            CURRENT_TIMESTAMP
+        FROM (
+            SELECT
+                station_id,
+                strftime('%Y-%m', DATE(date, '-{BILLING_OFFSET_DAYS} days')) AS billing_month,
+                generation_kwh, grid_feedin_kwh, grid_purchase_kwh,
+                battery_charge_kwh, battery_discharge_kwh, consumption_kwh
+            FROM daily_data
+            {where}
+        ) t
+        GROUP BY t.station_id, t.billing_month
+        ''', params)
+
+
+def rate_month(year, month):
+    """Billing month (YYYY-MM) a grid_rates row applies to"""
+    return f"{int(year)}-{int(month):02d}"
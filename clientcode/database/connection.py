@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Shared SQLite connection factory for solar_data.db
+Applies a write-friendly pragma profile (WAL, synchronous=NORMAL, larger page
+cache, memory-mapped I/O, busy timeout) so cron ingest and report reads can
+run at the same time without blocking each other
+"""
+
+import os
+import sqlite3
+
+# Set DEYE_DB_PATH to point every script at another database (e.g. for load tests against the mock server)
+DB_PATH_ENV = 'DEYE_DB_PATH'
+DB_PATH = os.environ.get(DB_PATH_ENV) or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'solar_data.db')
+
+# Seconds to wait on a locked database before raising "database is locked"
+BUSY_TIMEOUT = 30
+
+PRAGMAS = (
+    ('journal_mode', 'WAL'),          # Readers don't block the writer and vice versa
+    ('synchronous', 'NORMAL'),        # Safe with WAL; fsync at checkpoints instead of every commit
+    ('cache_size', -64000),           # ~64 MB page cache (negative = KiB)
+    ('mmap_size', 268435456),         # Memory-map up to 256 MB of the database file
+    ('temp_store', 'MEMORY'),
+    ('busy_timeout', BUSY_TIMEOUT * 1000),
+)
+
+
+def get_connection(db_path=DB_PATH, row_factory=None):
+    """Open a connection to the solar database with the shared pragma profile"""
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT)
+    for name, value in PRAGMAS:
+        conn.execute(f'PRAGMA {name} = {value}')
+    if row_factory is not None:
+        conn.row_factory = row_factory
+    return conn
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Device-level measure point history
+device_history stores /device/history (granularity=1) readings narrow, one
+row per (device_sn, point_id, ts), in a WITHOUT ROWID table whose primary key
+covers per-device, per-point time range queries. Point names are interned in
+measure_points, and each device's /device/measurePoints catalog is cached in
+device_catalog so it is only re-requested after CATALOG_TTL.
+"""
+
+import json
+import time
+from datetime import datetime, timedelta
+
+# Seconds a cached /device/measurePoints catalog stays valid
+CATALOG_TTL = 7 * 86400
+
+# Epoch values above this are milliseconds
+MAX_EPOCH_SECONDS = 10 ** 11
+
+
+def create_device_history_tables(cursor):
+    """Create the measure_points, device_catalog and device_history tables if missing"""
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS measure_points (
+        point_id INTEGER PRIMARY KEY,
+        point TEXT NOT NULL UNIQUE,
+        unit TEXT
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS device_catalog (
+        device_sn TEXT PRIMARY KEY,
+        device_type TEXT,
+        points TEXT NOT NULL,
+        fetched_at INTEGER NOT NULL
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS device_history (
+        device_sn TEXT NOT NULL,
+        point_id INTEGER NOT NULL,
+        ts INTEGER NOT NULL,
+        value REAL,
+        PRIMARY KEY (device_sn, point_id, ts)
+    ) WITHOUT ROWID
+    ''')
+
+
+def load_catalog(conn, device_sn, ttl=CATALOG_TTL, now=None):
+    """Cached measure point names of a device, or None if there is no catalog younger than ttl seconds"""
+    row = conn.execute('SELECT points, fetched_at FROM device_catalog WHERE device_sn = ?', (device_sn,)).fetchone()
+    if row is None or row[1] + ttl <= (now or time.time()):
+        return None
+    return json.loads(row[0])
+
+
+def save_catalog(conn, device_sn, device_type, points):
+    """Cache the measure point names of a device"""
+    with conn:
+        conn.execute('''
+            INSERT OR REPLACE INTO device_catalog (device_sn, device_type, points, fetched_at)
+            VALUES (?, ?, ?, ?)
+        ''', (device_sn, device_type, json.dumps(list(points)), int(time.time())))
+
+
+def catalog_points(measure_points):
+    """Point names of a /device/measurePoints list (plain names or {'key': ...} items)"""
+    return [point if isinstance(point, str) else point.get('key') for point in measure_points or []
+            if isinstance(point, str) or point.get('key')]
+
+
+def get_point_ids(conn, points):
+    """{point: point_id}, interning names that are new; `points` maps each name to its unit (or None)"""
+    conn.executemany('INSERT OR IGNORE INTO measure_points (point, unit) VALUES (?, ?)', points.items())
+    conn.executemany('UPDATE measure_points SET unit = ? WHERE point = ? AND unit IS NULL',
+                     [(unit, point) for point, unit in points.items() if unit])
+    ids = {}
+    names = list(points)
+    for i in range(0, len(names), 500):
+        chunk = names[i:i + 500]
+        ids.update(conn.execute(
+            f"SELECT point, point_id FROM measure_points WHERE point IN ({', '.join('?' for _ in chunk)})", chunk
+        ).fetchall())
+    return ids
+
+
+def to_epoch(value):
+    """Epoch seconds of an API time value (seconds or milliseconds, number or string)"""
+    epoch = int(float(value))
+    return epoch // 1000 if epoch > MAX_EPOCH_SECONDS else epoch
+
+
+def parse_value(value):
+    """Reading as a float, or None when it is missing or not numeric"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def save_device_history(conn, device_sn, data_list):
+    """Upsert the dataList of one /device/history granularity=1 response in one transaction; returns the rows written"""
+    units = {}
+    readings = []
+    for frame in data_list or []:
+        try:
+            ts = to_epoch(frame['time'])
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"✗ Skipping malformed history frame: {e}")
+            continue
+        for item in frame.get('itemList') or []:
+            if not item.get('key'):
+                continue
+            units.setdefault(item['key'], item.get('unit'))
+            readings.append((item['key'], ts, parse_value(item.get('value'))))
+    if not readings:
+        return 0
+
+    with conn:
+        point_ids = get_point_ids(conn, units)
+        conn.executemany('''
+            INSERT OR REPLACE INTO device_history (device_sn, point_id, ts, value)
+            VALUES (?, ?, ?, ?)
+        ''', [(device_sn, point_ids[point], ts, value) for point, ts, value in readings])
+    return len(readings)
+
+
+def day_bounds(start_date, end_date):
+    """Half-open local-time epoch range covering start_date..end_date (YYYY-MM-DD) inclusive"""
+    start = datetime.strptime(start_date, '%Y-%m-%d')
+    end = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
+    return int(start.timestamp()), int(end.timestamp())
+
+
+def point_summary(conn, start_date, end_date, device_sn=None, points=None):
+    """(device_sn, point, unit, readings, min, avg, max, first ts, last ts) per device and point in a date range"""
+    query = '''
+        SELECT h.device_sn, p.point, p.unit, COUNT(*), MIN(h.value), ROUND(AVG(h.value), 2), MAX(h.value),
+               MIN(h.ts), MAX(h.ts)
+        FROM device_history h
+        JOIN measure_points p ON p.point_id = h.point_id
+        WHERE h.ts >= ? AND h.ts < ?
+    '''
+    params = list(day_bounds(start_date, end_date))
+    if device_sn:
+        query += ' AND h.device_sn = ?'
+        params.append(device_sn)
+    if points:
+        query += f" AND p.point IN ({', '.join('?' for _ in points)})"
+        params.extend(points)
+    query += ' GROUP BY h.device_sn, h.point_id ORDER BY h.device_sn, p.point'
+    return conn.execute(query, params).fetchall()
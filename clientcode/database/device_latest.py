@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Latest device readings
+device_latest keeps the most recent /device/latest value of every measure
+point of every device, one row per (device_sn, point), replaced on each poll.
+"""
+
+# /device/latest accepts at most this many devices per request
+MAX_DEVICES_PER_REQUEST = 10
+
+
+def create_device_latest_table(cursor):
+    """Create the device_latest table if missing"""
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS device_latest (
+        device_sn TEXT NOT NULL,
+        point TEXT NOT NULL,
+        value REAL,
+        unit TEXT,
+        device_type TEXT,
+        device_state INTEGER,
+        collection_time INTEGER,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (device_sn, point)
+    )
+    ''')
+
+
+def device_batches(device_sns, size=MAX_DEVICES_PER_REQUEST):
+    """Split device serial numbers (duplicates dropped, order kept) into /device/latest batches"""
+    device_sns = list(dict.fromkeys(device_sns))
+    return [device_sns[i:i + size] for i in range(0, len(device_sns), size)]
+
+
+def parse_value(value):
+    """Measure point value as a float, or the original text when it is not numeric"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def latest_rows(items):
+    """device_latest rows of the deviceDataList items of a /device/latest response"""
+    return [
+        (
+            item['deviceSn'],
+            point['key'],
+            parse_value(point.get('value')),
+            point.get('unit'),
+            item.get('deviceType'),
+            item.get('deviceState'),
+            item.get('collectionTime'),
+        )
+        for item in items
+        for point in item.get('dataList') or []
+    ]
+
+
+def save_device_latest(conn, items):
+    """Replace the stored readings of the devices in one response in a single transaction; returns the rows written"""
+    rows = latest_rows(items)
+    if not rows:
+        return 0
+
+    with conn:
+        conn.executemany('''
+            INSERT OR REPLACE INTO device_latest
+            (device_sn, point, value, unit, device_type, device_state, collection_time, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ''', rows)
+    return len(rows)
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Shared ingest helpers for frame-level station history
+Maps a day of /station/history (granularity=1) items into columns in one pass
+and writes them into daily_logs with one executemany per batch, refreshing the
+hourly/daily rollups for the buckets the batch touched.
+Daily totals and station info are upserted from records.DailyTotals /
+records.StationInfo.
+Uses NumPy for the W->kW scaling and timestamp formatting when it is installed.
+"""
+
+import time
+from datetime import datetime
+from itertools import repeat
+
+from clientcode.database.rollups import refresh_rollups
+from clientcode.database.billing import billing_month, refresh_billing_periods
+
+try:
+    import numpy as np
+except ImportError:  # Pure-Python fallback
+    np = None
+
+DAILY_LOGS_COLUMNS = (
+    'timestamp', 'ts', 'station_id', 'production_kw', 'consumption_kw', 'grid_kw',
+    'battery_kw', 'soc_percent', 'pv_kw', 'generator_kw', 'grid_tied_inverter_power_kw'
+)
+
+INSERT_DAILY_LOGS_SQL = f'''
+    INSERT OR IGNORE INTO daily_logs
+    ({', '.join(DAILY_LOGS_COLUMNS)})
+    VALUES ({', '.join('?' for _ in DAILY_LOGS_COLUMNS)})
+'''
+
+TS_INDEX = DAILY_LOGS_COLUMNS.index('ts')
+
+# Values in DailyTotals.as_row() order
+INSERT_DAILY_DATA_SQL = '''
+    INSERT OR REPLACE INTO daily_data
+    (date, station_id, generation_kwh, grid_feedin_kwh, grid_purchase_kwh,
+     battery_charge_kwh, battery_discharge_kwh, consumption_kwh, full_power_hours,
+     updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+'''
+
+# Values in StationInfo.as_row() order
+INSERT_STATION_INFO_SQL = '''
+    INSERT OR REPLACE INTO station_info
+    (station_id, station_name, installed_capacity, location_address,
+     grid_type, last_updated)
+    VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+'''
+
+# API power fields (watts) and the kW column they feed
+POWER_FIELDS = {
+    'generationPower': 'production_kw',
+    'consumptionPower': 'consumption_kw',
+    'gridPower': 'grid_kw',
+    'batteryPower': 'battery_kw',
+    'wirePower': 'grid_tied_inverter_power_kw',
+}
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Spacing of the UTC-offset checks used to detect DST changes inside a batch
+OFFSET_PROBE_SECONDS = 6 * 3600
+
+
+def scale_kw(values):
+    """Convert a column of watts to kilowatts, keeping missing values as None"""
+    if np is not None and values and None not in values:
+        return (np.asarray(values, dtype=np.float64) / 1000).tolist()
+    return [value / 1000 if value is not None else None for value in values]
+
+
+def format_timestamps(timestamps):
+    """Convert a column of Unix timestamps to local 'YYYY-MM-DD HH:MM:SS' strings"""
+    if not timestamps:
+        return []
+    if np is not None:
+        # Shift by a single UTC offset unless the batch crosses a DST change
+        offsets = {
+            datetime.fromtimestamp(ts).astimezone().utcoffset()
+            for ts in range(int(min(timestamps)), int(max(timestamps)) + OFFSET_PROBE_SECONDS, OFFSET_PROBE_SECONDS)
+        }
+        if len(offsets) == 1:
+            local = np.asarray(timestamps, dtype=np.int64) + int(offsets.pop().total_seconds())
+            text = np.datetime_as_string(local.astype('datetime64[s]'), unit='s')
+            return np.char.replace(text, 'T', ' ').tolist()
+    strftime = time.strftime
+    localtime = time.localtime
+    return [strftime(TIMESTAMP_FORMAT, localtime(ts)) for ts in timestamps]
+
+
+def frames_to_columns(station_data):
+    """Map API frames into daily_logs column lists in one pass, skipping frames without a timestamp"""
+    frames = [frame for frame in station_data if frame.get('timeStamp') is not None]
+
+    epochs = [int(frame['timeStamp']) for frame in frames]
+    columns = {'timestamp': format_timestamps(epochs), 'ts': epochs}
+    for field, column in POWER_FIELDS.items():
+        columns[column] = scale_kw([frame.get(field) for frame in frames])
+    columns['soc_percent'] = [frame.get('batterySOC') for frame in frames]  # SOC remains as percentage
+    columns['pv_kw'] = columns['production_kw']  # Using generationPower as PV power
+    columns['generator_kw'] = [None] * len(frames)  # Not available in API response
+    return columns
+
+
+def frames_to_rows(station_id, station_data):
+    """Map API frames to daily_logs tuples (in DAILY_LOGS_COLUMNS order)"""
+    columns = frames_to_columns(station_data)
+    columns['station_id'] = repeat(station_id)
+    return list(zip(*(columns[name] for name in DAILY_LOGS_COLUMNS)))
+
+
+def save_frames(conn, station_id, station_data):
+    """Insert a batch of API frames in one transaction; returns (inserted, ignored)"""
+    rows = frames_to_rows(station_id, station_data)
+    if not rows:
+        return 0, 0
+
+    with conn:
+        cursor = conn.executemany(INSERT_DAILY_LOGS_SQL, rows)
+        inserted = cursor.rowcount
+        if inserted:
+            epochs = [row[TS_INDEX] for row in rows]
+            refresh_rollups(conn, station_id, min(epochs), max(epochs))
+
+    return inserted, len(rows) - inserted
+
+
+def save_daily_totals(conn, totals):
+    """Upsert DailyTotals records and refresh their billing periods in one transaction; returns the dates saved"""
+    rows = [record.as_row() for record in totals]
+    if not rows:
+        return set()
+
+    with conn:
+        conn.executemany(INSERT_DAILY_DATA_SQL, rows)
+        refresh_billing_periods(conn, {billing_month(row[0]) for row in rows})
+    return {row[0] for row in rows}
+
+
+def save_station_info(conn, stations):
+    """Upsert StationInfo records in one transaction"""
+    with conn:
+        conn.executemany(INSERT_STATION_INFO_SQL, [station.as_row() for station in stations])
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Move old daily_logs frames into the cold binary archive
+Every whole month older than --months months is written to
+clientcode/database/archive/<station_id>/<YYYY-MM>.frames and deleted from
+daily_logs. The rollups stay in SQLite, and frame_summary.py reads archived
+frames back transparently.
+"""
+
+import sys
+import os
+import argparse
+from datetime import datetime, timedelta
+
+# Add project root to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../../'))
+from clientcode.database.connection import DB_PATH, get_connection
+from clientcode.database.manage.db_setup import migrate_database
+from clientcode.database.archive import ARCHIVE_DIR, archive_month, months_to_archive
+
+DEFAULT_MONTHS = 12
+
+
+def archive_cutoff(months, now=None):
+    """First day of the month `months` months before now; older months are archived"""
+    month_start = (now or datetime.now()).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    for _ in range(months):
+        month_start = (month_start - timedelta(days=1)).replace(day=1)
+    return month_start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Archive old daily_logs frames into per-station monthly binary files')
+    parser.add_argument('--months', type=int, default=DEFAULT_MONTHS,
+                        help=f'Keep this many recent months (plus the current one) in SQLite (default: {DEFAULT_MONTHS})')
+    parser.add_argument('--dry-run', action='store_true', help='Only list the months that would be archived')
+    parser.add_argument('--vacuum', action='store_true', help='VACUUM the database afterwards to give the space back')
+    args = parser.parse_args()
+
+    if not os.path.exists(DB_PATH):
+        print("Database not found. Run db_setup.py first.")
+        return 1
+
+    conn = get_connection(DB_PATH)
+    migrate_database(conn)
+
+    cutoff = archive_cutoff(args.months)
+    months = months_to_archive(conn, cutoff)
+    print(f"Archiving frames before {cutoff:%Y-%m-%d} to {ARCHIVE_DIR}")
+    if not months:
+        print("Nothing to archive.")
+        conn.close()
+        return 0
+
+    total = 0
+    for station_id, month in months:
+        if args.dry_run:
+            print(f"  [{station_id}] {month}")
+            continue
+        moved = archive_month(conn, station_id, month)
+        total += moved
+        print(f"✓ [{station_id}] {month}: {moved:,} frames archived")
+
+    if args.dry_run:
+        print(f"{len(months)} station-months would be archived")
+    else:
+        print(f"\n✓ Archived {total:,} frames from {len(months)} station-months")
+        if args.vacuum:
+            print("Vacuuming database...")
+            conn.execute('VACUUM')
+
+    conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
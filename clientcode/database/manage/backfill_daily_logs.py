@@ -4,58 +4,40 @@ Backfill script for daily_logs table using station history API
 Fetches historical data from Deye Solar API and stores in daily_logs table
 """
 
-import sqlite3
-import requests
 import json
 import sys
 import os
 from datetime import datetime, timedelta
-import time
+import asyncio
 
 # Add project root to Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../../'))
-from clientcode import variable
-
-DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'solar_data.db')
+from clientcode.client import get_client
+from clientcode.database.connection import DB_PATH, get_connection
+from clientcode.database.ingest import save_frames
+from clientcode.database.manage.db_setup import create_database, migrate_database
+from clientcode.database.backfill_state import (
+    DAILY_LOGS_JOB, FAILED, days_between, frames_status, plan_daily_logs_days, record_days
+)
+from clientcode.async_client import AsyncDeyeCloudClient, DEFAULT_CONCURRENCY
 
 def get_station_list():
-    """Get list of stations"""
-    url = variable.baseurl + '/station/list'
-    headers = variable.headers
-    data = {
-        "page": 1,
-        "size": 100
-    }
-    
+    """Get list of stations (every page)"""
     try:
-        response = requests.post(url, headers=headers, json=data)
-        response.raise_for_status()
-        result = response.json()
-        
-        if result.get('success'):
-            return result.get('stationList', [])
-        else:
-            print(f"Error getting station list: {result.get('msg')}")
-            return []
+        return list(get_client().iter_stations())
     except Exception as e:
         print(f"Exception getting station list: {e}")
         return []
 
 def get_station_history(station_id, start_time, end_time):
     """Get station history data for a specific time range"""
-    url = variable.baseurl + '/station/history'
-    headers = variable.headers
-    data = {
-        "stationId": station_id,
-        "granularity": 1,  # Frame-level data
-        "startAt": start_time.split()[0],  # Extract date part only
-        "endAt": end_time.split()[0]      # Extract date part only
-    }
-    
     try:
-        response = requests.post(url, headers=headers, json=data)
-        response.raise_for_status()
-        result = response.json()
+        result = get_client().station_history(
+            station_id,
+            1,  # Frame-level data
+            start_time.split()[0],  # Extract date part only
+            end_time.split()[0]     # Extract date part only
+        )
         
         if result.get('success'):
             return result.get('stationDataItems', [])
@@ -66,118 +48,140 @@ def get_station_history(station_id, start_time, end_time):
         print(f"Exception getting station history: {e}")
         return []
 
-def convert_timestamp(timestamp):
-    """Convert Unix timestamp to datetime string"""
-    if timestamp is None:
-        return None
-    return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
-
-def map_api_to_db(station_data):
-    """Map API response fields to database fields, converting watts to kilowatts"""
-    return {
-        'timestamp': convert_timestamp(station_data.get('timeStamp')),
-        'production_kw': (station_data.get('generationPower') or 0) / 1000 if station_data.get('generationPower') is not None else None,
-        'consumption_kw': (station_data.get('consumptionPower') or 0) / 1000 if station_data.get('consumptionPower') is not None else None,
-        'grid_kw': (station_data.get('gridPower') or 0) / 1000 if station_data.get('gridPower') is not None else None,
-        'battery_kw': (station_data.get('batteryPower') or 0) / 1000 if station_data.get('batteryPower') is not None else None,
-        'soc_percent': station_data.get('batterySOC'),  # SOC remains as percentage
-        'pv_kw': (station_data.get('generationPower') or 0) / 1000 if station_data.get('generationPower') is not None else None,  # Using generationPower as PV power
-        'generator_kw': None,  # Not available in API response
-        'grid_tied_inverter_power_kw': (station_data.get('wirePower') or 0) / 1000 if station_data.get('wirePower') is not None else None
-    }
+def plan_days(conn, station_id, start_date, end_date):
+    """Days still to fetch for a station; prints what is skipped"""
+    dates = plan_daily_logs_days(conn, station_id, start_date, end_date)
+    total_days = len(days_between(start_date, end_date))
+    print(f"Processing {len(dates)} of {total_days} days from {start_date} to {end_date}"
+          f" ({total_days - len(dates)} already complete or checkpointed)")
+    return dates
+
+def save_day(conn, station_id, date_str, station_data):
+    """Store one fetched day and checkpoint it; returns (inserted, ignored)"""
+    if station_data is None:
+        record_days(conn, DAILY_LOGS_JOB, station_id, [(date_str, FAILED, 0)])
+        return 0, 0
+    inserted, ignored = save_frames(conn, station_id, station_data) if station_data else (0, 0)
+    frames = inserted + ignored
+    record_days(conn, DAILY_LOGS_JOB, station_id, [(date_str, frames_status(frames), frames)])
+    return inserted, ignored
 
 def backfill_daily_logs(station_id, start_date, end_date):
     """Backfill daily logs for a station between two dates with individual daily API calls"""
-    start_dt = datetime.strptime(start_date, '%Y-%m-%d')
-    end_dt = datetime.strptime(end_date, '%Y-%m-%d')
-    
-    # Calculate total days
-    total_days = (end_dt - start_dt).days + 1
-    print(f"Processing {total_days} days from {start_date} to {end_date}")
     print(f"Station ID: {station_id}")
-    
-    current_date = start_dt
+
     total_records = 0
+    total_ignored = 0
     day_count = 0
     
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    conn = get_connection(DB_PATH)
+    migrate_database(conn)
+
+    dates = plan_days(conn, station_id, start_date, end_date)
+    total_days = len(dates)
 
-    while current_date <= end_dt:
+    for date_str in dates:
         day_count += 1
-        date_str = current_date.strftime('%Y-%m-%d')
         
         print(f"\nDay {day_count}/{total_days}: {date_str}")
         
         # Create datetime strings for single day API call
+        current_date = datetime.strptime(date_str, '%Y-%m-%d')
         start_str = current_date.strftime('%Y-%m-%d %H:%M:%S')
         end_str = (current_date + timedelta(days=1)).strftime('%Y-%m-%d %H:%M:%S')
         
         # Get station history for this single day
         station_data = get_station_history(station_id, start_str, end_str)
         
-        day_records = 0
-        
+        day_records, ignored = save_day(conn, station_id, date_str, station_data)
         if station_data:
-            # Map and insert data
-            for data_point in station_data:
-                mapped_data = map_api_to_db(data_point)
-                
-                if mapped_data['timestamp']:
-                    cursor.execute('''
-                        INSERT OR IGNORE INTO daily_logs 
-                        (timestamp, station_id, production_kw, consumption_kw, grid_kw, 
-                         battery_kw, soc_percent, pv_kw, generator_kw, grid_tied_inverter_power_kw)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        mapped_data['timestamp'],
-                        station_id,
-                        mapped_data['production_kw'],
-                        mapped_data['consumption_kw'],
-                        mapped_data['grid_kw'],
-                        mapped_data['battery_kw'],
-                        mapped_data['soc_percent'],
-                        mapped_data['pv_kw'],
-                        mapped_data['generator_kw'],
-                        mapped_data['grid_tied_inverter_power_kw']
-                    ))
-                    day_records += 1
-            
-            conn.commit()
-            print(f"✅ Saved {day_records} frame-level records for {date_str}")
+            total_ignored += ignored
+            print(f"✅ Saved {day_records} frame-level records for {date_str} ({ignored} already stored)")
         else:
             print(f"⚠️  No frame-level data received for {date_str}")
         
         total_records += day_records
-        current_date += timedelta(days=1)
-
-        # Small delay to avoid rate limiting
-        if current_date <= end_dt:
-            time.sleep(1)
     
     conn.close()
     
     print(f"\n{'='*60}")
-    print(f"Backfill complete: {total_records} records saved from {day_count} days")
+    print(f"Backfill complete: {total_records} records saved from {day_count} days ({total_ignored} already stored)")
     print(f"{'='*60}")
     
     return total_records
 
+async def backfill_daily_logs_async(station_id, start_date, end_date, concurrency=DEFAULT_CONCURRENCY, api=None):
+    """Backfill daily logs with concurrent per-day API calls under a rate limit
+
+    Only days that are missing or incomplete (and not already checkpointed) are
+    fetched. Returns (records saved, days whose request failed). Pass a shared
+    `api` to bound the total number of requests in flight across several stations.
+    """
+    print(f"Station ID: {station_id} (concurrency: {concurrency})")
+
+    api = api or AsyncDeyeCloudClient(concurrency=concurrency)
+    total_records = 0
+    total_ignored = 0
+    failed_days = 0
+    day_count = 0
+
+    conn = get_connection(DB_PATH)
+    migrate_database(conn)
+
+    try:
+        dates = plan_days(conn, station_id, start_date, end_date)
+        total_days = len(dates)
+
+        # Days complete out of order; each is written and checkpointed as soon as it arrives
+        async for date_str, station_data in api.iter_station_history_days(station_id, dates):
+            day_count += 1
+            day_records, ignored = save_day(conn, station_id, date_str, station_data)
+            if station_data:
+                total_records += day_records
+                total_ignored += ignored
+                print(f"[{station_id}] [{day_count}/{total_days}] ✅ Saved {day_records} frame-level records for {date_str} ({ignored} already stored)")
+            else:
+                if station_data is None:
+                    failed_days += 1
+                print(f"[{station_id}] [{day_count}/{total_days}] ⚠️  No frame-level data received for {date_str}")
+    finally:
+        conn.close()
+
+    print(f"\n{'='*60}")
+    print(f"Backfill complete for station {station_id}: {total_records} records saved from {day_count} days ({total_ignored} already stored)")
+    print(f"{'='*60}")
+
+    return total_records, failed_days
+
+async def backfill_stations_async(stations, start_date, end_date, concurrency=DEFAULT_CONCURRENCY):
+    """Backfill every station at once; `concurrency` bounds requests in flight across all of them"""
+    api = AsyncDeyeCloudClient(concurrency=concurrency)
+    results = await asyncio.gather(
+        *(backfill_daily_logs_async(station.get('id'), start_date, end_date, concurrency, api)
+          for station in stations),
+        return_exceptions=True
+    )
+    return list(zip(stations, results))
+
 def main():
     """Main function to run the backfill"""
     # Parse command line arguments
-    if len(sys.argv) == 3:
+    concurrency = DEFAULT_CONCURRENCY
+    if len(sys.argv) in (3, 4):
         start_date = sys.argv[1]
         end_date = sys.argv[2]
+        if len(sys.argv) == 4:
+            concurrency = int(sys.argv[3])
     elif len(sys.argv) == 1:
         # Default values if no arguments provided
         start_date = "2025-01-01"
         end_date = "2025-01-31"
     else:
-        print("Usage: python3 backfill_daily_logs.py [start_date end_date]")
+        print("Usage: python3 backfill_daily_logs.py [start_date end_date [concurrency]]")
         print("Example: python3 backfill_daily_logs.py 2024-01-01 2024-12-31")
+        print("Example: python3 backfill_daily_logs.py 2024-01-01 2024-12-31 8")
         print("Default: python3 backfill_daily_logs.py (uses 2025-01-01 to 2025-01-31)")
-        return
+        return 1
     
     # Validate date format
     try:
@@ -185,32 +189,52 @@ def main():
         datetime.strptime(end_date, '%Y-%m-%d')
     except ValueError:
         print("Error: Dates must be in YYYY-MM-DD format")
-        return
+        return 1
     
+    # Check if database exists
+    if not os.path.exists(DB_PATH):
+        print("Database not found. Creating database...")
+        create_database()
+
     print("Starting daily logs backfill...")
     print(f"Date range: {start_date} to {end_date}")
     
-    # Get stations and use first one
     stations = get_station_list()
     if not stations:
         print("No stations found. Please check your API credentials.")
-        return
-    
-    station_id = stations[0].get('id')
-    station_name = stations[0].get('sn', f"Station {station_id}")
+        return 1
     
     print(f"Found {len(stations)} stations")
-    print(f"Processing station: {station_name} (ID: {station_id})")
     
-    # Backfill frame-level data using chunked approach
-    total_records = backfill_daily_logs(station_id, start_date, end_date)
+    # Backfill frame-level data with concurrent per-day requests across all stations
+    results = asyncio.run(backfill_stations_async(stations, start_date, end_date, concurrency))
     
+    total_records = 0
+    failed = []
+    for station, result in results:
+        label = f"{station.get('name') or 'Station'} (ID: {station.get('id')})"
+        if isinstance(result, Exception):
+            print(f"✗ Error backfilling {label}: {result}")
+            failed.append(label)
+            continue
+        records, failed_days = result
+        total_records += records
+        if failed_days:
+            failed.append(f"{label}: {failed_days} days failed")
+
+    print(f"\n{'='*60}")
+    print(f"Stations backfilled: {len(results) - len(failed)}/{len(results)}")
+    for label in failed:
+        print(f"  ✗ {label}")
+    print(f"{'='*60}")
+
     if total_records > 0:
         print(f"\n🎉 Successfully backfilled {total_records} frame-level records!")
     else:
         print(f"\n⚠️  No frame-level data was saved. Check API availability or date range.")
     
     print("\nBackfill process completed!")
+    return 1 if failed else 0
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
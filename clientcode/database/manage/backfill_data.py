@@ -6,12 +6,9 @@ Fetches data for a date range and populates the database
 
 import sys
 import os
-sys.path.insert(0, os.path.dirname(__file__))
 
-import requests
-import sqlite3
 from datetime import datetime, timedelta
-import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Function to find the project root (where .git is located)
 def find_project_root(current_dir):
@@ -31,192 +28,295 @@ else:
     print("Error: Could not find project root ('.git' directory).")
     sys.exit(1)
 
-from clientcode import variable
+from clientcode.client import get_client
+from clientcode.database.connection import DB_PATH, get_connection
+from clientcode.database.ingest import save_daily_totals
+from clientcode.database.records import DailyTotals
+from clientcode.database.manage.db_setup import create_database, migrate_database
+from clientcode.database.backfill_state import (
+    DAILY_DATA_JOB, COMPLETE, INCOMPLETE, FAILED,
+    days_between, pack_chunks, plan_daily_data_days, record_days
+)
 
-DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'solar_data.db')
+# Chunk requests in flight at once (the shared rate limiter still applies)
+DEFAULT_WORKERS = 4
+
+# /station/history accepts at most 31 days per daily request and 12 months per
+# monthly request; endAt is exclusive
+MAX_CHUNK_DAYS = 31
+MAX_CHUNK_MONTHS = 12
+
+# Allowed difference between the API month total and the sum of its days (kWh)
+MONTH_TOLERANCE = 0.5
 
 def get_station_list():
-    """Get list of stations"""
-    url = variable.baseurl + '/station/list'
-    headers = variable.headers
-    data = {
-        "page": 1,
-        "size": 100
-    }
-    
+    """Get list of stations (every page)"""
     try:
-        response = requests.post(url, headers=headers, json=data)
-        response.raise_for_status()
-        result = response.json()
-        
-        if result.get('success'):
-            return result.get('stationList', [])
-        else:
-            print(f"Error getting station list: {result.get('msg')}")
-            return []
+        return list(get_client().iter_stations())
     except Exception as e:
         print(f"Exception getting station list: {e}")
         return []
 
 def fetch_date_range_data(start_date_str, end_date_str, station_id):
-    """Fetch data for a date range from API"""
-    url = variable.baseurl + '/station/history'
-    headers = variable.headers
-    
-    data = {
-        "stationId": station_id,
-        "granularity": 2,  # Daily granularity
-        "startAt": start_date_str,
-        "endAt": end_date_str
-    }
-
+    """Fetch data for a date range from API; None if the request failed"""
     try:
-        response = requests.post(url, headers=headers, json=data, timeout=30)
-        response.raise_for_status()
-        result = response.json()
+        result = get_client().station_history(station_id, 2, start_date_str, end_date_str)  # Daily granularity
 
-        if result.get('success') and result.get('stationDataItems'):
-            return result['stationDataItems']
+        if result.get('success'):
+            return result.get('stationDataItems') or []
         else:
             print(f"Error: {result.get('msg', 'Unknown error')}")
-            return []
+            return None
     except Exception as e:
         print(f"Error fetching data: {e}")
-        return []
-
-def save_batch_to_database(data_items, station_id):
-    """Save multiple days of data to database"""
-    if not data_items:
-        return 0
-
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-
-    saved_count = 0
+        return None
 
+def items_to_totals(data_items, station_id):
+    """DailyTotals records for the day items of a /station/history response"""
+    totals = []
     for item in data_items:
         try:
-            # Construct date from year, month, day fields
-            date_str = f"{item['year']}-{item['month']:02d}-{item['day']:02d}"
-
-            cursor.execute('''
-            INSERT OR REPLACE INTO daily_data
-            (date, station_id, generation_kwh, grid_feedin_kwh, grid_purchase_kwh,
-             battery_charge_kwh, battery_discharge_kwh, consumption_kwh, full_power_hours,
-             updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-            ''', (
-                date_str,
-                station_id,
-                item.get('generationValue'),
-                item.get('gridValue'),
-                item.get('purchaseValue'),
-                item.get('chargeValue'),
-                item.get('dischargeValue'),
-                item.get('consumptionValue'),
-                item.get('fullPowerHours')
-            ))
-
-            saved_count += 1
-            print(f"✓ {date_str}: Gen={item.get('generationValue'):.1f} kWh, Consumption={item.get('consumptionValue'):.1f} kWh")
-
+            totals.append(DailyTotals.from_api(item, station_id))
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"✗ Skipping malformed day item: {e}")
+    return totals
+
+def save_chunk(conn, station_id, data_items):
+    """Upsert one chunk of days in a single transaction; returns the dates saved"""
+    return save_daily_totals(conn, items_to_totals(data_items or [], station_id))
+
+def run_chunks(conn, jobs, workers):
+    """Fetch (station_id, start, end, days) chunks concurrently and write each as it arrives
+
+    Returns {station_id: [days saved, failed chunks]}.
+    """
+    results = {station_id: [0, 0] for station_id, _, _, _ in jobs}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(fetch_date_range_data, start, end, station_id): (station_id, start, end, days)
+            for station_id, start, end, days in jobs
+        }
+        for count, future in enumerate(as_completed(futures), 1):
+            station_id, start, end, days = futures[future]
+            try:
+                data = future.result()
+            except Exception as e:
+                print(f"✗ Error fetching {start} to {end}: {e}")
+                data = None
+
+            saved_dates = save_chunk(conn, station_id, data)
+            results[station_id][0] += len(saved_dates)
+            if data is None:
+                results[station_id][1] += 1
+                print(f"[{count}/{len(jobs)}] [Station {station_id}] ✗ Request failed for {start} to {end}")
+            elif saved_dates:
+                print(f"[{count}/{len(jobs)}] [Station {station_id}] ✅ Saved {len(saved_dates)} days from {start} to {end}")
+            else:
+                print(f"[{count}/{len(jobs)}] [Station {station_id}] ⚠️  No data received for {start} to {end}")
+
+            # Checkpoint every requested day so a rerun skips what is settled
+            failed_status = FAILED if data is None else INCOMPLETE
+            record_days(conn, DAILY_DATA_JOB, station_id, [
+                (day, COMPLETE if day in saved_dates else failed_status, None)
+                for day in days
+            ])
+    return results
+
+def day_after(date_str):
+    """The YYYY-MM-DD day following date_str (exclusive endAt of a range)"""
+    return (datetime.strptime(date_str, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+
+def plan_station_chunks(conn, station_id, start_date_str, end_date_str):
+    """31-day chunks covering the days of a range missing from daily_data"""
+    missing = plan_daily_data_days(conn, station_id, start_date_str, end_date_str)
+    chunks = pack_chunks(missing, MAX_CHUNK_DAYS, day_after(end_date_str))
+
+    total_days = len(days_between(start_date_str, end_date_str))
+    print(f"[Station {station_id}] {len(missing)} of {total_days} days to fetch in {len(chunks)} chunks"
+          f" ({total_days - len(missing)} already stored or checkpointed)")
+    return [(station_id, start, end, days) for start, end, days in chunks]
+
+def month_starts(start_date_str, end_date_str):
+    """First day (datetime) of every month overlapping a date range"""
+    current = datetime.strptime(start_date_str[:7] + '-01', '%Y-%m-%d')
+    last = datetime.strptime(end_date_str, '%Y-%m-%d')
+    months = []
+    while current <= last:
+        months.append(current)
+        current = (current + timedelta(days=31)).replace(day=1)
+    return months
+
+def full_months(start_date_str, end_date_str):
+    """First day (datetime) of every month lying entirely inside a date range"""
+    start = datetime.strptime(start_date_str, '%Y-%m-%d')
+    last = datetime.strptime(end_date_str, '%Y-%m-%d')
+    return [month for month in month_starts(start_date_str, end_date_str)
+            if month >= start and (month + timedelta(days=31)).replace(day=1) - timedelta(days=1) <= last]
+
+def find_month_mismatches(conn, station_id, start_date_str, end_date_str):
+    """Months whose granularity=3 generation total differs from the sum of their daily_data rows
+
+    Only months lying entirely inside the range are compared, since the API
+    total always covers the whole month.
+    """
+    months = full_months(start_date_str, end_date_str)
+    if not months:
+        print(f"[Station {station_id}] No whole month in range, skipping month total check")
+        return []
+    api_totals = {}
+    for i in range(0, len(months), MAX_CHUNK_MONTHS):
+        window = months[i:i + MAX_CHUNK_MONTHS]
+        end = (window[-1] + timedelta(days=31)).replace(day=1)
+        try:
+            result = get_client().station_history(station_id, 3, window[0].strftime('%Y-%m'), end.strftime('%Y-%m'))
         except Exception as e:
-            print(f"✗ Error saving {date_str}: {e}")
-
-    conn.commit()
-    conn.close()
-
-    return saved_count
-
-def backfill_date_range(start_date_str, end_date_str, station_id):
-    """Backfill data for a date range, splitting into 30-day chunks"""
-    start_date = datetime.strptime(start_date_str, '%Y-%m-%d')
-    end_date = datetime.strptime(end_date_str, '%Y-%m-%d')
-    
-    # Calculate total days and number of chunks
-    total_days = (end_date - start_date).days + 1
-    print(f"Processing {total_days} days from {start_date_str} to {end_date_str}")
-    print(f"Station ID: {station_id}")
-    
-    current_start = start_date
-    total_saved = 0
-    chunk_count = 0
-
-    while current_start <= end_date:
-        # Process in 30-day chunks (API limit is 31 days)
-        current_end = min(current_start + timedelta(days=29), end_date)  # 30 days inclusive
-        chunk_count += 1
-
-        print(f"\nChunk {chunk_count}: {current_start.strftime('%Y-%m-%d')} to {current_end.strftime('%Y-%m-%d')}")
-
-        data = fetch_date_range_data(
-            current_start.strftime('%Y-%m-%d'),
-            current_end.strftime('%Y-%m-%d'),
-            station_id
-        )
-
-        if data:
-            saved = save_batch_to_database(data, station_id)
-            total_saved += saved
-            print(f"✅ Saved {saved} days of data")
+            print(f"[Station {station_id}] ⚠️  Could not fetch month totals: {e}")
+            continue
+        if not result.get('success'):
+            print(f"[Station {station_id}] ⚠️  Could not fetch month totals: {result.get('msg')}")
+            continue
+        for item in result.get('stationDataItems') or []:
+            try:
+                month = f"{int(item['year'])}-{int(item['month']):02d}"
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"[Station {station_id}] ⚠️  Skipping malformed month total {item!r}: {e}")
+                continue
+            api_totals[month] = item.get('generationValue')
+
+    wanted = {month.strftime('%Y-%m') for month in months}
+    api_totals = {month: total for month, total in api_totals.items() if month in wanted}
+
+    last_day = (months[-1] + timedelta(days=31)).replace(day=1) - timedelta(days=1)
+    cursor = conn.execute('''
+        SELECT substr(date, 1, 7), SUM(generation_kwh) FROM daily_data
+        WHERE station_id = ? AND date BETWEEN ? AND ?
+        GROUP BY substr(date, 1, 7)
+    ''', (station_id, months[0].strftime('%Y-%m-%d'), last_day.strftime('%Y-%m-%d')))
+    stored = dict(cursor.fetchall())
+
+    mismatches = []
+    for month, total in sorted(api_totals.items()):
+        if total is None:
+            continue
+        try:
+            total = float(total)
+        except (TypeError, ValueError):
+            continue
+        if abs((stored.get(month) or 0) - total) > MONTH_TOLERANCE:
+            print(f"[Station {station_id}] ⚠️  {month}: API total {total:.1f} kWh, stored {stored.get(month) or 0:.1f} kWh")
+            mismatches.append(month)
+    return mismatches
+
+def refetch_months(station_id, months, start_date_str, end_date_str):
+    """Chunks re-requesting every day (within the range) of the given YYYY-MM months"""
+    days = [day for day in days_between(start_date_str, end_date_str) if day[:7] in set(months)]
+    chunks = pack_chunks(days, MAX_CHUNK_DAYS, day_after(end_date_str))
+    return [(station_id, start, end, chunk_days) for start, end, chunk_days in chunks]
+
+def backfill_date_range(conn, station_ids, start_date_str, end_date_str, workers=DEFAULT_WORKERS, verify_months=False):
+    """Backfill the missing days of a range for several stations, 31-day chunks fetched concurrently
+
+    With verify_months, month totals from the granularity=3 endpoint are compared
+    with the stored days and mismatching months are fetched again. Returns
+    {station_id: [days saved, failed chunks]}.
+    """
+    jobs = []
+    for station_id in station_ids:
+        jobs.extend(plan_station_chunks(conn, station_id, start_date_str, end_date_str))
+
+    print(f"\nFetching {len(jobs)} chunks ({workers} workers)")
+    results = run_chunks(conn, jobs, workers)
+    for station_id in station_ids:
+        results.setdefault(station_id, [0, 0])
+
+    if verify_months:
+        print(f"\nChecking month totals...")
+        jobs = []
+        for station_id in station_ids:
+            mismatches = find_month_mismatches(conn, station_id, start_date_str, end_date_str)
+            jobs.extend(refetch_months(station_id, mismatches, start_date_str, end_date_str))
+        if jobs:
+            print(f"\nRe-fetching {len(jobs)} chunks for mismatched months")
+            for station_id, (saved, failed) in run_chunks(conn, jobs, workers).items():
+                results[station_id][0] += saved
+                results[station_id][1] += failed
         else:
-            print("⚠️  No data received for this chunk")
-
-        current_start = current_end + timedelta(days=1)
-
-        # Small delay to avoid rate limiting
-        if current_start <= end_date:
-            time.sleep(1)
+            print("✓ Month totals match")
 
-    print(f"\n{'='*60}")
-    print(f"Backfill complete: {total_saved} days saved from {chunk_count} chunks")
-    print(f"{'='*60}")
-    
-    return total_saved
+    return results
 
 def main():
     """Main execution"""
     # Check if database exists
     if not os.path.exists(DB_PATH):
         print("Database not found. Creating database...")
-        from db_setup import create_database
         create_database()
 
+    # Optional month total check against the granularity=3 endpoint
+    args = [arg for arg in sys.argv[1:] if arg != '--verify-months']
+    verify_months = len(args) != len(sys.argv) - 1
+
     # Parse command line arguments
-    if len(sys.argv) == 3:
-        start_date = sys.argv[1]
-        end_date = sys.argv[2]
-    elif len(sys.argv) == 2 and sys.argv[1] in ['last7', 'last30']:
-        if sys.argv[1] == 'last7':
+    workers = DEFAULT_WORKERS
+    if len(args) in (2, 3) and args[0] not in ['last7', 'last30']:
+        start_date = args[0]
+        end_date = args[1]
+        if len(args) == 3:
+            workers = int(args[2])
+    elif len(args) in (1, 2) and args[0] in ['last7', 'last30']:
+        if args[0] == 'last7':
             end_date = datetime.now().strftime('%Y-%m-%d')
             start_date = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
         else:  # last30
             end_date = datetime.now().strftime('%Y-%m-%d')
             start_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+        if len(args) == 2:
+            workers = int(args[1])
     else:
-        print("Invalid arguments. Use the format above.")
-        return
+        print("Usage: python3 backfill_data.py <start_date> <end_date> [workers] [--verify-months]")
+        print("       python3 backfill_data.py last7|last30 [workers] [--verify-months]")
+        return 1
 
     print(f"Fetching data from {start_date} to {end_date}")
     
-    # Get stations and use first one
     stations = get_station_list()
     if not stations:
         print("No stations found. Please check your API credentials.")
-        return
-    
-    station_id = stations[0].get('id')
-    station_name = stations[0].get('sn', f"Station {station_id}")
-    
-    print(f"Using station: {station_name} (ID: {station_id})")
-    
-    # Backfill data using chunked approach
-    total_saved = backfill_date_range(start_date, end_date, station_id)
+        return 1
     
+    print(f"Backfilling {len(stations)} stations")
+
+    # All writes (one bulk upsert per chunk) go through this connection;
+    # daily_data must be keyed by (date, station_id) before several stations write to it
+    conn = get_connection(DB_PATH)
+    try:
+        migrate_database(conn)
+        results = backfill_date_range(
+            conn, [station.get('id') for station in stations], start_date, end_date, workers, verify_months
+        )
+    finally:
+        conn.close()
+
+    failed = []
+    total_saved = 0
+    for station in stations:
+        saved, failed_chunks = results[station.get('id')]
+        total_saved += saved
+        if failed_chunks:
+            failed.append(f"{station.get('name') or 'Station'} (ID: {station.get('id')}): {failed_chunks} chunks failed")
+
+    print(f"\n{'='*60}")
+    print(f"Stations backfilled: {len(stations) - len(failed)}/{len(stations)}")
+    for label in failed:
+        print(f"  ✗ {label}")
+    print(f"{'='*60}")
+
     if total_saved > 0:
         print(f"\n🎉 Successfully backfilled {total_saved} days of data!")
     else:
         print(f"\n⚠️  No data was saved. Check API availability or date range.")
 
+    return 1 if failed else 0
+
 if __name__ == '__main__':
     sys.exit(main())
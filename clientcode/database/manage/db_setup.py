@@ -2,23 +2,33 @@
 """
 Database setup script for solar system daily data
 Creates SQLite database with tables for storing historical solar data
+Run with `migrate` to upgrade an existing database without touching grid_rates
 """
 
-import sqlite3
+import sys
 import os
 
-DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'solar_data.db')
-
-def create_database():
-    """Create database and tables"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-
-    # Create daily_data table
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS daily_data (
+# Add project root to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../../'))
+from clientcode.database.connection import DB_PATH, get_connection
+from clientcode.database.rollups import create_rollup_tables, rebuild_rollups
+from clientcode.database.billing import create_billing_table, refresh_billing_periods
+from clientcode.database.backfill_state import create_backfill_state_table
+from clientcode.database.device_latest import create_device_latest_table
+from clientcode.database.device_history import create_device_history_tables
+
+DAILY_DATA_COLUMNS = (
+    'id', 'date', 'station_id', 'generation_kwh', 'grid_feedin_kwh', 'grid_purchase_kwh',
+    'battery_charge_kwh', 'battery_discharge_kwh', 'consumption_kwh', 'full_power_hours',
+    'created_at', 'updated_at'
+)
+
+def create_daily_data_table(cursor, table='daily_data'):
+    """Create the daily_data table (one row per date and station)"""
+    cursor.execute(f'''
+    CREATE TABLE IF NOT EXISTS {table} (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
-        date TEXT NOT NULL UNIQUE,
+        date TEXT NOT NULL,
         station_id INTEGER NOT NULL,
         generation_kwh REAL,
         grid_feedin_kwh REAL,
@@ -28,10 +38,19 @@ def create_database():
         consumption_kwh REAL,
         full_power_hours REAL,
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(date, station_id)
     )
     ''')
 
+def create_database(db_path=DB_PATH):
+    """Create database and tables"""
+    conn = get_connection(db_path)
+    cursor = conn.cursor()
+
+    # Create daily_data table
+    create_daily_data_table(cursor)
+
     # Create index on date for faster queries
     cursor.execute('''
     CREATE INDEX IF NOT EXISTS idx_date ON daily_data(date)
@@ -54,6 +73,7 @@ def create_database():
     CREATE TABLE IF NOT EXISTS daily_logs (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         timestamp TIMESTAMP NOT NULL,
+        ts INTEGER,
         station_id INTEGER NOT NULL,
         production_kw REAL,
         consumption_kw REAL,
@@ -69,21 +89,6 @@ def create_database():
     )
     ''')
 
-    # Create index on timestamp for faster queries
-    cursor.execute('''
-    CREATE INDEX IF NOT EXISTS idx_daily_logs_timestamp ON daily_logs(timestamp)
-    ''')
-
-    # Create index on station_id for faster queries
-    cursor.execute('''
-    CREATE INDEX IF NOT EXISTS idx_daily_logs_station_id ON daily_logs(station_id)
-    ''')
-
-    # Create unique index for preventing duplicates
-    cursor.execute('''
-    CREATE UNIQUE INDEX IF NOT EXISTS idx_daily_logs_unique ON daily_logs(timestamp, station_id)
-    ''')
-
 
     # Create index on date for faster queries
     cursor.execute('''
@@ -135,10 +140,103 @@ def create_database():
 
 
 
+    conn.commit()
+
+    # Bring the new tables up to the current schema (indexes etc.)
+    migrate_database(conn)
+
+    # grid_rates was just reloaded, so every billing month's rate may have changed
+    refresh_billing_periods(conn)
     conn.commit()
     conn.close()
 
-    print(f"Database created successfully at: {DB_PATH}")
+    print(f"Database created successfully at: {db_path}")
+
+def get_columns(cursor, table):
+    """Column names of a table"""
+    cursor.execute(f'PRAGMA table_info({table})')
+    return [row[1] for row in cursor.fetchall()]
+
+def get_unique_keys(cursor, table):
+    """Column lists of every UNIQUE index on a table"""
+    cursor.execute(f'PRAGMA index_list({table})')
+    indexes = [row[1] for row in cursor.fetchall() if row[2]]
+    keys = []
+    for index in indexes:
+        cursor.execute(f'PRAGMA index_info({index})')
+        keys.append([row[2] for row in cursor.fetchall()])
+    return keys
+
+def migrate_database(conn):
+    """Upgrade an existing database in place; safe to run repeatedly"""
+    cursor = conn.cursor()
+
+    # daily_data: UNIQUE(date) only allowed one station per day; SQLite cannot
+    # drop a column constraint, so the table is rebuilt with UNIQUE(date, station_id)
+    if ['date'] in get_unique_keys(cursor, 'daily_data'):
+        print("Migrating daily_data: one row per date and station...")
+        columns = ', '.join(DAILY_DATA_COLUMNS)
+        cursor.execute('DROP TABLE IF EXISTS daily_data_new')
+        create_daily_data_table(cursor, 'daily_data_new')
+        cursor.execute(f'INSERT INTO daily_data_new ({columns}) SELECT {columns} FROM daily_data')
+        cursor.execute('DROP TABLE daily_data')
+        cursor.execute('ALTER TABLE daily_data_new RENAME TO daily_data')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_date ON daily_data(date)')
+
+    # daily_logs: epoch seconds as INTEGER next to the TEXT timestamp, so
+    # range queries can use an index instead of DATE(timestamp) scans
+    if 'ts' not in get_columns(cursor, 'daily_logs'):
+        print("Migrating daily_logs: adding integer ts column...")
+        cursor.execute('ALTER TABLE daily_logs ADD COLUMN ts INTEGER')
+    cursor.execute('''
+    UPDATE daily_logs
+    SET ts = CAST(strftime('%s', timestamp, 'utc') AS INTEGER)
+    WHERE ts IS NULL
+    ''')
+
+    # Composite (station_id, ts) index replaces the single-column indexes
+    cursor.execute('''
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_daily_logs_station_ts ON daily_logs(station_id, ts)
+    ''')
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_daily_logs_ts ON daily_logs(ts)
+    ''')
+    cursor.execute('DROP INDEX IF EXISTS idx_daily_logs_timestamp')
+    cursor.execute('DROP INDEX IF EXISTS idx_daily_logs_station_id')
+    cursor.execute('DROP INDEX IF EXISTS idx_daily_logs_unique')  # Duplicate of the UNIQUE constraint
+
+    # Hourly/daily rollups of daily_logs, kept up to date by the ingest path
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'daily_logs_daily'")
+    rollups_exist = cursor.fetchone() is not None
+    create_rollup_tables(cursor)
+    if not rollups_exist:
+        print("Migrating daily_logs: building hourly/daily rollups...")
+        rebuild_rollups(conn)
+
+    # Per station, per billing month totals of daily_data with the grid rate joined
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'billing_period'")
+    billing_exists = cursor.fetchone() is not None
+    create_billing_table(cursor)
+    if not billing_exists:
+        print("Migrating daily_data: building billing_period...")
+        refresh_billing_periods(conn)
+
+    # Checkpoints of resumable backfills
+    create_backfill_state_table(cursor)
+
+    # Most recent reading of every device measure point
+    create_device_latest_table(cursor)
+
+    # Frame-level device measure point history and cached measure point catalogs
+    create_device_history_tables(cursor)
+
+    conn.commit()
 
 if __name__ == '__main__':
-    create_database()
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] == 'migrate':
+        conn = get_connection(DB_PATH)
+        migrate_database(conn)
+        conn.close()
+        print(f"Database migrated successfully at: {DB_PATH}")
+    else:
+        create_database()
\ No newline at end of file
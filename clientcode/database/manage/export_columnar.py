@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Columnar export of daily_logs and daily_data
+Writes each table as Parquet (or Arrow IPC) files partitioned by station and
+month, Hive-style: <output>/<table>/station_id=<id>/month=<YYYY-MM>/part-0.parquet
+Exports are incremental: a fingerprint of every partition (row count plus
+column sums from the rollups for daily_logs, a hash of every row for
+daily_data) is kept in the output directory and only partitions whose
+fingerprint changed are rewritten.
+Requires pyarrow (pip install pyarrow).
+"""
+
+import sys
+import os
+import argparse
+import hashlib
+import json
+import shutil
+
+# Add project root to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../../'))
+from clientcode.database.connection import DB_PATH, get_connection
+from clientcode.database.manage.db_setup import migrate_database
+from clientcode.database.rollups import ROLLUP_METRICS
+from clientcode.database.archive import read_month
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # Export is unavailable without pyarrow
+    pa = None
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(DB_PATH)), 'export')
+
+# Fingerprints of the exported partitions, kept next to the files
+STATE_FILE = '_export_state.json'
+
+FORMATS = {'parquet': '.parquet', 'ipc': '.arrow'}
+
+DEFAULT_COMPRESSION = 'zstd'
+
+# Exported columns and their Arrow types; station_id and month are in the partition path
+EXPORT_COLUMNS = {
+    'daily_logs': (
+        ('timestamp', 'string'), ('ts', 'int64'), ('production_kw', 'float64'),
+        ('consumption_kw', 'float64'), ('grid_kw', 'float64'), ('battery_kw', 'float64'),
+        ('soc_percent', 'float64'), ('pv_kw', 'float64'), ('generator_kw', 'float64'),
+        ('grid_tied_inverter_power_kw', 'float64'),
+    ),
+    'daily_data': (
+        ('date', 'string'), ('generation_kwh', 'float64'), ('grid_feedin_kwh', 'float64'),
+        ('grid_purchase_kwh', 'float64'), ('battery_charge_kwh', 'float64'),
+        ('battery_discharge_kwh', 'float64'), ('consumption_kwh', 'float64'),
+        ('full_power_hours', 'float64'),
+    ),
+}
+
+# Per (station_id, month) fingerprint queries; daily_logs is answered from its daily rollups
+FINGERPRINT_SQL = {
+    'daily_logs': f'''
+        SELECT station_id, substr(day, 1, 7) AS month, SUM(frame_count),
+               {', '.join(f'ROUND(SUM({metric}_sum), 6)' for metric in ROLLUP_METRICS)}
+        FROM daily_logs_daily
+        GROUP BY station_id, month
+    ''',
+}
+
+# daily_data is small enough to fingerprint by hashing every exported row, so edits that
+# keep the row count and column sums (e.g. values swapped between days) are still detected
+ROW_HASH_SQL = {
+    'daily_data': f'''
+        SELECT station_id, substr(date, 1, 7) AS month,
+               {', '.join(name for name, _ in EXPORT_COLUMNS['daily_data'])}
+        FROM daily_data
+        ORDER BY station_id, date
+    ''',
+}
+
+# Rows of one partition, in export column order
+PARTITION_SQL = {
+    'daily_logs': f'''
+        SELECT {', '.join(name for name, _ in EXPORT_COLUMNS['daily_logs'])}
+        FROM daily_logs
+        WHERE station_id = ? AND ts >= CAST(strftime('%s', ? || '-01', 'utc') AS INTEGER)
+          AND ts < CAST(strftime('%s', ? || '-01', '+1 month', 'utc') AS INTEGER)
+        ORDER BY ts
+    ''',
+    'daily_data': f'''
+        SELECT {', '.join(name for name, _ in EXPORT_COLUMNS['daily_data'])}
+        FROM daily_data
+        WHERE station_id = ? AND date >= ? || '-01' AND date < DATE(? || '-01', '+1 month')
+        ORDER BY date
+    ''',
+}
+
+
+def partition_dir(output, table, station_id, month):
+    """Hive-style directory of one partition"""
+    return os.path.join(output, table, f"station_id={station_id}", f"month={month}")
+
+
+def load_state(output):
+    """Fingerprints of the last export ({} if there was none)"""
+    try:
+        with open(os.path.join(output, STATE_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(output, state):
+    """Write the fingerprints atomically"""
+    path = os.path.join(output, STATE_FILE)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def get_fingerprints(conn, table):
+    """{'station_id/month': fingerprint list} of every partition currently in the table"""
+    if table in ROW_HASH_SQL:
+        return get_row_hashes(conn, table)
+    return {
+        f"{row[0]}/{row[1]}": list(row[2:])
+        for row in conn.execute(FINGERPRINT_SQL[table])
+        if row[1]
+    }
+
+
+def get_row_hashes(conn, table):
+    """{'station_id/month': [row count, sha256 of the rows]} of every partition currently in the table"""
+    hashes = {}
+    counts = {}
+    for row in conn.execute(ROW_HASH_SQL[table]):
+        if not row[1]:
+            continue
+        key = f"{row[0]}/{row[1]}"
+        if key not in hashes:
+            hashes[key] = hashlib.sha256()
+            counts[key] = 0
+        hashes[key].update(repr(row[2:]).encode())
+        counts[key] += 1
+    return {key: [counts[key], digest.hexdigest()] for key, digest in hashes.items()}
+
+
+def partition_rows(conn, table, station_id, month):
+    """Rows of one partition in export column order, including frames moved to the cold archive"""
+    rows = conn.execute(PARTITION_SQL[table], (station_id, month, month)).fetchall()
+    if table != 'daily_logs':
+        return rows
+
+    archived = read_month(station_id, month)
+    if not archived or not archived['ts']:
+        return rows
+    names = [name for name, _ in EXPORT_COLUMNS[table]]
+    merged = {ts: tuple(archived[name][i] for name in names) for i, ts in enumerate(archived['ts'])}
+    merged.update((row[1], row) for row in rows)
+    return [merged[ts] for ts in sorted(merged)]
+
+
+def write_partition(conn, table, station_id, month, directory, file_format, compression):
+    """Write one partition to a temporary file and move it into place; returns the row count"""
+    columns = EXPORT_COLUMNS[table]
+    rows = partition_rows(conn, table, station_id, month)
+    schema = pa.schema([(name, getattr(pa, type_name)()) for name, type_name in columns])
+    data = pa.Table.from_arrays(
+        [pa.array([row[i] for row in rows], type=field.type) for i, field in enumerate(schema)],
+        schema=schema
+    )
+
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, 'part-0' + FORMATS[file_format])
+    tmp_path = path + '.tmp'
+    if file_format == 'parquet':
+        pa.parquet.write_table(data, tmp_path, compression=compression)
+    else:
+        options = pa.ipc.IpcWriteOptions(compression=None if compression == 'none' else compression)
+        with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, schema, options=options) as writer:
+            writer.write_table(data)
+    os.replace(tmp_path, path)
+    return len(rows)
+
+
+def export_table(conn, table, output, state, file_format, compression, full=False):
+    """Rewrite the changed partitions of one table and drop the ones that no longer exist
+
+    Returns (partitions written, rows written, partitions removed, partitions unchanged).
+    """
+    previous = state.get(table, {})
+    current = get_fingerprints(conn, table)
+    written = rows = 0
+
+    for key, fingerprint in sorted(current.items()):
+        if not full and previous.get(key) == fingerprint:
+            continue
+        station_id, month = key.split('/')
+        rows += write_partition(conn, table, station_id, month,
+                                partition_dir(output, table, station_id, month), file_format, compression)
+        written += 1
+        previous[key] = fingerprint
+        # Checkpoint after every partition so an interrupted export resumes where it stopped
+        state[table] = previous
+        save_state(output, state)
+
+    removed = [key for key in previous if key not in current]
+    for key in removed:
+        station_id, month = key.split('/')
+        shutil.rmtree(partition_dir(output, table, station_id, month), ignore_errors=True)
+        del previous[key]
+    state[table] = previous
+    save_state(output, state)
+
+    return written, rows, len(removed), len(current) - written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export daily_logs and daily_data to partitioned Parquet / Arrow IPC')
+    parser.add_argument('--output', '-o', default=DEFAULT_OUTPUT, help=f'Output directory (default: {DEFAULT_OUTPUT})')
+    parser.add_argument('--format', choices=sorted(FORMATS), default='parquet', help='File format (default: parquet)')
+    parser.add_argument('--compression', default=DEFAULT_COMPRESSION,
+                        help=f'Codec: zstd, snappy, gzip, lz4 or none (default: {DEFAULT_COMPRESSION})')
+    parser.add_argument('--tables', nargs='+', choices=sorted(EXPORT_COLUMNS), default=sorted(EXPORT_COLUMNS),
+                        help='Tables to export (default: both)')
+    parser.add_argument('--full', action='store_true', help='Rewrite every partition')
+    args = parser.parse_args()
+
+    if pa is None:
+        print("Error: pyarrow is required for the columnar export (pip install pyarrow)")
+        return 1
+
+    if not os.path.exists(DB_PATH):
+        print("Database not found. Run db_setup.py first.")
+        return 1
+
+    os.makedirs(args.output, exist_ok=True)
+    state = load_state(args.output)
+
+    # Settings are kept per table: partitions written in another format or codec are not
+    # reusable, and a table left out of this run keeps the settings its files were written with
+    settings = {'format': args.format, 'compression': args.compression}
+    table_settings = state.setdefault('settings', {})
+
+    conn = get_connection(DB_PATH)
+    migrate_database(conn)
+
+    print(f"Exporting to {args.output} ({args.format}, {args.compression})")
+    for table in args.tables:
+        full = args.full or table_settings.get(table) != settings
+        if table_settings.get(table) != settings and table in state:
+            print(f"{table}: export settings changed ({table_settings.get(table)} -> {settings}); "
+                  f"rewriting every partition")
+            shutil.rmtree(os.path.join(args.output, table), ignore_errors=True)
+            state.pop(table)
+        table_settings[table] = settings
+        written, rows, removed, unchanged = export_table(
+            conn, table, args.output, state, args.format, args.compression, full)
+        print(f"✓ {table}: {written} partitions written ({rows:,} rows), "
+              f"{unchanged} unchanged, {removed} removed")
+
+    conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,16 +4,24 @@ Script to manage grid_rates in the solar_data.db database
 """
 
 import sqlite3
+import sys
 import os
 import argparse
 
-DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'solar_data.db')
+# Add project root to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../../'))
+from clientcode.database.connection import DB_PATH, get_connection
+from clientcode.database.billing import rate_month, refresh_billing_periods
 
 def get_db_connection():
     """Get a database connection"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    return get_connection(DB_PATH, row_factory=sqlite3.Row)
+
+def get_rate_month(cursor, rate_id):
+    """Billing month of an existing rate, or None if the ID is unknown"""
+    cursor.execute("SELECT year, month FROM grid_rates WHERE id = ?", (rate_id,))
+    row = cursor.fetchone()
+    return rate_month(row['year'], row['month']) if row else None
 
 def add_rate(year, month, sell_rate, buy_rate):
     """Add a new grid rate"""
@@ -27,6 +35,7 @@ def add_rate(year, month, sell_rate, buy_rate):
             """,
             (year, month, sell_rate, buy_rate)
         )
+        refresh_billing_periods(conn, [rate_month(year, month)])
         conn.commit()
         print(f"Successfully added rate for {year}-{month:02d}")
     except sqlite3.IntegrityError:
@@ -42,6 +51,7 @@ def update_rate(rate_id, year, month, sell_rate, buy_rate):
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
+        old_month = get_rate_month(cursor, rate_id)
         cursor.execute(
             """
             UPDATE grid_rates
@@ -50,8 +60,11 @@ def update_rate(rate_id, year, month, sell_rate, buy_rate):
             """,
             (year, month, sell_rate, buy_rate, rate_id)
         )
+        updated = cursor.rowcount
+        if updated > 0:
+            refresh_billing_periods(conn, [old_month, rate_month(year, month)])
         conn.commit()
-        if cursor.rowcount > 0:
+        if updated > 0:
             print(f"Successfully updated rate with ID {rate_id}")
         else:
             print(f"Error: Rate with ID {rate_id} not found.")
@@ -66,9 +79,13 @@ def delete_rate(rate_id):
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
+        old_month = get_rate_month(cursor, rate_id)
         cursor.execute("DELETE FROM grid_rates WHERE id = ?", (rate_id,))
+        deleted = cursor.rowcount
+        if deleted > 0:
+            refresh_billing_periods(conn, [old_month])
         conn.commit()
-        if cursor.rowcount > 0:
+        if deleted > 0:
             print(f"Successfully deleted rate with ID {rate_id}")
         else:
             print(f"Error: Rate with ID {rate_id} not found.")
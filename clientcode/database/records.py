@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Typed record classes for the rows that flow between the API, the database and the reports
+Every class is a dataclass with __slots__: no per-instance __dict__, so a
+record costs about as much memory as the equivalent tuple (a fraction of a
+per-frame dict) while fields are read by name instead of by position.
+Bulk frame ingest stays column-oriented (see ingest.frames_to_columns).
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class Frame:
+    """One daily_logs frame as the reports read it"""
+    __slots__ = (
+        'timestamp', 'station_id', 'production_kw', 'consumption_kw', 'grid_kw', 'battery_kw',
+        'soc_percent', 'pv_kw', 'generator_kw', 'grid_tied_inverter_power_kw', 'ts'
+    )
+
+    timestamp: str
+    station_id: int
+    production_kw: Optional[float]
+    consumption_kw: Optional[float]
+    grid_kw: Optional[float]
+    battery_kw: Optional[float]
+    soc_percent: Optional[float]
+    pv_kw: Optional[float]
+    generator_kw: Optional[float]
+    grid_tied_inverter_power_kw: Optional[float]
+    ts: int
+
+    # SELECT list producing the fields in order
+    COLUMNS = ', '.join(__slots__)
+
+    @classmethod
+    def from_row(cls, cursor, row):
+        """sqlite3 row_factory for queries selecting Frame.COLUMNS"""
+        return cls(*row)
+
+    @property
+    def key(self):
+        """Listing order of frames: (ts, station_id)"""
+        return self.ts, self.station_id
+
+
+@dataclass
+class DailyTotals:
+    """One daily_data row: a station's energy totals (kWh) for one date"""
+    __slots__ = (
+        'date', 'station_id', 'generation_kwh', 'grid_feedin_kwh', 'grid_purchase_kwh',
+        'battery_charge_kwh', 'battery_discharge_kwh', 'consumption_kwh', 'full_power_hours'
+    )
+
+    date: str
+    station_id: int
+    generation_kwh: Optional[float]
+    grid_feedin_kwh: Optional[float]
+    grid_purchase_kwh: Optional[float]
+    battery_charge_kwh: Optional[float]
+    battery_discharge_kwh: Optional[float]
+    consumption_kwh: Optional[float]
+    full_power_hours: Optional[float]
+
+    @classmethod
+    def from_api(cls, item, station_id, date=None):
+        """From a /station/history granularity=2 item; the date comes from its year/month/day unless given
+
+        Raises KeyError, TypeError or ValueError for an item without a valid date.
+        """
+        if date is None:
+            date = f"{item['year']}-{int(item['month']):02d}-{int(item['day']):02d}"
+        return cls(
+            date,
+            station_id,
+            item.get('generationValue'),
+            item.get('gridValue'),
+            item.get('purchaseValue'),
+            item.get('chargeValue'),
+            item.get('dischargeValue'),
+            item.get('consumptionValue'),
+            item.get('fullPowerHours'),
+        )
+
+    def as_row(self):
+        """Values in ingest.INSERT_DAILY_DATA_SQL order"""
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+
+@dataclass
+class StationInfo:
+    """One station_info row"""
+    __slots__ = ('station_id', 'station_name', 'installed_capacity', 'location_address', 'grid_type')
+
+    station_id: int
+    station_name: Optional[str]
+    installed_capacity: Optional[float]
+    location_address: Optional[str]
+    grid_type: Optional[str]
+
+    @classmethod
+    def from_api(cls, station):
+        """From a /station/list item"""
+        return cls(
+            station['id'],
+            station.get('name'),
+            station.get('installedCapacity'),
+            station.get('locationAddress'),
+            station.get('gridInterconnectionType'),
+        )
+
+    def as_row(self):
+        """Values in ingest.INSERT_STATION_INFO_SQL order"""
+        return tuple(getattr(self, name) for name in self.__slots__)
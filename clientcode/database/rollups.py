@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Hourly and daily rollups of daily_logs
+Per station, each bucket keeps the frame count and, for every power column
+and SOC, the non-null count, sum, min and max. Buckets touched by an ingest
+batch are recomputed from the raw frames, so re-ingesting a day never double
+counts and reports can answer range summaries without scanning daily_logs.
+"""
+
+from datetime import datetime, timedelta
+
+# daily_logs columns aggregated into the rollups
+ROLLUP_METRICS = (
+    'production_kw', 'consumption_kw', 'grid_kw', 'battery_kw',
+    'pv_kw', 'grid_tied_inverter_power_kw', 'soc_percent'
+)
+
+# Local hour of a daily_logs row (TEXT timestamp truncated to the hour) and its epoch start;
+# hours follow the local clock like days do, so half-hour offset zones bucket correctly
+HOUR_KEY_SQL = "strftime('%Y-%m-%d %H:00:00', timestamp)"
+HOUR_TS_SQL = f"CAST(strftime('%s', {HOUR_KEY_SQL}, 'utc') AS INTEGER)"
+
+
+def _metric_columns_ddl():
+    return ',\n        '.join(
+        f'{metric}_{stat} {"INTEGER" if stat == "n" else "REAL"}'
+        for metric in ROLLUP_METRICS
+        for stat in ('n', 'sum', 'min', 'max')
+    )
+
+
+def _metric_columns():
+    return ', '.join(f'{metric}_{stat}' for metric in ROLLUP_METRICS for stat in ('n', 'sum', 'min', 'max'))
+
+
+def _metric_aggregates():
+    return ', '.join(
+        f'COUNT({metric}), SUM({metric}), MIN({metric}), MAX({metric})'
+        for metric in ROLLUP_METRICS
+    )
+
+
+def create_rollup_tables(cursor):
+    """Create the rollup tables and their indexes if missing"""
+    cursor.execute(f'''
+    CREATE TABLE IF NOT EXISTS daily_logs_hourly (
+        station_id INTEGER NOT NULL,
+        hour_ts INTEGER NOT NULL,
+        frame_count INTEGER NOT NULL,
+        first_ts INTEGER,
+        last_ts INTEGER,
+        {_metric_columns_ddl()},
+        PRIMARY KEY (station_id, hour_ts)
+    )
+    ''')
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_daily_logs_hourly_hour ON daily_logs_hourly(hour_ts)
+    ''')
+
+    cursor.execute(f'''
+    CREATE TABLE IF NOT EXISTS daily_logs_daily (
+        station_id INTEGER NOT NULL,
+        day TEXT NOT NULL,
+        frame_count INTEGER NOT NULL,
+        first_ts INTEGER,
+        last_ts INTEGER,
+        {_metric_columns_ddl()},
+        PRIMARY KEY (station_id, day)
+    )
+    ''')
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_daily_logs_daily_day ON daily_logs_daily(day)
+    ''')
+
+
+def refresh_rollups(conn, station_id, min_ts, max_ts):
+    """Recompute the hourly and daily buckets of one station that overlap [min_ts, max_ts]"""
+    # Hours are local clock hours, matching the TEXT timestamp column
+    first_hour = datetime.fromtimestamp(min_ts).replace(minute=0, second=0, microsecond=0)
+    last_hour = datetime.fromtimestamp(max_ts).replace(minute=0, second=0, microsecond=0)
+    conn.execute(f'''
+        INSERT OR REPLACE INTO daily_logs_hourly
+        (station_id, hour_ts, frame_count, first_ts, last_ts, {_metric_columns()})
+        SELECT station_id, {HOUR_TS_SQL}, COUNT(*), MIN(ts), MAX(ts), {_metric_aggregates()}
+        FROM daily_logs
+        WHERE station_id = ? AND ts >= ? AND ts < ?
+        GROUP BY {HOUR_KEY_SQL}
+    ''', (station_id, int(first_hour.timestamp()), int((last_hour + timedelta(hours=1)).timestamp())))
+
+    # Days are local calendar days, matching the TEXT timestamp column
+    first_day = datetime.fromtimestamp(min_ts).replace(hour=0, minute=0, second=0, microsecond=0)
+    last_day = datetime.fromtimestamp(max_ts).replace(hour=0, minute=0, second=0, microsecond=0)
+    conn.execute(f'''
+        INSERT OR REPLACE INTO daily_logs_daily
+        (station_id, day, frame_count, first_ts, last_ts, {_metric_columns()})
+        SELECT station_id, DATE(timestamp), COUNT(*), MIN(ts), MAX(ts), {_metric_aggregates()}
+        FROM daily_logs
+        WHERE station_id = ? AND ts >= ? AND ts < ?
+        GROUP BY DATE(timestamp)
+    ''', (station_id, int(first_day.timestamp()), int((last_day + timedelta(days=1)).timestamp())))
+
+
+def rebuild_rollups(conn):
+    """Recompute the buckets of every station and day that has frames in daily_logs
+
+    Buckets of other days are kept, so months moved out of daily_logs by
+    archive_month keep their rollups.
+    """
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT station_id, DATE(timestamp), MIN(ts), MAX(ts) FROM daily_logs
+        WHERE ts IS NOT NULL
+        GROUP BY station_id, DATE(timestamp)
+    ''')
+    for station_id, day, min_ts, max_ts in cursor.fetchall():
+        day_start = datetime.strptime(day, '%Y-%m-%d')
+        bounds = (station_id, int(day_start.timestamp()), int((day_start + timedelta(days=1)).timestamp()))
+        conn.execute('DELETE FROM daily_logs_hourly WHERE station_id = ? AND hour_ts >= ? AND hour_ts < ?', bounds)
+        conn.execute('DELETE FROM daily_logs_daily WHERE station_id = ? AND day = ?', (station_id, day))
+        refresh_rollups(conn, station_id, min_ts, max_ts)
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Device history ingest
+Fetches frame-level (granularity=1) /device/history readings of the configured
+measure points for every device and day, and stores them in device_history.
+Each device's /device/measurePoints catalog is cached in the database, so it
+is only re-requested once it is older than --catalog-ttl.
+"""
+
+import sys
+import os
+import argparse
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Function to find the project root (where .git is located)
+def find_project_root(current_dir):
+    while current_dir != os.path.abspath(os.sep):
+        if os.path.exists(os.path.join(current_dir, '.git')):
+            return current_dir
+        current_dir = os.path.dirname(current_dir)
+    return None
+
+# Get the directory where the script is located
+script_dir = os.path.dirname(__file__)
+project_root = find_project_root(script_dir)
+
+if project_root:
+    sys.path.insert(0, project_root)
+else:
+    print("Error: Could not find project root ('.git' directory).")
+    sys.exit(1)
+
+from clientcode.client import get_client
+from clientcode.database.connection import DB_PATH, get_connection
+from clientcode.database.manage.db_setup import create_database, migrate_database
+from clientcode.database.backfill_state import days_between
+from clientcode.database.device_history import (
+    CATALOG_TTL, catalog_points, load_catalog, point_summary, save_catalog, save_device_history
+)
+
+# Measure points ingested when --points is not given
+DEFAULT_POINTS = ('SOC', 'BatteryVoltage', 'BatteryCurrent', 'BatteryPower', 'ACVoltageR', 'DCTemperature')
+
+# Device/day requests in flight at once (the shared rate limiter still applies)
+DEFAULT_WORKERS = 4
+
+def get_devices():
+    """(deviceSn, deviceType) of every device on the account (every page)"""
+    return [(device['deviceSn'], device.get('deviceType')) for device in get_client().iter_devices()
+            if device.get('deviceSn')]
+
+def fetch_catalog(device_sn):
+    """(device type, measure point names) from /device/measurePoints"""
+    result = get_client().device_measure_points(device_sn)
+    if not result.get('success', True):
+        raise RuntimeError(result.get('msg'))
+    return result.get('deviceType'), catalog_points(result.get('measurePoints'))
+
+def get_catalogs(conn, executor, device_sns, ttl, refresh=False):
+    """{device_sn: point names}; only devices without a fresh cached catalog are requested"""
+    catalogs = {}
+    stale = []
+    for device_sn in device_sns:
+        points = None if refresh else load_catalog(conn, device_sn, ttl)
+        if points is None:
+            stale.append(device_sn)
+        else:
+            catalogs[device_sn] = points
+
+    futures = {executor.submit(fetch_catalog, device_sn): device_sn for device_sn in stale}
+    for future in as_completed(futures):
+        device_sn = futures[future]
+        try:
+            device_type, points = future.result()
+        except Exception as e:
+            print(f"✗ [{device_sn}] Could not fetch measure points: {e}")
+            continue
+        save_catalog(conn, device_sn, device_type, points)
+        catalogs[device_sn] = points
+
+    print(f"Measure point catalogs: {len(device_sns) - len(stale)} cached, {len(stale)} requested")
+    return catalogs
+
+def fetch_device_day(device_sn, date, points):
+    """dataList of one device and day at frame granularity"""
+    result = get_client().device_history(device_sn, 1, date, measure_points=points)
+    if not result.get('success', True):
+        raise RuntimeError(result.get('msg'))
+    return result.get('dataList') or []
+
+def main():
+    yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+    parser = argparse.ArgumentParser(description='Ingest frame-level device history of selected measure points')
+    parser.add_argument('--devices', nargs='+', help='Device serial numbers (default: every device on the account)')
+    parser.add_argument('--points', nargs='+', default=list(DEFAULT_POINTS),
+                        help=f"Measure points to store (default: {' '.join(DEFAULT_POINTS)})")
+    parser.add_argument('--start', default=yesterday, help='First day (YYYY-MM-DD, default: yesterday)')
+    parser.add_argument('--end', help='Last day (YYYY-MM-DD, default: --start)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Requests in flight at once (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--catalog-ttl', type=float, default=CATALOG_TTL / 3600,
+                        help=f'Hours a cached measure point catalog stays valid (default: {CATALOG_TTL // 3600})')
+    parser.add_argument('--refresh-catalog', action='store_true', help='Re-request every measure point catalog')
+    parser.add_argument('--summary', action='store_true',
+                        help='Only print min/avg/max per device and point from the stored history')
+    args = parser.parse_args()
+    end = args.end or args.start
+
+    if not os.path.exists(DB_PATH):
+        print("Database not found. Creating database...")
+        create_database()
+
+    conn = get_connection(DB_PATH)
+    migrate_database(conn)
+
+    if args.summary:
+        rows = point_summary(conn, args.start, end, points=args.points)
+        print(f"\nDevice history {args.start} to {end}")
+        print("=" * 90)
+        print(f"{'Device':<14} {'Point':<18} {'Unit':<6} {'Readings':>9} {'Min':>10} {'Avg':>10} {'Max':>10}")
+        print("-" * 90)
+        for device_sn, point, unit, count, minimum, average, maximum, _, _ in rows:
+            print(f"{device_sn:<14} {point:<18} {unit or '':<6} {count:>9,} "
+                  f"{minimum if minimum is not None else 'N/A':>10} {average if average is not None else 'N/A':>10} "
+                  f"{maximum if maximum is not None else 'N/A':>10}")
+        if not rows:
+            print("No device history found.")
+        conn.close()
+        return 0
+
+    device_sns = args.devices
+    if not device_sns:
+        try:
+            device_sns = [device_sn for device_sn, _ in get_devices()]
+        except Exception as e:
+            print(f"Error getting device list: {e}")
+            conn.close()
+            return 1
+
+    days = days_between(args.start, end)
+    saved = failed = 0
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        catalogs = get_catalogs(conn, executor, device_sns, args.catalog_ttl * 3600, args.refresh_catalog)
+
+        # Request only the configured points each device actually reports
+        jobs = []
+        for device_sn in device_sns:
+            available = set(catalogs.get(device_sn) or [])
+            points = [point for point in args.points if point in available]
+            if not points:
+                print(f"⚠ [{device_sn}] None of the configured points are available, skipping")
+                continue
+            jobs.extend((device_sn, day, points) for day in days)
+
+        futures = {executor.submit(fetch_device_day, *job): job for job in jobs}
+        for count, future in enumerate(as_completed(futures), 1):
+            device_sn, day, points = futures[future]
+            try:
+                data_list = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"[{count}/{len(jobs)}] [{device_sn}] ✗ {day}: {e}")
+                continue
+            rows = save_device_history(conn, device_sn, data_list)
+            saved += rows
+            print(f"[{count}/{len(jobs)}] [{device_sn}] ✓ {day}: {rows:,} readings ({len(points)} points)")
+
+    conn.close()
+    print(f"\n✓ Stored {saved:,} readings from {len(jobs) - failed}/{len(jobs)} device-days")
+    return 0 if not failed else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
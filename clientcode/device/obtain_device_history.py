@@ -1,9 +1,7 @@
-import requests
-from clientcode import variable
+from clientcode.client import get_client
 
 if __name__ == '__main__':
-    url = variable.baseurl + '/device/history'
-    headers = variable.headers
+    client = get_client()
 
     """
     Returns history data for devices at different granularities.
@@ -21,7 +19,7 @@ if __name__ == '__main__':
         "measurePoints": ["SOC"]
     }
 
-    response = requests.post(url, headers=headers, json=data)
+    response = client.post('/device/history', data)
 
     print(response.status_code)
     print(response.json())
@@ -1,9 +1,7 @@
-import requests
-from clientcode import variable
+from clientcode.client import get_client
 
 if __name__ == '__main__':
-    url = variable.baseurl + '/device/latest'
-    headers = variable.headers
+    client = get_client()
 
     """
     Fetch latest data of devices, supporting querying in batch, up to 10 devices per batch
@@ -14,7 +12,7 @@ if __name__ == '__main__':
         ]
     }
 
-    response = requests.post(url, headers=headers, json=data)
+    response = client.post('/device/latest', data)
 
     print(response.status_code)
     print(response.json())
@@ -1,17 +1,15 @@
-import requests
-from clientcode import variable
+from clientcode.client import get_client
 
 
 # Fetch device list for business members
 if __name__ == '__main__':
-    url = variable.baseurl + '/device/list'
-    headers = variable.headers
+    client = get_client()
     data = {
         "page": 1,
         "size": 20
     }
 
-    response = requests.post(url, headers=headers, json=data)
+    response = client.post('/device/list', data)
 
     print(response.status_code)
     print(response.json())
@@ -1,15 +1,13 @@
-import requests
-from clientcode import variable
+from clientcode.client import get_client
 
 # Fetch measure points according to deviceSn
 if __name__ == '__main__':
-    url = variable.baseurl + '/device/measurePoints'
-    headers = variable.headers
+    client = get_client()
     data = {
      "deviceSn": "000000"
     }
 
-    response = requests.post(url, headers=headers, json=data)
+    response = client.post('/device/measurePoints', data)
 
     print(response.status_code)
     print(response.json())
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Device latest-data poller
+Splits a fleet of device serial numbers into /device/latest batches of 10,
+fetches the batches concurrently and stores the readings in device_latest.
+Runs once, or every --interval seconds until interrupted.
+"""
+
+import sys
+import os
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Function to find the project root (where .git is located)
+def find_project_root(current_dir):
+    while current_dir != os.path.abspath(os.sep):
+        if os.path.exists(os.path.join(current_dir, '.git')):
+            return current_dir
+        current_dir = os.path.dirname(current_dir)
+    return None
+
+# Get the directory where the script is located
+script_dir = os.path.dirname(__file__)
+project_root = find_project_root(script_dir)
+
+if project_root:
+    sys.path.insert(0, project_root)
+else:
+    print("Error: Could not find project root ('.git' directory).")
+    sys.exit(1)
+
+from clientcode.client import get_client
+from clientcode.database.connection import DB_PATH, get_connection
+from clientcode.database.manage.db_setup import create_database, migrate_database
+from clientcode.database.device_latest import device_batches, save_device_latest
+
+# Batch requests in flight at once (the shared rate limiter still applies)
+DEFAULT_WORKERS = 4
+
+def get_device_sns():
+    """Serial numbers of every device on the account (every page)"""
+    return [device['deviceSn'] for device in get_client().iter_devices() if device.get('deviceSn')]
+
+def fetch_batch(device_sns):
+    """deviceDataList items of one /device/latest batch; raises RuntimeError if the API reports a failure"""
+    result = get_client().device_latest(device_sns)
+    if not result.get('success', True):
+        raise RuntimeError(result.get('msg'))
+    return result.get('deviceDataList') or []
+
+def poll_once(conn, executor, batches):
+    """Fetch every batch concurrently and write each as it arrives; returns (devices saved, failed batches)"""
+    saved = failed = 0
+    futures = {executor.submit(fetch_batch, batch): batch for batch in batches}
+    for future in as_completed(futures):
+        batch = futures[future]
+        try:
+            items = future.result()
+        except Exception as e:
+            failed += 1
+            print(f"✗ Batch {batch[0]}..{batch[-1]} ({len(batch)} devices) failed: {e}")
+            continue
+        save_device_latest(conn, items)
+        saved += len(items)
+    return saved, failed
+
+def main():
+    parser = argparse.ArgumentParser(description='Poll /device/latest for a fleet of devices into device_latest')
+    parser.add_argument('--devices', nargs='+', help='Device serial numbers (default: every device on the account)')
+    parser.add_argument('--interval', type=float, default=0,
+                        help='Seconds between snapshots; 0 takes a single snapshot (default: 0)')
+    parser.add_argument('--rounds', type=int, help='Stop after this many snapshots')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Batch requests in flight at once (default: {DEFAULT_WORKERS})')
+    args = parser.parse_args()
+
+    if not os.path.exists(DB_PATH):
+        print("Database not found. Creating database...")
+        create_database()
+
+    device_sns = args.devices
+    if not device_sns:
+        try:
+            device_sns = get_device_sns()
+        except Exception as e:
+            print(f"Error getting device list: {e}")
+            return 1
+    batches = device_batches(device_sns)
+    if not batches:
+        print("No devices to poll.")
+        return 1
+    print(f"Polling {sum(len(batch) for batch in batches)} devices in {len(batches)} batches")
+
+    conn = get_connection(DB_PATH)
+    migrate_database(conn)
+
+    failures = 0
+    rounds = 0
+    next_run = time.monotonic()
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            while True:
+                started = time.monotonic()
+                saved, failed = poll_once(conn, executor, batches)
+                failures += failed
+                rounds += 1
+                print(f"{time.strftime('%Y-%m-%d %H:%M:%S')} {'✓' if not failed else '✗'} "
+                      f"{saved} devices saved, {failed} batches failed in {time.monotonic() - started:.1f}s")
+
+                if args.interval <= 0 or (args.rounds and rounds >= args.rounds):
+                    break
+                # Fixed cadence; a snapshot that overruns the interval starts the next one at once
+                next_run = max(next_run + args.interval, time.monotonic())
+                time.sleep(max(0, next_run - time.monotonic()))
+    except KeyboardInterrupt:
+        print("\nStopped.")
+    finally:
+        conn.close()
+
+    return 0 if not failures else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
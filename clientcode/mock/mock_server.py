@@ -0,0 +1,722 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the DeyeCloud API
+Serves deterministic synthetic stations, devices and history (or recorded
+fixtures) with configurable latency, injected errors and rate limiting, so
+daily_update.py and the backfill scripts can be run and load-tested offline.
+Point the scripts at it with DEYE_BASEURL=http://127.0.0.1:8765/v1.0
+"""
+
+import sys
+import os
+import argparse
+import calendar
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from functools import lru_cache
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit
+
+# Add project root to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../'))
+from clientcode.api_codes import INVALID_TOKEN_CODE, RATE_LIMITED_CODE
+from clientcode.commission.modbus_codec import crc16
+from clientcode.ratelimit import TokenBucket
+
+API_PREFIX = '/v1.0'
+
+FRAME_INTERVAL = 300  # 5-minute frames, like the live API
+FRAMES_PER_DAY = 86400 // FRAME_INTERVAL
+
+# Range limits of /station/history and /device/history per granularity
+MAX_DAYS = 31
+MAX_MONTHS = 12
+
+# Devices per station, cycling through these types
+DEVICE_TYPES = ('INVERTER', 'BATTERY', 'METER', 'COLLECTOR')
+
+# Measure points per device type: key -> unit
+MEASURE_POINTS = {
+    'INVERTER': {
+        'TotalSolarPower': 'W', 'TotalConsumptionPower': 'W', 'TotalGridPower': 'W',
+        'BatteryPower': 'W', 'SOC': '%', 'DailyActiveProduction': 'kWh',
+        'ACOutputFrequencyR': 'Hz', 'ACVoltageR': 'V', 'DCTemperature': '℃',
+    },
+    'BATTERY': {
+        'SOC': '%', 'BatteryPower': 'W', 'BatteryVoltage': 'V', 'BatteryCurrent': 'A',
+        'BMSTemperature': '℃',
+    },
+    'METER': {
+        'TotalGridPower': 'W', 'ACVoltageR': 'V', 'ACOutputFrequencyR': 'Hz',
+    },
+    'COLLECTOR': {},
+}
+
+# Order status codes returned by GET /order/{orderId}
+ORDER_CREATED = 0
+ORDER_SENDING = 100
+ORDER_SUCCESS = 666
+ORDER_FAILED = 999
+
+AUTH_FAILURE = {'success': False, 'code': INVALID_TOKEN_CODE, 'msg': 'auth invalid token'}
+RATE_LIMITED = {'success': False, 'code': RATE_LIMITED_CODE, 'msg': 'Request too frequently, please try again later'}
+INJECTED_ERROR = {'success': False, 'code': '5000000', 'msg': 'Mock injected server error'}
+
+
+def ok(**payload):
+    """Successful DeyeCloud response envelope"""
+    return dict({'code': '1000000', 'msg': 'success', 'success': True, 'requestId': uuid.uuid4().hex[:16]}, **payload)
+
+
+def fail(msg, code='2101000'):
+    """Business error envelope (HTTP 200 with success=false)"""
+    return {'code': code, 'msg': msg, 'success': False, 'requestId': uuid.uuid4().hex[:16]}
+
+
+class Fleet:
+    """Deterministic synthetic stations and devices; the same seed always yields the same data"""
+
+    def __init__(self, stations=10, devices=2, seed=1, missing_frames=0.0):
+        self.seed = seed
+        self.missing_frames = missing_frames
+        self.stations = [self._station(station_id) for station_id in range(1, stations + 1)]
+        self.by_id = {station['id']: station for station in self.stations}
+        self.devices = []
+        for station in self.stations:
+            for k in range(devices):
+                device_type = DEVICE_TYPES[k % len(DEVICE_TYPES)]
+                self.devices.append({
+                    'deviceSn': f"{2300000000 + station['id'] * 100 + k}",
+                    'deviceId': station['id'] * 100 + k,
+                    'deviceType': device_type,
+                    'stationId': station['id'],
+                    'connectStatus': 1,
+                    'productId': f"MOCK-{device_type}",
+                })
+        self.device_by_sn = {device['deviceSn']: device for device in self.devices}
+        self.registers = {}
+        self.registers_lock = threading.Lock()
+
+    def _station(self, station_id):
+        rng = random.Random(f"{self.seed}:station:{station_id}")
+        capacity = round(rng.uniform(3, 15), 1)
+        return {
+            'id': station_id,
+            'name': f"Mock Station {station_id}",
+            'locationLat': round(rng.uniform(-40, 50), 4),
+            'locationLng': round(rng.uniform(-10, 150), 4),
+            'locationAddress': f"{station_id} Mock Street",
+            'regionNationId': 1,
+            'regionTimezone': 'UTC',
+            'gridInterconnectionType': rng.choice(['SELF_CONSUMPTION', 'FULL_GRID_CONNECTION']),
+            'installedCapacity': capacity,
+            'batteryCapacity': round(capacity * rng.uniform(0.8, 1.5), 1),
+            'startOperatingTime': 1577836800,
+            'createdDate': 1577836800,
+            'connectionStatus': 'NORMAL',
+            'ownerName': 'Mock Owner',
+        }
+
+    def station_devices(self, station_ids, device_type=None):
+        """Devices of the given stations, optionally of one type"""
+        station_ids = set(station_ids)
+        return [device for device in self.devices
+                if device['stationId'] in station_ids and (device_type is None or device['deviceType'] == device_type)]
+
+    def day_frames(self, station_id, date):
+        """The day's 5-minute frames (with `missing_frames` of them dropped at random)"""
+        frames = list(self._day_frames(station_id, date))
+        if self.missing_frames:
+            rng = random.Random(f"{self.seed}:gaps:{station_id}:{date}")
+            frames = [frame for frame in frames if rng.random() >= self.missing_frames]
+        return frames
+
+    @lru_cache(maxsize=8192)
+    def _day_frames(self, station_id, date):
+        station = self.by_id[station_id]
+        day = datetime.strptime(date, '%Y-%m-%d')
+        day_start = int(day.timestamp())
+        rng = random.Random(f"{self.seed}:day:{station_id}:{date}")
+
+        capacity_w = station['installedCapacity'] * 1000
+        battery_wh = station['batteryCapacity'] * 1000
+        season = 0.65 + 0.35 * math.cos(2 * math.pi * (day.timetuple().tm_yday - 172) / 365)
+        clouds = rng.uniform(0.35, 1.0)
+        soc = rng.uniform(20, 60)
+
+        frames = []
+        for i in range(FRAMES_PER_DAY):
+            hour = i * FRAME_INTERVAL / 3600
+            solar = math.sin(math.pi * (hour - 6) / 12) if 6 <= hour <= 18 else 0.0
+            generation = max(0.0, capacity_w * season * solar * clouds * rng.uniform(0.85, 1.0))
+            consumption = 350 + (900 if 18 <= hour < 22 else 0) + (400 if 7 <= hour < 9 else 0) + rng.uniform(0, 250)
+
+            # Positive battery power discharges, positive grid power feeds in
+            surplus = generation - consumption
+            if surplus > 0:
+                battery = -min(surplus, 3000, (100 - soc) / 100 * battery_wh * 3600 / FRAME_INTERVAL)
+            else:
+                battery = min(-surplus, 3000, (soc - 10) / 100 * battery_wh * 3600 / FRAME_INTERVAL)
+            soc = min(100.0, max(10.0, soc - battery * FRAME_INTERVAL / 3600 / battery_wh * 100))
+            grid = generation + battery - consumption
+
+            frames.append({
+                'timeStamp': day_start + i * FRAME_INTERVAL,
+                'generationPower': round(generation, 1),
+                'consumptionPower': round(consumption, 1),
+                'gridPower': round(grid, 1),
+                'purchasePower': round(max(0.0, -grid), 1),
+                'wirePower': round(grid, 1),
+                'batteryPower': round(battery, 1) + 0.0,
+                'chargePower': round(max(0.0, -battery), 1),
+                'dischargePower': round(max(0.0, battery), 1),
+                'batterySOC': round(soc),
+                'irradiateIntensity': round(1000 * season * solar * clouds, 1),
+            })
+        return tuple(frames)
+
+    @lru_cache(maxsize=65536)
+    def day_totals(self, station_id, date):
+        """kWh totals of a day, integrated from its frames"""
+        to_kwh = FRAME_INTERVAL / 3600 / 1000
+        frames = self._day_frames(station_id, date)
+        generation = sum(frame['generationPower'] for frame in frames) * to_kwh
+        return {
+            'generationValue': round(generation, 2),
+            'gridValue': round(sum(max(0.0, frame['gridPower']) for frame in frames) * to_kwh, 2),
+            'purchaseValue': round(sum(frame['purchasePower'] for frame in frames) * to_kwh, 2),
+            'chargeValue': round(sum(frame['chargePower'] for frame in frames) * to_kwh, 2),
+            'dischargeValue': round(sum(frame['dischargePower'] for frame in frames) * to_kwh, 2),
+            'consumptionValue': round(sum(frame['consumptionPower'] for frame in frames) * to_kwh, 2),
+            'fullPowerHours': round(generation / self.by_id[station_id]['installedCapacity'], 2),
+        }
+
+    def period_totals(self, station_id, first, last):
+        """Sum of the day totals from first to last inclusive (datetime dates)"""
+        totals = {}
+        day = first
+        while day <= last:
+            for key, value in self.day_totals(station_id, day.strftime('%Y-%m-%d')).items():
+                totals[key] = totals.get(key, 0.0) + value
+            day += timedelta(days=1)
+        return {key: round(value, 2) for key, value in totals.items()}
+
+    def latest_frame(self, station_id):
+        """The frame closest to now"""
+        now = datetime.now()
+        frames = self._day_frames(station_id, now.strftime('%Y-%m-%d'))
+        index = min(FRAMES_PER_DAY - 1, (now.hour * 3600 + now.minute * 60) // FRAME_INTERVAL)
+        return frames[index]
+
+    def device_values(self, device, frame):
+        """Measure point values of a device for one station frame"""
+        values = {
+            'TotalSolarPower': frame['generationPower'],
+            'TotalConsumptionPower': frame['consumptionPower'],
+            'TotalGridPower': frame['gridPower'],
+            'BatteryPower': frame['batteryPower'],
+            'SOC': frame['batterySOC'],
+            'DailyActiveProduction': round(frame['generationPower'] / 1000, 2),
+            'ACOutputFrequencyR': 50.0,
+            'ACVoltageR': 230.0 + (frame['timeStamp'] // FRAME_INTERVAL) % 7 - 3,
+            'DCTemperature': round(25 + frame['generationPower'] / 500, 1),
+            'BatteryVoltage': round(48 + frame['batterySOC'] / 20, 2),
+            'BatteryCurrent': round(frame['batteryPower'] / 52, 2),
+            'BMSTemperature': round(22 + abs(frame['batteryPower']) / 400, 1),
+        }
+        points = MEASURE_POINTS[device['deviceType']]
+        return [{'key': key, 'value': str(values[key]), 'unit': unit} for key, unit in points.items()]
+
+    def register(self, device_sn, address):
+        """Holding register value (writes via customControl are remembered)"""
+        with self.registers_lock:
+            if (device_sn, address) not in self.registers:
+                self.registers[(device_sn, address)] = random.Random(f"{self.seed}:reg:{device_sn}:{address}").randrange(0x10000)
+            return self.registers[(device_sn, address)]
+
+    def modbus_reply(self, device_sn, content):
+        """Reply frame (spaced hex) to a Modbus RTU request, or raise ValueError on a malformed one"""
+        request = bytes.fromhex(content.replace(' ', ''))
+        if len(request) < 8 or crc16(request[:-2]) != request[-2] | (request[-1] << 8):
+            raise ValueError('Invalid Modbus frame or CRC')
+        slave, function = request[0], request[1]
+        address = (request[2] << 8) | request[3]
+        count = (request[4] << 8) | request[5]
+
+        if function == 3:
+            if not 1 <= count <= 125:
+                reply = bytes([slave, 0x83, 3])
+            else:
+                data = b''.join(self.register(device_sn, address + i).to_bytes(2, 'big') for i in range(count))
+                reply = bytes([slave, 3, len(data)]) + data
+        elif function == 6:
+            with self.registers_lock:
+                self.registers[(device_sn, address)] = count
+            reply = request[:6]
+        elif function == 16:
+            values = request[7:7 + request[6]]
+            with self.registers_lock:
+                for i in range(count):
+                    self.registers[(device_sn, address + i)] = (values[2 * i] << 8) | values[2 * i + 1]
+            reply = request[:6]
+        else:
+            reply = bytes([slave, function | 0x80, 1])
+
+        crc = crc16(reply)
+        reply += bytes([crc & 0xFF, crc >> 8])
+        return ' '.join(f"{b:02X}" for b in reply)
+
+
+def load_fixtures(directory):
+    """{endpoint path: [{'request': body, 'response': payload}, ...]} from a fixture directory"""
+    fixtures = {}
+    if not directory:
+        return fixtures
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.json'):
+            with open(os.path.join(directory, name)) as f:
+                fixtures[fixture_path(name)] = json.load(f)
+    return fixtures
+
+
+def fixture_name(path):
+    """Fixture file name for an endpoint path, e.g. /station/history -> station_history.json"""
+    return path.strip('/').replace('/', '_') + '.json'
+
+
+def fixture_path(name):
+    """Endpoint path of a fixture file name"""
+    return '/' + name[:-len('.json')].replace('_', '/')
+
+
+def match_fixture(entries, body):
+    """First recorded response whose request fields all match the body"""
+    for entry in entries:
+        request = entry.get('request') or {}
+        if all(body.get(key) == value for key, value in request.items()):
+            return entry['response']
+    return None
+
+
+def page_of(items, body, default_size):
+    """(page items, total) of a paged list request"""
+    page = max(1, int(body.get('page') or 1))
+    size = max(1, int(body.get('size') or default_size))
+    return items[(page - 1) * size:page * size], len(items)
+
+
+class MockApi:
+    """Endpoint handlers plus the fault injection and per-endpoint statistics"""
+
+    def __init__(self, fleet, latency=0.0, jitter=0.0, error_rate=0.0, rate_limit=None, burst=None,
+                 auth=False, token_ttl=5183999, order_delay=4.0, order_failure_rate=0.0, fixtures=None):
+        self.fleet = fleet
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.bucket = TokenBucket(rate_limit, burst or max(1, int(rate_limit))) if rate_limit else None
+        self.auth = auth
+        self.token_ttl = token_ttl
+        self.order_delay = order_delay
+        self.order_failure_rate = order_failure_rate
+        self.fixtures = fixtures or {}
+        self.tokens = {}
+        self.orders = {}
+        self.lock = threading.Lock()
+        self.rng = random.Random(fleet.seed)
+        self.stats = {}
+        self.started = time.time()
+
+    def record(self, endpoint, status, elapsed):
+        with self.lock:
+            entry = self.stats.setdefault(endpoint, {'requests': 0, 'errors': 0, 'rate_limited': 0, 'seconds': 0.0})
+            entry['requests'] += 1
+            entry['seconds'] += elapsed
+            if status == 429:
+                entry['rate_limited'] += 1
+            elif status >= 500:
+                entry['errors'] += 1
+
+    def summary(self):
+        """Per-endpoint request counts, injected failures and mean latency"""
+        with self.lock:
+            endpoints = {
+                endpoint: dict(entry, seconds=round(entry['seconds'], 3),
+                               mean_ms=round(entry['seconds'] / entry['requests'] * 1000, 1))
+                for endpoint, entry in sorted(self.stats.items())
+            }
+        total = sum(entry['requests'] for entry in endpoints.values())
+        uptime = time.time() - self.started
+        return {'requests': total, 'uptime_s': round(uptime, 1),
+                'requests_per_s': round(total / uptime, 1) if uptime else 0.0, 'endpoints': endpoints}
+
+    def handle(self, method, path, query, body, authorization):
+        """Return (HTTP status, payload, extra headers) for one request"""
+        if path == '/mock/stats':
+            return 200, self.summary(), {}
+
+        if self.bucket:
+            wait = self.bucket.try_take()
+            if wait:
+                return 429, RATE_LIMITED, {'Retry-After': str(max(1, math.ceil(wait)))}
+
+        delay = self.latency + (self.rng.uniform(-self.jitter, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+        if self.error_rate and self.rng.random() < self.error_rate:
+            return 500, INJECTED_ERROR, {}
+
+        if path == '/account/token':
+            return 200, self.issue_token(query, body), {}
+
+        if self.auth and not self.valid_token(authorization):
+            return 200, AUTH_FAILURE, {}
+
+        if path in self.fixtures:
+            response = match_fixture(self.fixtures[path], body)
+            if response is not None:
+                return 200, response, {}
+
+        if method == 'GET' and path.startswith('/order/'):
+            return 200, self.order_status(path.rsplit('/', 1)[-1]), {}
+        if path.startswith('/order/') or path == '/strategy/dynamicControl':
+            return 200, self.create_order(path, body), {}
+
+        handler = ROUTES.get(path)
+        if handler is None:
+            return 404, fail(f"Unknown endpoint {path}", '404'), {}
+        try:
+            return 200, handler(self, body), {}
+        except (KeyError, TypeError, ValueError) as e:
+            return 200, fail(f"Invalid request: {e}"), {}
+
+    # Account
+
+    def issue_token(self, query, body):
+        if not query.get('appId') or not body.get('email') or not body.get('password'):
+            return fail('appId, email and password are required')
+        token = 'mock-' + uuid.uuid4().hex
+        with self.lock:
+            self.tokens[token] = time.time() + self.token_ttl
+        return ok(accessToken=token, tokenType='bearer', expiresIn=str(self.token_ttl), scope='all', uid=1)
+
+    def valid_token(self, authorization):
+        token = (authorization or '').split(' ', 1)[-1]
+        with self.lock:
+            return self.tokens.get(token, 0) > time.time()
+
+    def account_info(self, body):
+        return ok(orgInfoList=[{'companyId': 0, 'companyName': 'Mock Company', 'roleName': 'owner'}])
+
+    # Station
+
+    def station_list(self, body):
+        stations, total = page_of(self.fleet.stations, body, 100)
+        return ok(total=total, stationList=stations)
+
+    def station_list_with_device(self, body):
+        device_type = body.get('deviceType')
+        stations, total = page_of(self.fleet.stations, body, 10)
+        return ok(total=total, stationList=[
+            dict(station, deviceListItems=self.fleet.station_devices([station['id']], device_type))
+            for station in stations
+        ])
+
+    def station_device(self, body):
+        devices, total = page_of(self.fleet.station_devices(body.get('stationIds') or []), body, 10)
+        return ok(total=total, deviceListItems=devices)
+
+    def station_latest(self, body):
+        station_id = int(body['stationId'])
+        if station_id not in self.fleet.by_id:
+            return fail(f"Station {station_id} not found")
+        frame = dict(self.fleet.latest_frame(station_id))
+        frame['lastUpdateTime'] = frame.pop('timeStamp')
+        return ok(**frame)
+
+    def station_history(self, body):
+        station_id = int(body['stationId'])
+        if station_id not in self.fleet.by_id:
+            return fail(f"Station {station_id} not found")
+        items = self.history_items(body, lambda day: self.fleet.day_frames(station_id, day),
+                                   lambda first, last: self.fleet.period_totals(station_id, first, last))
+        if isinstance(items, str):
+            return fail(items)
+        return ok(total=len(items), stationDataItems=items)
+
+    def history_items(self, body, frames_of, totals_of):
+        """History items for granularity 1-4 (endAt is exclusive), or an error message"""
+        granularity = int(body['granularity'])
+        start_at = body['startAt']
+        end_at = body.get('endAt') or start_at
+        today = datetime.now().date()
+
+        if granularity == 1:
+            day = datetime.strptime(start_at[:10], '%Y-%m-%d').date()
+            if day > today:
+                return []
+            now = time.time()
+            return [frame for frame in frames_of(day.strftime('%Y-%m-%d')) if frame['timeStamp'] <= now]
+
+        if granularity == 2:
+            first = datetime.strptime(start_at, '%Y-%m-%d').date()
+            end = datetime.strptime(end_at, '%Y-%m-%d').date()
+            days = max(1, (end - first).days)
+            if days > MAX_DAYS:
+                return f"The time span cannot exceed {MAX_DAYS} days"
+            items = []
+            for i in range(days):
+                day = first + timedelta(days=i)
+                if day >= today:
+                    break
+                items.append(dict({'year': day.year, 'month': day.month, 'day': day.day}, **totals_of(day, day)))
+            return items
+
+        if granularity == 3:
+            year, month = map(int, start_at[:7].split('-'))
+            end_year, end_month = map(int, end_at[:7].split('-'))
+            months = max(1, (end_year - year) * 12 + end_month - month)
+            if months > MAX_MONTHS:
+                return f"The time span cannot exceed {MAX_MONTHS} months"
+            items = []
+            for _ in range(months):
+                first = datetime(year, month, 1).date()
+                if first >= today:
+                    break
+                last = min(datetime(year, month, calendar.monthrange(year, month)[1]).date(), today - timedelta(days=1))
+                items.append(dict({'year': year, 'month': month}, **totals_of(first, last)))
+                year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+            return items
+
+        if granularity == 4:
+            year, end_year = int(start_at[:4]), int(end_at[:4])
+            items = []
+            for y in range(year, max(year + 1, end_year)):
+                first = datetime(y, 1, 1).date()
+                if first >= today:
+                    break
+                items.append(dict({'year': y}, **totals_of(first, min(datetime(y, 12, 31).date(), today - timedelta(days=1)))))
+            return items
+
+        return f"Unsupported granularity {granularity}"
+
+    # Device
+
+    def device_list(self, body):
+        devices, total = page_of(self.fleet.devices, body, 20)
+        return ok(total=total, deviceList=devices)
+
+    def device_latest(self, body):
+        device_sns = list(body['deviceList'])
+        if len(device_sns) > 10:
+            return fail('Up to 10 devices per request')
+        items = []
+        for device_sn in device_sns:
+            device = self.fleet.device_by_sn.get(device_sn)
+            if device is None:
+                continue
+            frame = self.fleet.latest_frame(device['stationId'])
+            items.append({
+                'deviceSn': device_sn,
+                'deviceType': device['deviceType'],
+                'deviceState': 1,
+                'collectionTime': frame['timeStamp'],
+                'dataList': self.fleet.device_values(device, frame),
+            })
+        return ok(deviceDataList=items)
+
+    def device_measure_points(self, body):
+        device = self.fleet.device_by_sn.get(body['deviceSn'])
+        if device is None:
+            return fail(f"Device {body['deviceSn']} not found")
+        return ok(deviceSn=device['deviceSn'], deviceType=device['deviceType'],
+                  measurePoints=list(MEASURE_POINTS[device['deviceType']]))
+
+    def device_history(self, body):
+        device = self.fleet.device_by_sn.get(body['deviceSn'])
+        if device is None:
+            return fail(f"Device {body['deviceSn']} not found")
+        station_id = device['stationId']
+        granularity = int(body['granularity'])
+        if granularity == 1 and not body.get('measurePoints'):
+            return fail('measurePoints is required for granularity 1')
+
+        items = self.history_items(body, lambda day: self.fleet.day_frames(station_id, day),
+                                   lambda first, last: self.fleet.period_totals(station_id, first, last))
+        if isinstance(items, str):
+            return fail(items)
+
+        if granularity == 1:
+            wanted = set(body['measurePoints'])
+            data = [{'time': str(frame['timeStamp']),
+                     'itemList': [item for item in self.fleet.device_values(device, frame) if item['key'] in wanted]}
+                    for frame in items]
+        else:
+            data = []
+            for item in items:
+                period = {key: item[key] for key in ('year', 'month', 'day') if key in item}
+                values = [{'key': key, 'value': str(value), 'unit': 'h' if key == 'fullPowerHours' else 'kWh'}
+                          for key, value in item.items() if key not in period]
+                data.append(dict(period, itemList=values))
+        return ok(deviceSn=device['deviceSn'], deviceType=device['deviceType'], granularity=granularity, dataList=data)
+
+    # Commission / strategy
+
+    def create_order(self, path, body):
+        device_sn = body.get('deviceSn')
+        if device_sn not in self.fleet.device_by_sn:
+            return fail(f"Device {device_sn} not found")
+        analysis = None
+        if path == '/order/customControl':
+            try:
+                analysis = self.fleet.modbus_reply(device_sn, body.get('content') or '')
+            except ValueError as e:
+                return fail(str(e))
+        order_id = str(uuid.uuid4().int % 10 ** 12)
+        with self.lock:
+            self.orders[order_id] = {
+                'created': time.time(),
+                'path': path,
+                'failed': self.rng.random() < self.order_failure_rate,
+                'analysisResult': analysis,
+            }
+        return ok(orderId=order_id, collectionTime=int(time.time()))
+
+    def order_status(self, order_id):
+        with self.lock:
+            order = self.orders.get(order_id)
+        if order is None:
+            return fail(f"Order {order_id} not found")
+        age = time.time() - order['created']
+        if age < self.order_delay / 2:
+            return ok(orderId=order_id, status=ORDER_CREATED)
+        if age < self.order_delay:
+            return ok(orderId=order_id, status=ORDER_SENDING)
+        if order['failed']:
+            return ok(orderId=order_id, status=ORDER_FAILED, error='Device did not respond (mock)')
+        return ok(orderId=order_id, status=ORDER_SUCCESS, analysisResult=order['analysisResult'] or '')
+
+
+ROUTES = {
+    '/account/info': MockApi.account_info,
+    '/station/list': MockApi.station_list,
+    '/station/listWithDevice': MockApi.station_list_with_device,
+    '/station/device': MockApi.station_device,
+    '/station/latest': MockApi.station_latest,
+    '/station/history': MockApi.station_history,
+    '/device/list': MockApi.device_list,
+    '/device/latest': MockApi.device_latest,
+    '/device/measurePoints': MockApi.device_measure_points,
+    '/device/history': MockApi.device_history,
+}
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """HTTP front end: decodes the request and hands it to server.api"""
+
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like the live API behind the pooled client
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        self.dispatch('GET')
+
+    def do_POST(self):
+        self.dispatch('POST')
+
+    def dispatch(self, method):
+        started = time.monotonic()
+        url = urlsplit(self.path)
+        path = url.path[len(API_PREFIX):] if url.path.startswith(API_PREFIX) else url.path
+        query = dict(part.split('=', 1) for part in url.query.split('&') if '=' in part)
+
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}') if length else {}
+        except ValueError:
+            body = None
+
+        if not isinstance(body, dict):
+            status, payload, headers = 400, fail('Request body must be a JSON object', '400'), {}
+        else:
+            try:
+                status, payload, headers = self.server.api.handle(method, path, query, body, self.headers.get('Authorization'))
+            except Exception as e:
+                status, payload, headers = 500, fail(f"Mock server error: {e}", '500'), {}
+
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+        endpoint = '/order/{orderId}' if method == 'GET' and path.startswith('/order/') else path
+        self.server.api.record(endpoint, status, time.monotonic() - started)
+
+
+def make_server(api, host='127.0.0.1', port=8765, verbose=False):
+    """Threaded HTTP server serving `api`; call serve_forever() on it"""
+    server = ThreadingHTTPServer((host, port), MockHandler)
+    server.daemon_threads = True
+    server.api = api
+    server.verbose = verbose
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local DeyeCloud API mock server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--stations', type=int, default=10, help='Number of synthetic stations (default: 10)')
+    parser.add_argument('--devices', type=int, default=2, help='Devices per station (default: 2)')
+    parser.add_argument('--seed', type=int, default=1, help='Seed of the synthetic data (default: 1)')
+    parser.add_argument('--missing-frames', type=float, default=0.0, help='Fraction of 5-minute frames to drop (default: 0)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Added latency per request in seconds (default: 0)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Random +/- latency jitter in seconds (default: 0)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with HTTP 500 (default: 0)')
+    parser.add_argument('--rate-limit', type=float, default=None, help='Requests per second before HTTP 429 (default: unlimited)')
+    parser.add_argument('--burst', type=int, default=None, help='Burst size of the rate limit (default: one second of requests)')
+    parser.add_argument('--auth', action='store_true', help='Reject requests without a token issued by this server')
+    parser.add_argument('--token-ttl', type=int, default=5183999, help='Lifetime of issued tokens in seconds')
+    parser.add_argument('--order-delay', type=float, default=4.0, help='Seconds until an order reports success (default: 4)')
+    parser.add_argument('--order-failure-rate', type=float, default=0.0, help='Fraction of orders that end in failure (default: 0)')
+    parser.add_argument('--fixtures', help='Directory of recorded responses (see record_fixtures.py) served before synthetic data')
+    parser.add_argument('--verbose', action='store_true', help='Log every request')
+    args = parser.parse_args()
+
+    fleet = Fleet(args.stations, args.devices, args.seed, args.missing_frames)
+    api = MockApi(
+        fleet, args.latency, args.jitter, args.error_rate, args.rate_limit, args.burst,
+        args.auth, args.token_ttl, args.order_delay, args.order_failure_rate, load_fixtures(args.fixtures)
+    )
+    server = make_server(api, args.host, args.port, args.verbose)
+
+    print(f"✓ Mock DeyeCloud API on http://{args.host}:{args.port}{API_PREFIX}")
+    print(f"  {len(fleet.stations)} stations, {len(fleet.devices)} devices, seed {args.seed}")
+    if api.fixtures:
+        print(f"  Fixtures for: {', '.join(sorted(api.fixtures))}")
+    print(f"  Stats: http://{args.host}:{args.port}/mock/stats")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("\nRequests served:")
+        print(json.dumps(api.summary(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Record live DeyeCloud responses as replay fixtures for mock_server.py
+Writes one <endpoint>.json file per endpoint, each a list of
+{'request': body, 'response': payload} entries; the mock server answers a
+request with the first entry whose request fields all match it.
+"""
+
+import sys
+import os
+
+# Function to find the project root (where .git is located)
+def find_project_root(current_dir):
+    while current_dir != os.path.abspath(os.sep):
+        if os.path.exists(os.path.join(current_dir, '.git')):
+            return current_dir
+        current_dir = os.path.dirname(current_dir)
+    return None
+
+# Get the directory where the script is located
+script_dir = os.path.dirname(__file__)
+project_root = find_project_root(script_dir)
+
+if project_root:
+    sys.path.insert(0, project_root)
+else:
+    print("Error: Could not find project root ('.git' directory).")
+    sys.exit(1)
+
+import argparse
+import json
+from datetime import datetime, timedelta
+
+from clientcode.client import get_client
+from clientcode.mock.mock_server import fixture_name
+
+DEFAULT_FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+class Recorder:
+    """Sends requests through the shared client and collects the responses per endpoint"""
+
+    def __init__(self, client):
+        self.client = client
+        self.entries = {}
+
+    def record(self, path, body):
+        """POST body to path, keep the response and return it"""
+        try:
+            payload = self.client.call(path, body)
+        except Exception as e:
+            print(f"  ✗ {path}: {e}")
+            return {}
+        self.entries.setdefault(path, []).append({'request': body, 'response': payload})
+        if not payload.get('success'):
+            print(f"  ! {path}: {payload.get('msg')}")
+        return payload
+
+    def save(self, directory):
+        """Write one fixture file per endpoint; returns the number of responses written"""
+        os.makedirs(directory, exist_ok=True)
+        for path, entries in sorted(self.entries.items()):
+            with open(os.path.join(directory, fixture_name(path)), 'w') as f:
+                json.dump(entries, f, indent=2)
+        return sum(len(entries) for entries in self.entries.values())
+
+
+def record_station(recorder, station_id, days):
+    """History of one station: a day of frames for each of the last `days` days, plus day/month/year totals"""
+    today = datetime.now().date()
+    for i in range(days, 0, -1):
+        day = today - timedelta(days=i)
+        recorder.record('/station/history', {
+            'stationId': station_id,
+            'granularity': 1,
+            'startAt': day.strftime('%Y-%m-%d'),
+            'endAt': (day + timedelta(days=1)).strftime('%Y-%m-%d'),
+        })
+
+    first = today - timedelta(days=min(days, 31))
+    recorder.record('/station/history', {
+        'stationId': station_id, 'granularity': 2,
+        'startAt': first.strftime('%Y-%m-%d'), 'endAt': today.strftime('%Y-%m-%d'),
+    })
+    recorder.record('/station/history', {
+        'stationId': station_id, 'granularity': 3,
+        'startAt': f"{today.year - 1}-{today.month:02d}", 'endAt': f"{today.year}-{today.month:02d}",
+    })
+    recorder.record('/station/history', {
+        'stationId': station_id, 'granularity': 4,
+        'startAt': str(today.year - 1), 'endAt': str(today.year + 1),
+    })
+    recorder.record('/station/latest', {'stationId': station_id})
+
+
+def record_devices(recorder, device_sns):
+    """Latest data (in batches of 10) and measure points of the given devices"""
+    for i in range(0, len(device_sns), 10):
+        recorder.record('/device/latest', {'deviceList': device_sns[i:i + 10]})
+    for device_sn in device_sns:
+        recorder.record('/device/measurePoints', {'deviceSn': device_sn})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Record live DeyeCloud responses as mock server fixtures')
+    parser.add_argument('--output', default=DEFAULT_FIXTURE_DIR, help=f'Fixture directory (default: {DEFAULT_FIXTURE_DIR})')
+    parser.add_argument('--stations', type=int, default=1, help='Number of stations to record history for (default: 1)')
+    parser.add_argument('--days', type=int, default=3, help='Days of frame history per station (default: 3)')
+    args = parser.parse_args()
+
+    client = get_client()
+    recorder = Recorder(client)
+
+    print(f"Recording from {client.baseurl}")
+    stations = recorder.record('/station/list', {'page': 1, 'size': 100}).get('stationList') or []
+    if not stations:
+        print("No stations found")
+        return 1
+
+    station_ids = [station['id'] for station in stations]
+    devices = recorder.record('/station/device', {'page': 1, 'size': 100, 'stationIds': station_ids}).get('deviceListItems') or []
+
+    for station_id in station_ids[:args.stations]:
+        print(f"Station {station_id}")
+        record_station(recorder, station_id, args.days)
+
+    record_devices(recorder, [device['deviceSn'] for device in devices])
+
+    count = recorder.save(args.output)
+    print(f"✓ Recorded {count} responses for {len(recorder.entries)} endpoints in {args.output}")
+    print(f"  Serve them with: python3 clientcode/mock/mock_server.py --fixtures {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
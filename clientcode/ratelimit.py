@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Rate limiting for DeyeCloud API calls
+Token bucket usable from both threads and asyncio coroutines, plus a
+process-wide adaptive limiter that backs off when the API throttles us
+"""
+
+import asyncio
+import random
+import threading
+import time
+
+from clientcode.api_codes import RATE_LIMIT_CODES
+from clientcode.config import get_api_rate
+
+# Default sustained request rate (requests per second) and burst size.
+# Override with `api_rate` / `api_burst` in variable.py or DEYE_API_RATE / DEYE_API_BURST
+DEFAULT_RATE = 2.0
+DEFAULT_BURST = 4
+
+# Never throttle below this rate, however many 429s we see
+MIN_RATE = 0.2
+
+# Exponential backoff after a throttled response (seconds)
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+
+# Fraction of the configured rate restored after each successful call
+RAMP_STEP = 0.1
+
+
+# Fallback detection on the error message when the code is unknown
+RATE_LIMIT_MESSAGES = ('too many', 'too frequent', 'frequently', 'rate limit', 'limit exceeded')
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, up to `burst` stored"""
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self):
+        """Take one token and return how long the caller must wait before using it"""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def try_take(self):
+        """Take one token if one is available; returns 0, else the seconds until one is (nothing taken)"""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self):
+        """Block the calling thread until a token is available"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Suspend the calling coroutine until a token is available"""
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class AdaptiveRateLimiter(TokenBucket):
+    """Token bucket that halves its rate and pauses on throttling, then ramps back up"""
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, min_rate=MIN_RATE):
+        super().__init__(rate, burst)
+        self.max_rate = self.rate
+        self.min_rate = min(min_rate, self.rate)
+        self.failures = 0
+        self.paused_until = 0.0
+
+    def reserve(self):
+        """Take one token; the wait also covers any backoff pause in progress"""
+        wait = super().reserve()
+        with self.lock:
+            pause = self.paused_until - time.monotonic()
+        return max(wait, pause)
+
+    def throttled(self, retry_after=None):
+        """Record a throttled response and return the backoff delay applied"""
+        with self.lock:
+            self.failures += 1
+            self._refill(time.monotonic())
+            self.rate = max(self.min_rate, self.rate / 2)
+            if retry_after is not None:
+                delay = float(retry_after)
+            else:
+                delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (self.failures - 1))
+                delay *= random.uniform(0.5, 1.5)  # Jitter so workers don't retry in lockstep
+            self.paused_until = max(self.paused_until, time.monotonic() + delay)
+            return delay
+
+    def succeeded(self):
+        """Record a successful call and ramp the rate back towards the configured maximum"""
+        with self.lock:
+            self.failures = 0
+            if self.rate < self.max_rate:
+                self._refill(time.monotonic())
+                self.rate = min(self.max_rate, self.rate + self.max_rate * RAMP_STEP)
+
+
+def is_rate_limited(response, result=None):
+    """True if an API response is a throttling response (HTTP 429 or a DeyeCloud limit code)"""
+    if response.status_code == 429:
+        return True
+    if response.status_code != 200:
+        return False
+    if result is None:
+        try:
+            result = response.json()
+        except ValueError:
+            return False
+    if not isinstance(result, dict) or result.get('success', True):
+        return False
+    if str(result.get('code')) in RATE_LIMIT_CODES:
+        return True
+    msg = str(result.get('msg') or '').lower()
+    return any(text in msg for text in RATE_LIMIT_MESSAGES)
+
+
+def get_retry_after(response):
+    """Retry-After header in seconds, or None"""
+    value = response.headers.get('Retry-After')
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter():
+    """Return the process-wide limiter shared by every API call"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = AdaptiveRateLimiter(*get_api_rate(DEFAULT_RATE, DEFAULT_BURST))
+        return _limiter
@@ -7,9 +7,10 @@ Provides frame-level solar data analysis and summaries
 
 import sys
 import os
-import sqlite3
 from datetime import datetime, timedelta
 import argparse
+import heapq
+import itertools
 
 # Function to find the project root (where .git is located)
 def find_project_root(current_dir):
@@ -25,33 +26,64 @@ project_root = find_project_root(script_dir)
 
 if project_root:
     sys.path.insert(0, project_root)
-    DB_PATH = os.path.join(project_root, 'clientcode', 'database', 'solar_data.db')
 else:
     print("Error: Could not find project root ('.git' directory).")
     sys.exit(1)
 
-def get_frame_data(date=None, station_id=None, limit=None):
-    """Retrieve frame data from daily_logs table"""
-    conn = sqlite3.connect(DB_PATH)
+from clientcode.database.connection import DB_PATH, get_connection
+from clientcode.database.manage.db_setup import migrate_database
+from clientcode.database.archive import archived_months, frame_key, iter_archived_frames
+from clientcode.database.records import Frame
+
+# Rows fetched from SQLite per round trip while streaming frames
+FETCH_SIZE = 500
+
+def date_to_epoch(date):
+    """Local midnight of a YYYY-MM-DD date as epoch seconds"""
+    return int(datetime.strptime(date, '%Y-%m-%d').timestamp())
+
+def date_range_to_epochs(start_date, end_date):
+    """Half-open [start, end) epoch range covering start_date..end_date inclusive"""
+    end = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
+    return date_to_epoch(start_date), int(end.timestamp())
+
+def parse_page_key(after):
+    """Parse an --after key 'TS[:STATION_ID]' into (ts, station_id or None)"""
+    ts, _, station_id = str(after).partition(':')
+    return int(ts), int(station_id) if station_id else None
+
+def iter_hot_frame_data(date=None, station_id=None, limit=None, end_date=None, after=None):
+    """Yield Frame records from the daily_logs table newest first, FETCH_SIZE rows at a time"""
+    conn = get_connection(DB_PATH, row_factory=Frame.from_row)
     cursor = conn.cursor()
     
-    query = '''
-        SELECT timestamp, station_id, production_kw, consumption_kw, grid_kw,
-               battery_kw, soc_percent, pv_kw, generator_kw, grid_tied_inverter_power_kw
+    query = f'''
+        SELECT {Frame.COLUMNS}
         FROM daily_logs
         WHERE 1=1
     '''
     params = []
     
-    if date:
-        query += ' AND DATE(timestamp) = ?'
-        params.append(date)
-    
     if station_id:
         query += ' AND station_id = ?'
         params.append(station_id)
     
-    query += ' ORDER BY timestamp DESC'
+    if date:
+        # Range on the indexed epoch column instead of DATE(timestamp)
+        query += ' AND ts >= ? AND ts < ?'
+        params.extend(date_range_to_epochs(date, end_date or date))
+    
+    if after is not None:
+        # Keyset pagination: resume below the last (ts, station_id) shown instead of OFFSET
+        after_ts, after_station = parse_page_key(after)
+        if after_station is None:
+            query += ' AND ts < ?'
+            params.append(after_ts)
+        else:
+            query += ' AND (ts < ? OR (ts = ? AND station_id < ?))'
+            params.extend([after_ts, after_ts, after_station])
+    
+    query += ' ORDER BY ts DESC, station_id DESC'
     
     if limit:
         query += ' LIMIT ?'
@@ -59,33 +91,74 @@ def get_frame_data(date=None, station_id=None, limit=None):
     
     try:
         cursor.execute(query, params)
-        return cursor.fetchall()
+        while True:
+            rows = cursor.fetchmany(FETCH_SIZE)
+            if not rows:
+                break
+            yield from rows
     except Exception as e:
         print(f"Error retrieving frame data: {e}")
-        return []
     finally:
         conn.close()
 
+def iter_frame_data(date=None, station_id=None, limit=None, end_date=None, after=None):
+    """Yield Frame records newest first from daily_logs and the cold archive
+
+    Pass the last frame's page key (see page_key) as `after` to continue the
+    listing from there.
+    """
+    hot = iter_hot_frame_data(date, station_id, limit, end_date, after)
+    if not archived_months():
+        yield from hot
+        return
+
+    start_ts, end_ts = date_range_to_epochs(date, end_date or date) if date else (None, None)
+    after_key = None
+    if after is not None:
+        after_ts, after_station = parse_page_key(after)
+        if after_station is None:
+            end_ts = after_ts if end_ts is None else min(end_ts, after_ts)
+        else:
+            end_ts = after_ts + 1 if end_ts is None else min(end_ts, after_ts + 1)
+            after_key = (after_ts, after_station)
+    cold = iter_archived_frames(station_id, start_ts, end_ts, descending=True)
+    if after_key is not None:
+        cold = (frame for frame in cold if frame.key < after_key)
+
+    # Both sides are ordered by (ts, station_id) descending; a frame present in
+    # both (an interrupted archive run) is shown once
+    frames = heapq.merge(hot, cold, key=frame_key, reverse=True)
+    unique = (next(group) for _, group in itertools.groupby(frames, key=frame_key))
+    yield from itertools.islice(unique, limit or None)
+
+def get_frame_data(date=None, station_id=None, limit=None, end_date=None, after=None):
+    """Retrieve frame data from daily_logs table as a list (see iter_frame_data)"""
+    return list(iter_frame_data(date, station_id, limit, end_date, after))
+
+def page_key(frame):
+    """--after key of a Frame: 'ts:station_id'"""
+    return f"{frame.ts}:{frame.station_id}"
+
 def get_date_range_summary(start_date, end_date, station_id=None):
-    """Get summary statistics for a date range"""
-    conn = sqlite3.connect(DB_PATH)
+    """Get summary statistics for a date range (answered from the daily rollups)"""
+    conn = get_connection(DB_PATH)
     cursor = conn.cursor()
     
     query = '''
         SELECT 
-            COUNT(*) as total_frames,
-            MIN(timestamp) as first_record,
-            MAX(timestamp) as last_record,
-            ROUND(AVG(production_kw), 2) as avg_production_kw,
-            ROUND(MAX(production_kw), 2) as max_production_kw,
-            ROUND(AVG(consumption_kw), 2) as avg_consumption_kw,
-            ROUND(MAX(consumption_kw), 2) as max_consumption_kw,
-            ROUND(AVG(grid_kw), 2) as avg_grid_kw,
-            ROUND(AVG(battery_kw), 2) as avg_battery_kw,
-            ROUND(AVG(soc_percent), 1) as avg_soc_percent,
-            ROUND(MAX(soc_percent), 1) as max_soc_percent
-        FROM daily_logs
-        WHERE DATE(timestamp) BETWEEN ? AND ?
+            COALESCE(SUM(frame_count), 0) as total_frames,
+            datetime(MIN(first_ts), 'unixepoch', 'localtime') as first_record,
+            datetime(MAX(last_ts), 'unixepoch', 'localtime') as last_record,
+            ROUND(SUM(production_kw_sum) / SUM(production_kw_n), 2) as avg_production_kw,
+            ROUND(MAX(production_kw_max), 2) as max_production_kw,
+            ROUND(SUM(consumption_kw_sum) / SUM(consumption_kw_n), 2) as avg_consumption_kw,
+            ROUND(MAX(consumption_kw_max), 2) as max_consumption_kw,
+            ROUND(SUM(grid_kw_sum) / SUM(grid_kw_n), 2) as avg_grid_kw,
+            ROUND(SUM(battery_kw_sum) / SUM(battery_kw_n), 2) as avg_battery_kw,
+            ROUND(SUM(soc_percent_sum) / SUM(soc_percent_n), 1) as avg_soc_percent,
+            ROUND(MAX(soc_percent_max), 1) as max_soc_percent
+        FROM daily_logs_daily
+        WHERE day BETWEEN ? AND ?
     '''
     params = [start_date, end_date]
     
@@ -103,31 +176,41 @@ def get_date_range_summary(start_date, end_date, station_id=None):
         conn.close()
 
 def display_frame_summary(frames, title="Frame Data Summary"):
-    """Display frame data in a formatted table"""
-    if not frames:
-        print("No frame data found.")
-        return
-    
-    print(f"\n{title}")
-    print("=" * 120)
-    print(f"{'Timestamp':<20} {'Station ID':<12} {'Prod(kW)':<10} {'Cons(kW)':<10} {'Grid(kW)':<10} {'Batt(kW)':<10} {'SOC(%)':<8} {'PV(kW)':<10} {'Inv(kW)':<10}")
-    print("-" * 120)
+    """Print frames as a formatted table while iterating them; returns (count, last frame)"""
+    count = 0
+    last = None
     
     for frame in frames:
-        timestamp, station_id, production_kw, consumption_kw, grid_kw, battery_kw, soc_percent, pv_kw, generator_kw, inverter_kw = frame
+        if count == 0:
+            print(f"\n{title}")
+            print("=" * 120)
+            print(f"{'Timestamp':<20} {'Station ID':<12} {'Prod(kW)':<10} {'Cons(kW)':<10} {'Grid(kW)':<10} {'Batt(kW)':<10} {'SOC(%)':<8} {'PV(kW)':<10} {'Inv(kW)':<10}")
+            print("-" * 120)
+        count += 1
+        last = frame
         
-        prod_val = production_kw if production_kw is not None else 0
-        cons_val = consumption_kw if consumption_kw is not None else 0
-        grid_val = grid_kw if grid_kw is not None else 0
-        batt_val = battery_kw if battery_kw is not None else 0
-        soc_val = soc_percent if soc_percent is not None else 0
-        pv_val = pv_kw if pv_kw is not None else 0
-        inv_val = inverter_kw if inverter_kw is not None else 0
+        prod_val = frame.production_kw if frame.production_kw is not None else 0
+        cons_val = frame.consumption_kw if frame.consumption_kw is not None else 0
+        grid_val = frame.grid_kw if frame.grid_kw is not None else 0
+        batt_val = frame.battery_kw if frame.battery_kw is not None else 0
+        soc_val = frame.soc_percent if frame.soc_percent is not None else 0
+        pv_val = frame.pv_kw if frame.pv_kw is not None else 0
+        inv_val = frame.grid_tied_inverter_power_kw if frame.grid_tied_inverter_power_kw is not None else 0
         
-        print(f"{timestamp or 'N/A':<20} {station_id or 'N/A':<12} "
+        print(f"{frame.timestamp or 'N/A':<20} {frame.station_id or 'N/A':<12} "
               f"{prod_val:<10.2f} {cons_val:<10.2f} "
               f"{grid_val:<10.2f} {batt_val:<10.2f} "
               f"{soc_val:<8.1f} {pv_val:<10.2f} {inv_val:<10.2f}")
+    
+    if count == 0:
+        print("No frame data found.")
+    return count, last
+
+def display_frames_page(frames, title, limit):
+    """Stream frames to the table and print the --after key of the next page when the limit was reached"""
+    count, last = display_frame_summary(frames, title)
+    if limit and count == limit:
+        print(f"\nNext page: --after {page_key(last)}")
 
 def display_date_range_summary(summary, start_date, end_date):
     """Display summary statistics for date range"""
@@ -158,17 +241,67 @@ def display_date_range_summary(summary, start_date, end_date):
     print(f"  Average:         {avg_soc or 0:>8.1f}")
     print(f"  Maximum:         {max_soc or 0:>8.1f}")
 
+def get_hourly_summary(date, station_id=None):
+    """Get per-hour averages for one date from the hourly rollups"""
+    conn = get_connection(DB_PATH)
+    cursor = conn.cursor()
+
+    query = '''
+        SELECT
+            strftime('%H:00', hour_ts, 'unixepoch', 'localtime') as hour,
+            SUM(frame_count) as frames,
+            ROUND(SUM(production_kw_sum) / SUM(production_kw_n), 2) as avg_production_kw,
+            ROUND(SUM(consumption_kw_sum) / SUM(consumption_kw_n), 2) as avg_consumption_kw,
+            ROUND(SUM(grid_kw_sum) / SUM(grid_kw_n), 2) as avg_grid_kw,
+            ROUND(SUM(battery_kw_sum) / SUM(battery_kw_n), 2) as avg_battery_kw,
+            ROUND(MIN(soc_percent_min), 1) as min_soc_percent,
+            ROUND(MAX(soc_percent_max), 1) as max_soc_percent
+        FROM daily_logs_hourly
+        WHERE hour_ts >= ? AND hour_ts < ?
+    '''
+    params = list(date_range_to_epochs(date, date))
+
+    if station_id:
+        query += ' AND station_id = ?'
+        params.append(station_id)
+
+    query += ' GROUP BY hour_ts ORDER BY hour_ts'
+
+    try:
+        cursor.execute(query, params)
+        return cursor.fetchall()
+    except Exception as e:
+        print(f"Error getting hourly summary: {e}")
+        return []
+    finally:
+        conn.close()
+
+def display_hourly_summary(hours, date):
+    """Display per-hour averages for a date"""
+    if not hours:
+        print("No hourly data found.")
+        return
+
+    print(f"\nHourly Profile for {date}")
+    print("=" * 80)
+    print(f"{'Hour':<6} {'Frames':<7} {'Prod(kW)':<10} {'Cons(kW)':<10} {'Grid(kW)':<10} {'Batt(kW)':<10} {'SOC min-max(%)':<15}")
+    print("-" * 80)
+
+    for hour, frames, avg_prod, avg_cons, avg_grid, avg_batt, min_soc, max_soc in hours:
+        print(f"{hour:<6} {frames:<7} {avg_prod or 0:<10.2f} {avg_cons or 0:<10.2f} "
+              f"{avg_grid or 0:<10.2f} {avg_batt or 0:<10.2f} {min_soc or 0:>5.1f} - {max_soc or 0:<5.1f}")
+
 def get_available_dates():
     """Get list of dates with available frame data"""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection(DB_PATH)
     cursor = conn.cursor()
     
     try:
         cursor.execute('''
-            SELECT DISTINCT DATE(timestamp) as date, COUNT(*) as frame_count
-            FROM daily_logs
-            GROUP BY DATE(timestamp)
-            ORDER BY date DESC
+            SELECT day as date, SUM(frame_count) as frame_count
+            FROM daily_logs_daily
+            GROUP BY day
+            ORDER BY day DESC
             LIMIT 30
         ''')
         return cursor.fetchall()
@@ -186,12 +319,24 @@ def main():
     parser.add_argument('--end', '-e', help='End date for range analysis (YYYY-MM-DD)')
     parser.add_argument('--station', help='Station ID to filter')
     parser.add_argument('--limit', '-l', type=int, help='Limit number of frames to display')
+    parser.add_argument('--after', help='Continue a frame listing after this key (TS or TS:STATION, printed as "Next page")')
+    parser.add_argument('--frames', action='store_true', help='With --start/--end, list every frame of the range instead of a sample')
     parser.add_argument('--dates', action='store_true', help='Show available dates with data')
+    parser.add_argument('--hourly', action='store_true', help='Show the hourly profile for the selected date')
     
     args = parser.parse_args()
     
     print("Frame Summary Report Generator")
     print("=" * 50)
+
+    if not os.path.exists(DB_PATH):
+        print("Database not found. Run db_setup.py first.")
+        return
+
+    # The reports read ts and the rollup tables; bring a database created before them up to date
+    conn = get_connection(DB_PATH)
+    migrate_database(conn)
+    conn.close()
     
     # Show available dates
     if args.dates:
@@ -210,8 +355,14 @@ def main():
         summary = get_date_range_summary(args.start, args.end, args.station)
         display_date_range_summary(summary, args.start, args.end)
         
+        if args.frames:
+            frames = iter_frame_data(date=args.start, end_date=args.end, station_id=args.station,
+                                     limit=args.limit, after=args.after)
+            display_frames_page(frames, f"Frame Data for {args.start} to {args.end}", args.limit)
+            return
+        
         # Also show some sample frames
-        frames = get_frame_data(date=args.start, station_id=args.station, limit=20)
+        frames = iter_frame_data(date=args.start, station_id=args.station, limit=20)
         display_frame_summary(frames, f"Sample Frames for {args.start}")
         return
     
@@ -221,10 +372,14 @@ def main():
     # Get summary for the date
     summary = get_date_range_summary(target_date, target_date, args.station)
     display_date_range_summary(summary, target_date, target_date)
+
+    if args.hourly:
+        hours = get_hourly_summary(target_date, args.station)
+        display_hourly_summary(hours, target_date)
     
     # Get frame details
-    frames = get_frame_data(date=target_date, station_id=args.station, limit=args.limit)
-    display_frame_summary(frames, f"Frame Data for {target_date}")
+    frames = iter_frame_data(date=target_date, station_id=args.station, limit=args.limit, after=args.after)
+    display_frames_page(frames, f"Frame Data for {target_date}", args.limit)
     
     # Show usage examples
     if not any([args.date, args.start, args.dates]):
@@ -234,6 +389,9 @@ def main():
         print(f"  Date range analysis:    python3 frame_summary.py --start 2025-01-01 --end 2025-01-07")
         print(f"  Limit results:          python3 frame_summary.py --date 2025-01-15 --limit 50")
         print(f"  Filter by station:      python3 frame_summary.py --date 2025-01-15 --station 61086157")
+        print(f"  Hourly profile:         python3 frame_summary.py --date 2025-01-15 --hourly")
+        print(f"  Every frame of a range: python3 frame_summary.py --start 2025-01-01 --end 2025-03-31 --frames")
+        print(f"  Next page of frames:    python3 frame_summary.py --date 2025-01-15 --limit 50 --after 1736899200:61086157")
 
 if __name__ == '__main__':
     main()
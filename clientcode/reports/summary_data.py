@@ -4,7 +4,6 @@ View solar system data from database
 Query and display stored historical data
 """
 
-import sqlite3
 import sys
 import os
 from datetime import datetime, timedelta
@@ -23,52 +22,37 @@ project_root = find_project_root(script_dir)
 
 if project_root:
     sys.path.insert(0, project_root)
-    DB_PATH = os.path.join(project_root, 'clientcode', 'database', 'solar_data.db')
 else:
     print("Error: Could not find project root ('.git' directory).")
     sys.exit(1)
 
+from clientcode.database.connection import DB_PATH, get_connection
+from clientcode.database.manage.db_setup import migrate_database
+
 def get_summary_by_month(): 
   if not os.path.exists(DB_PATH):
     print("Database not found. Run db_setup.py first.")
     return
 
-  conn = sqlite3.connect(DB_PATH)
+  conn = get_connection(DB_PATH)
   cursor = conn.cursor()
   query = """
     SELECT
-        t.billing_month                                                                 AS Month,
-        printf('%05.2f', ROUND(gr.sell_rate_kwh, 2))                                    AS sell,
-        printf('%05.2f', ROUND(gr.buy_rate_kwh, 2))                                     AS buy,
-        printf('%07.2f', ROUND(SUM(t.grid_purchase_kwh), 2))                            AS purchase,
-        printf('%08.2f', ROUND((SUM(t.grid_purchase_kwh) *  gr.sell_rate_kwh), 2))      AS purchase_rate,
-        printf('%07.2f', ROUND(SUM(t.generated), 2))                                    AS generated,
-        printf('%08.2f', ROUND((SUM(t.generated) * gr.sell_rate_kwh), 2))               AS generated_rate,
-        printf('%07.2f', ROUND(SUM(t.grid_feedin_kwh), 2) )                             AS feedin,
-        printf('%08.2f', ROUND((SUM(t.grid_feedin_kwh) * gr.buy_rate_kwh), 2))          AS feedin_rate
-    FROM (
-        SELECT
-            strftime('%Y-%m', DATE(date, '-25 days')) AS billing_month,
-            strftime('%Y',   DATE(date, '-25 days')) AS rate_year,
-            strftime('%m',   DATE(date, '-25 days')) AS rate_month,
-            generation_kwh,
-            grid_feedin_kwh,
-            grid_purchase_kwh,
-            battery_charge_kwh,
-            battery_discharge_kwh,
-            (generation_kwh + battery_charge_kwh + battery_discharge_kwh) as generated
-        FROM daily_data
-    ) t
-    LEFT JOIN grid_rates gr
-        ON gr.year  = CAST(t.rate_year AS INTEGER)
-      AND gr.month = CAST(t.rate_month AS INTEGER)
+        billing_month                                                                   AS Month,
+        printf('%05.2f', ROUND(sell_rate_kwh, 2))                                       AS sell,
+        printf('%05.2f', ROUND(buy_rate_kwh, 2))                                        AS buy,
+        printf('%07.2f', ROUND(SUM(grid_purchase_kwh), 2))                              AS purchase,
+        printf('%08.2f', ROUND((SUM(grid_purchase_kwh) *  sell_rate_kwh), 2))           AS purchase_rate,
+        printf('%07.2f', ROUND(SUM(generated_kwh), 2))                                  AS generated,
+        printf('%08.2f', ROUND((SUM(generated_kwh) * sell_rate_kwh), 2))                AS generated_rate,
+        printf('%07.2f', ROUND(SUM(grid_feedin_kwh), 2) )                               AS feedin,
+        printf('%08.2f', ROUND((SUM(grid_feedin_kwh) * buy_rate_kwh), 2))               AS feedin_rate
+    FROM billing_period
     GROUP BY
-        t.billing_month,
-        t.rate_year,
-        t.rate_month,
-        gr.sell_rate_kwh,
-        gr.buy_rate_kwh
-    ORDER BY t.billing_month;
+        billing_month,
+        sell_rate_kwh,
+        buy_rate_kwh
+    ORDER BY billing_month;
   """
   cursor.execute(query)
   rows = cursor.fetchall()
@@ -89,39 +73,20 @@ def get_summary_by_year():
     print("Database not found. Run db_setup.py first.")
     return
 
-  conn = sqlite3.connect(DB_PATH)
+  conn = get_connection(DB_PATH)
   cursor = conn.cursor()
   query = """
       SELECT
-          t.billing_year AS year,
-          printf('%08.2f', ROUND(SUM(t.grid_purchase_kwh), 2)) AS purchase,
-          printf('%09.2f', ROUND(SUM(t.grid_purchase_kwh * gr.sell_rate_kwh), 2)) AS purchase_rate,
-          printf('%08.2f', ROUND(SUM(t.generated), 2)) AS generated,
-          printf('%09.2f', ROUND(SUM(t.generated * gr.sell_rate_kwh), 2)) AS generated_rate,
-          printf('%08.2f', ROUND(SUM(t.grid_feedin_kwh), 2)) AS feedin,
-          printf('%09.2f', ROUND(SUM(t.grid_feedin_kwh * gr.buy_rate_kwh), 2)) AS feedin_rate
-
-      FROM (
-          SELECT
-              strftime('%Y', DATE(date, '-25 days')) AS billing_year,
-              strftime('%Y', DATE(date, '-25 days')) AS rate_year,
-              strftime('%m', DATE(date, '-25 days')) AS rate_month,
-
-              generation_kwh,
-              grid_feedin_kwh,
-              grid_purchase_kwh,
-              battery_charge_kwh,
-              battery_discharge_kwh,
-
-              (generation_kwh + battery_charge_kwh + battery_discharge_kwh) AS generated
-          FROM daily_data
-      ) t
-      LEFT JOIN grid_rates gr
-        ON gr.year  = CAST(t.rate_year AS INTEGER)
-      AND gr.month = CAST(t.rate_month AS INTEGER)
-
-      GROUP BY t.billing_year
-      ORDER BY t.billing_year
+          substr(billing_month, 1, 4) AS year,
+          printf('%08.2f', ROUND(SUM(grid_purchase_kwh), 2)) AS purchase,
+          printf('%09.2f', ROUND(SUM(grid_purchase_kwh * sell_rate_kwh), 2)) AS purchase_rate,
+          printf('%08.2f', ROUND(SUM(generated_kwh), 2)) AS generated,
+          printf('%09.2f', ROUND(SUM(generated_kwh * sell_rate_kwh), 2)) AS generated_rate,
+          printf('%08.2f', ROUND(SUM(grid_feedin_kwh), 2)) AS feedin,
+          printf('%09.2f', ROUND(SUM(grid_feedin_kwh * buy_rate_kwh), 2)) AS feedin_rate
+      FROM billing_period
+      GROUP BY substr(billing_month, 1, 4)
+      ORDER BY substr(billing_month, 1, 4)
     """
   cursor.execute(query)
   rows = cursor.fetchall()
@@ -142,7 +107,7 @@ def get_summary_by_roi():
     print("Database not found. Run db_setup.py first.")
     return
 
-  conn = sqlite3.connect(DB_PATH)
+  conn = get_connection(DB_PATH)
   cursor = conn.cursor()
   query = """
     SELECT
@@ -156,27 +121,12 @@ def get_summary_by_roi():
       ROUND(((750000 - generated_rate) / apm) , 2)  AS remaining_month_roi
     FROM 
       (SELECT 
-          printf('%09.2f', ROUND(SUM(t.generated) + SUM(t.grid_feedin_kwh), 2)) AS generated_kwh,
-          printf('%10.2f', ROUND((SUM(t.generated * gr.sell_rate_kwh) + SUM(t.grid_feedin_kwh * gr.buy_rate_kwh)), 2)) AS generated_rate,
-          COUNT(DISTINCT t.billing_year || '-' || t.rate_month) AS running_months,
-          ROUND(((SUM(t.generated * gr.sell_rate_kwh) + SUM(t.grid_feedin_kwh * gr.buy_rate_kwh)) /  COUNT(DISTINCT t.billing_year || '-' || t.rate_month)), 2) AS apm,
-          ROUND(((SUM(t.generated) + SUM(t.grid_feedin_kwh)) /  COUNT(DISTINCT t.billing_year || '-' || t.rate_month)), 2) AS kwhpm
-
-        FROM (
-            SELECT
-                strftime('%Y', DATE(date, '-25 days')) AS billing_year,
-                strftime('%m', DATE(date, '-25 days')) AS rate_month,
-                generation_kwh,
-                grid_feedin_kwh,
-                battery_charge_kwh,
-                battery_discharge_kwh,
-
-                (generation_kwh + battery_charge_kwh + battery_discharge_kwh) AS generated
-            FROM daily_data
-        ) t
-        LEFT JOIN grid_rates gr
-          ON gr.year  = CAST(t.billing_year AS INTEGER)
-        AND gr.month = CAST(t.rate_month AS INTEGER)
+          printf('%09.2f', ROUND(SUM(generated_kwh) + SUM(grid_feedin_kwh), 2)) AS generated_kwh,
+          printf('%10.2f', ROUND((SUM(generated_kwh * sell_rate_kwh) + SUM(grid_feedin_kwh * buy_rate_kwh)), 2)) AS generated_rate,
+          COUNT(DISTINCT billing_month) AS running_months,
+          ROUND(((SUM(generated_kwh * sell_rate_kwh) + SUM(grid_feedin_kwh * buy_rate_kwh)) /  COUNT(DISTINCT billing_month)), 2) AS apm,
+          ROUND(((SUM(generated_kwh) + SUM(grid_feedin_kwh)) /  COUNT(DISTINCT billing_month)), 2) AS kwhpm
+        FROM billing_period
       ) tot ;
     """
   cursor.execute(query)
@@ -229,7 +179,7 @@ def get_recent_data(days=7):
         print("Database not found. Run db_setup.py first.")
         return
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection(DB_PATH)
     cursor = conn.cursor()
 
     cursor.execute('''
@@ -296,7 +246,7 @@ def get_date_range_data(start_date, end_date):
         print("Database not found. Run db_setup.py first.")
         return
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection(DB_PATH)
     cursor = conn.cursor()
 
     cursor.execute('''
@@ -326,10 +276,11 @@ def get_monthly_summary(year, month):
         print("Database not found. Run db_setup.py first.")
         return
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection(DB_PATH)
     cursor = conn.cursor()
 
     month_str = f"{year}-{month:02d}"
+    next_month_str = f"{year + month // 12}-{month % 12 + 1:02d}"
 
     cursor.execute('''
     SELECT
@@ -344,8 +295,8 @@ def get_monthly_summary(year, month):
         MAX(generation_kwh) as max_gen,
         MIN(generation_kwh) as min_gen
     FROM daily_data
-    WHERE date LIKE ?
-    ''', (f"{month_str}%",))
+    WHERE date >= ? AND date < ?
+    ''', (f"{month_str}-01", f"{next_month_str}-01"))
 
     row = cursor.fetchone()
     conn.close()
@@ -387,7 +338,7 @@ def get_date_range_summary(start_date, end_date):
         print("Database not found. Run db_setup.py first.")
         return
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection(DB_PATH)
     cursor = conn.cursor()
 
     cursor.execute('''
@@ -442,6 +393,12 @@ def get_date_range_summary(start_date, end_date):
 
 def main():
     """Main execution"""
+    # The month, year and ROI reports read billing_period; build it on a database created before it
+    if os.path.exists(DB_PATH):
+        conn = get_connection(DB_PATH)
+        migrate_database(conn)
+        conn.close()
+
     if len(sys.argv) > 1:
         command = sys.argv[1]
 
@@ -1,16 +1,14 @@
-import requests
-from clientcode import variable
+from clientcode.client import get_client
 
 if __name__ == '__main__':
-    url = variable.baseurl + '/station/device'
-    headers = variable.headers
+    client = get_client()
     data = {
         "page": 1,
         "size": 10,
         "stationIds": [10]    # Replace with your station ids
     }
 
-    response = requests.post(url, headers=headers, json=data)
+    response = client.post('/station/device', data)
 
     print(response.status_code)
     print(response.json())
@@ -1,9 +1,7 @@
-import requests
-from clientcode import variable
+from clientcode.client import get_client
 
 if __name__ == '__main__':
-    url = variable.baseurl + '/station/list'
-    headers = variable.headers
+    client = get_client()
 
     """
     Retrieve history data of the station, supporting interval data queries in frames, days, months, and years.
@@ -20,7 +18,7 @@ if __name__ == '__main__':
         "endAt": "2024-08-01"       # End date
     }
 
-    response = requests.post(url, headers=headers, json=data)
+    response = client.post('/station/history', data)
 
     print(response.status_code)
     print(response.json())
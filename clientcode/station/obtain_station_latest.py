@@ -1,14 +1,12 @@
-import requests
-from clientcode import variable
+from clientcode.client import get_client
 
 if __name__ == '__main__':
-    url = variable.baseurl + '/station/latest'
-    headers = variable.headers
+    client = get_client()
     data = {
         "stationId": 000         # Replace with your stationId in deyecloud
     }
 
-    response = requests.post(url, headers=headers, json=data)
+    response = client.post('/station/latest', data)
 
     print(response.status_code)
     print(response.json())
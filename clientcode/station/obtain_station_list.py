@@ -1,15 +1,13 @@
-import requests
-from clientcode import variable
+from clientcode.client import get_client
 
 if __name__ == '__main__':
-    url = variable.baseurl + '/station/list'
-    headers = variable.headers
+    client = get_client()
     data = {
         "page": 1,
         "size": 10
     }
 
-    response = requests.post(url, headers=headers, json=data)
+    response = client.post('/station/list', data)
 
     print(response.status_code)
     print(response.json())
@@ -1,9 +1,7 @@
-import requests
-from clientcode import variable
+from clientcode.client import get_client
 
 if __name__ == '__main__':
-    url = variable.baseurl + '/station/listWithDevice'
-    headers = variable.headers
+    client = get_client()
 
     """
     Fetch station list with devices 
@@ -15,7 +13,7 @@ if __name__ == '__main__':
         "deviceType": "INVERTER"
     }
 
-    response = requests.post(url, headers=headers, json=data)
+    response = client.post('/station/listWithDevice', data)
 
     print(response.status_code)
     print(response.json())
\ No newline at end of file
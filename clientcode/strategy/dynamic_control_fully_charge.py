@@ -1,7 +1,6 @@
 import logging
 
-import requests
-from clientcode import variable
+from clientcode.client import get_client
 
 # Set operation mode as Fully Charge via dynamic control
 # - When PV generation is sufficient, after supplying the load, the battery is charged until it reaches the preset value:
@@ -9,8 +8,7 @@ from clientcode import variable
 #   - If workMode is not set to SELLING_FIRST, charging continues until it is no longer possible, at which point any excess is sold to the grid.
 # - When PV generation is insufficient, the deficit is met by purchasing electricity from the grid.
 if __name__ == '__main__':
-    url = variable.baseurl + '/strategy/dynamicControl'
-    headers = variable.headers
+    client = get_client()
 
     targetSOC = 90;  # high value(like 90)
     power = 4000;  #this is just an example,fill in your target power (Reference valu : power = min(maxAcharge current, gridChargeAmpere) * vol)
@@ -70,7 +68,7 @@ if __name__ == '__main__':
     }
 
     # request post
-    response = requests.post(url, headers=headers, json=data)
+    response = client.post('/strategy/dynamicControl', data)
 
     print(response.status_code)
     print(response.json())
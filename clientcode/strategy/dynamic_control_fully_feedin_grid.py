@@ -1,13 +1,11 @@
 import logging
 
-import requests
-from clientcode import variable
+from clientcode.client import get_client
 
 # When PV generation is abundant：after the PV system supplies the load, the excess PV generation along with the battery’s discharge power is sold to the grid;
 # When PV generation is insufficient：after the battery (operating at its preset state-of-charge) supplies the load, any remaining discharged power is sold to the grid.
 if __name__ == '__main__':
-    url = variable.baseurl + '/strategy/dynamicControl'
-    headers = variable.headers
+    client = get_client()
 
 
     ratedPower = 2000 # this is just an example, get rated power through endpoint /device/latest
@@ -70,7 +68,7 @@ if __name__ == '__main__':
     }
 
     # request post
-    response = requests.post(url, headers=headers, json=data)
+    response = client.post('/strategy/dynamicControl', data)
 
     print(response.status_code)
     print(response.json())
@@ -1,12 +1,10 @@
-import requests
-from clientcode import variable
+from clientcode.client import get_client
 
 # The battery ceases both charging and discharging.
 # PV generation is abundant：workMode=SELLING_FIRST, the PV output flows to the load first and then to  grid;
 # PV generation is insufficient, power is purchased to supply the load.
 if __name__ == '__main__':
-    url = variable.baseurl + '/strategy/dynamicControl'
-    headers = variable.headers
+    client = get_client()
 
     targetSOC = 70;  # current soc, through endpoint /device/latest
     power = 10000;  #your target power, range: 0~rated power
@@ -64,7 +62,7 @@ if __name__ == '__main__':
   }
 
     # request post
-    response = requests.post(url, headers=headers, json=data)
+    response = client.post('/strategy/dynamicControl', data)
 
     print(response.status_code)
     print(response.json())
\ No newline at end of file
@@ -1,10 +1,8 @@
-import requests
-from clientcode import variable
+from clientcode.client import get_client
 
 # Set time of use for the device
 if __name__ == '__main__':
-    url = variable.baseurl + '/strategy/dynamicControl'
-    headers = variable.headers
+    client = get_client()
 
     targetSOC = 15;  # low value (like 15)
     power = 10000;  # this is just an example, fill in your target power, range: 0~rated power; would affect the rate of change
@@ -64,7 +62,7 @@ if __name__ == '__main__':
   }
 
     # request post
-    response = requests.post(url, headers=headers, json=data)
+    response = client.post('/strategy/dynamicControl', data)
 
     print(response.status_code)
     print(response.json())
\ No newline at end of file